@@ -1,13 +1,10 @@
 import streamlit as st
 from pathlib import Path
-import tempfile
-import shutil
-from PIL import Image
+from io import BytesIO
 
-from detect_and_crop import detect_and_crop
-# updated recognize_chars signature
-from recognize_chars import recognize_characters
-from draw_labels import draw_labels
+from pipeline import iter_pipeline
+from page_source import iter_pages
+from models.registry import registry
 
 # CONFIG
 st.set_page_config(page_title="Braille Detection", layout="centered")
@@ -16,6 +13,9 @@ st.set_page_config(page_title="Braille Detection", layout="centered")
 YOLO_MODEL_PATH = Path("models") / "yolo8l.pt"
 RECOG_MODEL_PATH = Path("models") / "recognition_model.pth"
 
+# load + warm both models once per process; reruns reuse the registry entries
+registry.warmup(YOLO_MODEL_PATH, RECOG_MODEL_PATH)
+
 st.title("Braille Document Recognition")
 
 # language + grade selector - ADDED RUSSIAN
@@ -24,60 +24,60 @@ language = st.selectbox("Document language", ["English", "French", "Arabic", "Ru
 # grade = 1 if grade_choice == "Grade 1" else 2
 grade = 1
 space_factor = st.slider("Word gap sensitivity", 1.0, 2.0, 1.2, 0.05)
+# YOLO finds cells on any scan; the dot detector is much faster on clean embossed pages
+detector_choice = st.selectbox("Cell detector", ["YOLO", "Dot blobs (fast, clean scans)"])
+detector = "yolo" if detector_choice == "YOLO" else "blob"
+# the lexicon search fixes more misreads but also rewrites real words the lexicon lacks
+fuzzy_correction = language == "Russian" and st.checkbox("Fix misread words by lexicon search", value=False)
 
-uploaded_file = st.file_uploader("Upload an image", type=["jpg", "jpeg", "png"])
+uploaded_file = st.file_uploader("Upload an image or a book", type=["jpg", "jpeg", "png", "tif", "tiff", "pdf"])
 
 if uploaded_file is not None:
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_dir = Path(temp_dir)
-
-        # Prepare directories
-        images_dir = temp_dir / "input"
-        images_dir.mkdir(parents=True, exist_ok=True)
-        output_dir = temp_dir / "output"
-
-        # Save uploaded file
-        input_path = images_dir / uploaded_file.name
-        with open(input_path, "wb") as f:
-            f.write(uploaded_file.read())
-
-        st.info("Running detection and cropping...")
-        results_dir, crops_dir = detect_and_crop(YOLO_MODEL_PATH, images_dir, output_dir)
-
-        st.info("Recognizing Braille characters...")
-        recognize_characters(crops_dir, RECOG_MODEL_PATH, language=language, grade=grade, space_factor=space_factor)
-
-        # ADD THIS: Show the assembled Braille before translation
-        assembled_braille_file = results_dir / "braille_characters" / input_path.stem / "assembled_braille.txt"
-        if assembled_braille_file.exists():
-            assembled_braille = assembled_braille_file.read_text(encoding="utf-8")
+    book = Path(uploaded_file.name).stem
+    translations = []
+
+    st.info("Running detection, cropping and recognition...")
+    # pages are decoded lazily and overlapped: page N+1 is detected while page N is recognized
+    results = iter_pipeline(iter_pages(uploaded_file), yolo_model_path=YOLO_MODEL_PATH,
+                            recog_model_path=RECOG_MODEL_PATH, language=language, grade=grade,
+                            space_factor=space_factor, render=True, detector=detector,
+                            fuzzy_correction=fuzzy_correction)
+    for index, result in enumerate(results):
+        translations.append(result.translated)
+        label = f"Page {index + 1}"
+        st.header(label)
+
+        # Show the assembled Braille before translation
+        if result.assembled_braille:
             st.subheader("Assembled Braille (before translation)")
-            st.text_area("Raw Braille Unicode", assembled_braille, height=100)
-
-        st.info("Drawing labels on the document...")
-        labeled_docs_dir = draw_labels(results_dir)
-
-        # Show final labeled image (if exists)
-        labeled_images = list(labeled_docs_dir.glob("*_labeled.jpg"))
-        if labeled_images:
-            labeled_image_path = labeled_images[0]
-            labeled_image = Image.open(labeled_image_path)
-            st.image(labeled_image, caption="Labeled Braille Document", use_container_width=True)
-
-            # show translated text file contents if present
-            translated_file = (results_dir / "braille_characters" / labeled_image_path.stem.replace("_labeled","") / "translated.txt")
-            if translated_file.exists():
-                translated_text = translated_file.read_text(encoding="utf-8")
-                st.subheader("Translated Text")
-                st.text_area("Translation", translated_text, height=200, disabled=True)
-
-            # Download
-            with open(labeled_image_path, "rb") as f:
-                st.download_button(
-                    label="Download Labeled Image",
-                    data=f,
-                    file_name=labeled_image_path.name,
-                    mime="image/jpeg"
-                )
-        else:
-            st.error("No labeled image produced.")
\ No newline at end of file
+            st.text_area("Raw Braille Unicode", result.assembled_braille, height=100, key=f"braille_{index}")
+
+        if not len(result.layout):
+            st.error("No labeled image produced.")
+            continue
+
+        labeled_image = result.overlay
+        st.image(labeled_image, caption=f"Labeled Braille Document - {label}", use_container_width=True)
+
+        if result.translated:
+            st.subheader("Translated Text")
+            st.text_area("Translation", result.translated, height=200, disabled=True, key=f"translation_{index}")
+
+        # Download
+        buffer = BytesIO()
+        labeled_image.save(buffer, format="JPEG")
+        st.download_button(
+            label="Download Labeled Image",
+            data=buffer.getvalue(),
+            file_name=f"{book}_page{index + 1}_labeled.jpg",
+            mime="image/jpeg",
+            key=f"download_{index}"
+        )
+
+    if len(translations) > 1:
+        st.download_button(
+            label="Download Book Translation",
+            data="\n\n".join(translations).encode("utf-8"),
+            file_name=f"{book}_translated.txt",
+            mime="text/plain"
+        )
@@ -0,0 +1,281 @@
+"""
+Batch transcription of a directory tree of braille pages.
+
+    python batch_cli.py archive/ --output out/ --workers 8 --language Russian
+
+Every page (image, TIFF frame or PDF page) is a unit of work, fanned out to a pool of
+worker processes that each keep warm models. Finished pages are appended to a JSONL
+manifest as they complete, so an interrupted run resumes where it stopped.
+"""
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+from metrics import metrics, StageRecord
+from page_source import PAGE_EXTENSIONS, DEFAULT_PDF_DPI, count_pages, read_page
+from pipeline import YOLO_MODEL_PATH, RECOG_MODEL_PATH
+from recognize_chars import DEFAULT_BATCH_SIZE
+from detect_and_crop import tile_origins
+
+_worker_config = {}
+_worker_cache = None
+_worker_cascade = None
+
+
+def _init_worker(config, torch_threads):
+    """Pool initializer: pin thread count and load + warm both models once per worker."""
+    global _worker_cache, _worker_cascade
+    import torch
+    from models.registry import registry
+    from glyph_cache import GlyphCache
+    from dot_sampler import DotCascade
+
+    torch.set_num_threads(torch_threads)
+    _worker_config.update(config)
+    if config["metrics"]:
+        metrics.enable(trace_memory=metrics.trace_memory)
+    # one glyph cache per worker, shared by all the pages it processes
+    if config["glyph_cache"]:
+        _worker_cache = GlyphCache(config["glyph_cache"])
+    if config["cascade"] is not None:
+        _worker_cascade = DotCascade(config["cascade"])
+    yolo_path = config["yolo_model_path"] if config["detector"] == "yolo" else None
+    registry.warmup(yolo_path, config["recog_model_path"], backend=config["backend"])
+
+
+def _process_page(rel_path, page_index):
+    from pipeline import run_pipeline
+
+    config = _worker_config
+    # a worker runs one page at a time: everything recorded from here on belongs to this page
+    metrics.reset()
+    t0 = time.perf_counter()
+    page = read_page(Path(config["input_dir"]) / rel_path, page_index, dpi=config["dpi"])
+    read_time = time.perf_counter() - t0
+    before = _worker_cache.stats() if _worker_cache is not None else None
+    paths_before = _worker_cascade.stats() if _worker_cascade is not None else None
+
+    result = run_pipeline(page.image, config["yolo_model_path"], config["recog_model_path"],
+                          language=config["language"], grade=config["grade"],
+                          space_factor=config["space_factor"], batch_size=config["batch_size"],
+                          tile_size=config["tile_size"], tile_overlap=config["tile_overlap"],
+                          backend=config["backend"],
+                          cache=_worker_cache, cascade=_worker_cascade, detector=config["detector"],
+                          fuzzy_correction=config["fuzzy_correction"])
+    result.timings["decode"] = result.timings.get("decode", 0.0) + read_time
+    record = {"file": rel_path, "page": page_index, "status": "ok"}
+    record.update(result.to_dict(include_cells=False))
+    if before is not None:
+        after = _worker_cache.stats()
+        record["cache_hits"] = after["hits"] - before["hits"]
+        record["cache_misses"] = after["misses"] - before["misses"]
+    if paths_before is not None:
+        after = _worker_cascade.stats()
+        record["fast_path"] = after["fast"] - paths_before["fast"]
+        record["cnn_path"] = after["cnn"] - paths_before["cnn"]
+    if metrics.enabled:
+        record["metrics"] = metrics.records()
+    return record
+
+
+def find_pages(input_dir: Path):
+    """Walk the tree and list (relative path, page index) for every page, in a stable order."""
+    pages = []
+    for path in sorted(input_dir.rglob("*")):
+        if path.is_file() and path.suffix.lower() in PAGE_EXTENSIONS:
+            rel_path = path.relative_to(input_dir).as_posix()
+            try:
+                n_pages = count_pages(path)
+            except Exception as e:
+                print(f"Skipping unreadable {rel_path}: {e}")
+                continue
+            pages.extend((rel_path, index) for index in range(n_pages))
+    return pages
+
+
+def load_manifest(manifest_path: Path):
+    """(file, page) of every page already completed successfully."""
+    done = set()
+    if not manifest_path.exists():
+        return done
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # a line cut short by an interrupted run
+                continue
+            if record.get("status") == "ok":
+                done.add((record["file"], record["page"]))
+    return done
+
+
+def run_batch(input_dir: Path, output_dir: Path, workers: int = 1, language: str = "English", grade: int = 1,
+              space_factor: float = 1.2, yolo_model_path: Path = YOLO_MODEL_PATH,
+              recog_model_path: Path = RECOG_MODEL_PATH, batch_size: int = DEFAULT_BATCH_SIZE, tile_size=None,
+              tile_overlap: int = 256, dpi: int = DEFAULT_PDF_DPI, backend: str = "eager", glyph_cache: int = 0,
+              cascade=None, detector: str = "yolo", metrics_path=None, fuzzy_correction: bool = False):
+    """
+    Process every page under input_dir, resuming from output_dir/manifest.jsonl.
+    tile_size / tile_overlap: tiled detection for large scans (tile_size None = whole page)
+    glyph_cache: entries of the per-worker glyph recognition cache (0 = off)
+    cascade: confidence threshold of the analytic dot sampler fast path (None = off)
+    detector: 'yolo' or 'blob' (classical dot detector, no YOLO model)
+    fuzzy_correction: Russian lexicon search for misreads the lexicon does not list
+    metrics_path: write per-stage metrics of the run there in Prometheus text format (None = off);
+                  per-page stage records are also added to the manifest under 'metrics'
+    returns: summary dict (pages, errors, elapsed, pages_per_sec, stage totals, cache hits/misses,
+             cells per recognition path)
+    """
+    if tile_size is not None:
+        # a bad overlap would fail every page in the workers; fail once, up front
+        tile_origins(tile_size, tile_size, tile_overlap)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / "manifest.jsonl"
+
+    pages = find_pages(input_dir)
+    done = load_manifest(manifest_path)
+    todo = [page for page in pages if page not in done]
+    print(f"{len(pages)} pages found, {len(pages) - len(todo)} already done, {len(todo)} to process")
+
+    config = {
+        "input_dir": str(input_dir),
+        "yolo_model_path": str(yolo_model_path),
+        "recog_model_path": str(recog_model_path),
+        "language": language,
+        "grade": grade,
+        "space_factor": space_factor,
+        "batch_size": batch_size,
+        "tile_size": tile_size,
+        "tile_overlap": tile_overlap,
+        "dpi": dpi,
+        "backend": backend,
+        "glyph_cache": glyph_cache,
+        "cascade": cascade,
+        "detector": detector,
+        "fuzzy_correction": fuzzy_correction,
+        "metrics": metrics_path is not None,
+    }
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    stage_totals = defaultdict(float)
+    n_ok = n_err = cache_hits = cache_misses = fast_path = cnn_path = 0
+    start = time.perf_counter()
+    with open(manifest_path, "a", encoding="utf-8") as manifest, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(config, torch_threads)) as pool:
+        pending = {}
+        queue = iter(todo)
+        # bounded number of in-flight pages so huge archives do not pile up futures
+        max_in_flight = workers * 4
+
+        def submit_next():
+            for page in queue:
+                pending[pool.submit(_process_page, *page)] = page
+                return True
+            return False
+
+        for _ in range(max_in_flight):
+            if not submit_next():
+                break
+
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                rel_path, page_index = pending.pop(future)
+                try:
+                    record = future.result()
+                    n_ok += 1
+                    for stage, seconds in record["timings"].items():
+                        stage_totals[stage] += seconds
+                    cache_hits += record.get("cache_hits", 0)
+                    cache_misses += record.get("cache_misses", 0)
+                    fast_path += record.get("fast_path", 0)
+                    cnn_path += record.get("cnn_path", 0)
+                    for stage_record in record.get("metrics", []):
+                        metrics.add(StageRecord(**stage_record))
+                except Exception as e:
+                    record = {"file": rel_path, "page": page_index, "status": "error", "error": str(e)}
+                    n_err += 1
+                manifest.write(json.dumps(record, ensure_ascii=False) + "\n")
+                manifest.flush()
+                submit_next()
+
+    elapsed = time.perf_counter() - start
+    if metrics_path is not None:
+        metrics.write_prometheus(metrics_path)
+    return {
+        "pages": n_ok,
+        "errors": n_err,
+        "elapsed": elapsed,
+        "pages_per_sec": n_ok / elapsed if elapsed > 0 else 0.0,
+        "stage_totals": dict(stage_totals),
+        "cache_hits": cache_hits,
+        "cache_misses": cache_misses,
+        "fast_path": fast_path,
+        "cnn_path": cnn_path,
+    }
+
+
+def print_summary(summary):
+    print(f"\nProcessed {summary['pages']} pages ({summary['errors']} errors) in {summary['elapsed']:.1f}s "
+          f"-> {summary['pages_per_sec']:.2f} pages/sec")
+    if summary["pages"]:
+        print("Per-stage time (summed over workers):")
+        for stage, seconds in summary["stage_totals"].items():
+            print(f"  {stage:<10} total {seconds:8.2f}s  mean {seconds / summary['pages'] * 1000:8.1f} ms/page")
+    lookups = summary["cache_hits"] + summary["cache_misses"]
+    if lookups:
+        print(f"Glyph cache: {summary['cache_hits']} hits / {lookups} cells "
+              f"({summary['cache_hits'] / lookups:.1%} hit rate)")
+    cells = summary["fast_path"] + summary["cnn_path"]
+    if cells:
+        print(f"Cascade: {summary['fast_path'] / cells:.1%} of cells read by the dot sampler, "
+              f"{summary['cnn_path'] / cells:.1%} sent to BrailleNet")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe a directory tree of braille pages.")
+    parser.add_argument("input_dir", type=Path)
+    parser.add_argument("--output", type=Path, default=Path("batch_output"), help="directory for manifest.jsonl")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--language", default="English", choices=["English", "French", "Arabic", "Russian"])
+    parser.add_argument("--grade", type=int, default=1, choices=[1, 2])
+    parser.add_argument("--space-factor", type=float, default=1.2)
+    parser.add_argument("--yolo-model", type=Path, default=YOLO_MODEL_PATH)
+    parser.add_argument("--recog-model", type=Path, default=RECOG_MODEL_PATH)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--tile-size", type=int, default=None, help="tiled detection for large scans")
+    parser.add_argument("--tile-overlap", type=int, default=256,
+                        help="pixels shared by neighbouring tiles; must exceed the cell size and stay below --tile-size")
+    parser.add_argument("--backend", default="eager", choices=["eager", "torchscript", "onnx", "int8"],
+                        help="recognizer backend; --recog-model must point at the matching artifact")
+    parser.add_argument("--glyph-cache", type=int, default=0,
+                        help="per-worker glyph recognition cache size in entries (0 = off)")
+    parser.add_argument("--cascade", type=float, default=None, metavar="THRESHOLD",
+                        help="read confident clean cells with the analytic dot sampler (e.g. 0.5)")
+    parser.add_argument("--detector", default="yolo", choices=["yolo", "blob"],
+                        help="cell detector; blob is the fast classical path for clean scans")
+    parser.add_argument("--fuzzy-correction", action="store_true",
+                        help="Russian: also fix unlisted misreads by lexicon search (may rewrite rare real words)")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_PDF_DPI, help="PDF rasterization resolution")
+    parser.add_argument("--metrics", type=Path, default=None, metavar="FILE",
+                        help="write per-stage metrics (Prometheus text format) to FILE")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(args.input_dir, args.output, workers=args.workers, language=args.language,
+                        grade=args.grade, space_factor=args.space_factor, yolo_model_path=args.yolo_model,
+                        recog_model_path=args.recog_model, batch_size=args.batch_size,
+                        tile_size=args.tile_size, tile_overlap=args.tile_overlap, dpi=args.dpi, backend=args.backend,
+                        glyph_cache=args.glyph_cache, cascade=args.cascade,
+                        detector=args.detector, metrics_path=args.metrics,
+                        fuzzy_correction=args.fuzzy_correction)
+    print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Words/sec of the text <-> braille codecs, per language and direction.
+
+    python -m benchmarks.bench_codec
+    python -m benchmarks.bench_codec --compare benchmarks/results/codec_<older>.json
+
+The corpus is the benchmark sample text of each language (benchmarks/synthetic.py), one
+sentence per call like a recognized line. from_braille decodes what to_braille produced.
+Every case runs for at least --seconds, best of --repeats. A direction that raises on the
+corpus is reported with its error instead of a rate.
+"""
+import argparse
+import json
+import platform
+import time
+from pathlib import Path
+
+from benchmarks.bench_pipeline import RESULTS_DIR, REGRESSION_RATIO, _git_commit
+from benchmarks.synthetic import SAMPLE_TEXT
+
+LANGUAGES = ["English", "French", "Arabic", "Russian"]
+
+
+def corpus(language: str):
+    """returns: list of sentences"""
+    text = SAMPLE_TEXT.get(language, SAMPLE_TEXT["English"])
+    return [s for s in text.split(". ") if s]
+
+
+def words_per_second(function, lines, n_words: int, seconds: float, repeats: int):
+    best = 0.0
+    for _ in range(repeats):
+        calls, t0 = 0, time.perf_counter()
+        while True:
+            for line in lines:
+                function(line)
+            calls += 1
+            elapsed = time.perf_counter() - t0
+            if elapsed >= seconds:
+                break
+        best = max(best, calls * n_words / elapsed)
+    return best
+
+
+def run_language(language: str, seconds: float = 0.5, repeats: int = 3):
+    from braille_transcriptor.strategies import get_strategy
+
+    grade1 = get_strategy(language).grade1
+    lines = corpus(language)
+    n_words = sum(len(line.split()) for line in lines)
+    entry = {"words": n_words}
+    try:
+        encoded = [grade1.to_braille(line) for line in lines]
+        entry["to_braille"] = words_per_second(grade1.to_braille, lines, n_words, seconds, repeats)
+    except Exception as e:
+        return dict(entry, error=f"to_braille: {type(e).__name__}: {e}")
+    try:
+        entry["from_braille"] = words_per_second(grade1.from_braille, encoded, n_words, seconds, repeats)
+    except Exception as e:
+        entry["error"] = f"from_braille: {type(e).__name__}: {e}"
+    return entry
+
+
+def compare(current, reference):
+    print(f"\nCompared with {reference['environment'].get('commit', '?')} (ratio > 1 = faster now):")
+    for language, entry in current["languages"].items():
+        prev = reference["languages"].get(language, {})
+        for direction in ("to_braille", "from_braille"):
+            if direction not in entry or direction not in prev:
+                continue
+            ratio = entry[direction] / prev[direction] if prev[direction] > 0 else float("inf")
+            flag = " !" if ratio < 1 / REGRESSION_RATIO else ""
+            print(f"  {language:<10}{direction:<14}{prev[direction]:>12,.0f} -> {entry[direction]:>12,.0f} w/s"
+                  f"  ({ratio:.2f}x){flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Words/sec of the braille codecs.")
+    parser.add_argument("--languages", nargs="+", default=LANGUAGES, choices=LANGUAGES)
+    parser.add_argument("--seconds", type=float, default=0.5, help="minimum run time per measurement")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--out", type=Path, default=None, help="JSON output (default: results/codec_<commit>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="earlier JSON result to compare with")
+    args = parser.parse_args(argv)
+
+    report = {
+        "environment": {"commit": _git_commit(), "python": platform.python_version()},
+        "languages": {language: run_language(language, args.seconds, args.repeats) for language in args.languages},
+    }
+    print(f"{'language':<10}{'words':>7}{'to_braille':>16}{'from_braille':>16}")
+    for language, entry in report["languages"].items():
+        rates = [f"{entry[d]:>12,.0f} w/s" if d in entry else f"{'-':>16}" for d in ("to_braille", "from_braille")]
+        print(f"{language:<10}{entry['words']:>7}{''.join(rates)}  {entry.get('error', '')}")
+
+    out = args.out or RESULTS_DIR / f"codec_{report['environment']['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {out}")
+
+    if args.compare is not None:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
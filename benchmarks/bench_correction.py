@@ -0,0 +1,70 @@
+"""
+Accuracy and speed of the lexicon post-correction (braille_transcriptor/correction.py).
+
+    python -m benchmarks.bench_correction --language russian
+
+Measures the opt-in fuzzy search (correct(word, fuzzy=True)). Every lexicon word of 5+
+letters gets one cell misread by a single flipped dot (seeded), as the recognizer does; we
+report how many misreads come back as the right word, how many are turned into another
+word, and words/sec with a cold cache. "clean" is the sample text
+with no misreads, the common case: only known-word lookups.
+"""
+import argparse
+import random
+import time
+
+from benchmarks.synthetic import SAMPLE_TEXT
+
+
+def misread(word: str, letters: dict, rng):
+    """word with one letter swapped for the letter whose cell differs by one random dot"""
+    cells = {cell: letter for letter, cell in letters.items()}
+    i = rng.randrange(len(word))
+    if word[i] not in letters:
+        return word
+    flipped = chr(0x2800 + ((ord(letters[word[i]]) - 0x2800) ^ (1 << rng.randrange(6))))
+    return word[:i] + cells[flipped] + word[i+1:] if flipped in cells else word
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lexicon post-correction: misread recovery and words/sec.")
+    parser.add_argument("--language", default="russian")
+    parser.add_argument("--rounds", type=int, default=3, help="misreads generated per lexicon word")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from braille_transcriptor.braille_alphabets import Dictionary
+    from braille_transcriptor.correction import get_corrector
+
+    t0 = time.perf_counter()
+    corrector = get_corrector(args.language)
+    load_s = time.perf_counter() - t0
+    print(f"loaded {len(corrector.words)} words, {len(corrector.fixes)} fixes in {load_s * 1000:.0f}ms")
+
+    alpha = getattr(Dictionary, args.language.capitalize()).value.grade1_map['alpha']
+    letters = {k: v for k, v in alpha.items() if len(k) == 1}
+    rng = random.Random(args.seed)
+    cases = [(word, misread(word, letters, rng)) for word in corrector.words if len(word) >= 5
+             for _ in range(args.rounds)]
+    cases = [(word, read) for word, read in cases if read != word and read not in corrector.words]
+
+    corrector._cache.clear()
+    t0 = time.perf_counter()
+    results = [corrector.correct(read, fuzzy=True) for _, read in cases]
+    cold = len(cases) / (time.perf_counter() - t0)
+    fixed = sum(result == word for (word, _), result in zip(cases, results))
+    wrong = sum(result not in (None, word) for (word, _), result in zip(cases, results))
+    print(f"misreads  {len(cases):>6}  fixed {fixed / len(cases):6.1%}  miscorrected {wrong / len(cases):6.1%}"
+          f"  {cold:>10,.0f} words/s (cold)")
+
+    text = SAMPLE_TEXT.get(args.language.capitalize(), "")
+    words = [w.strip(".,;:!?()") for w in text.lower().split()] * 50
+    if words:
+        t0 = time.perf_counter()
+        changed = sum(corrector.correct(w, fuzzy=True) is not None for w in words)
+        print(f"clean     {len(words):>6}  changed {changed / len(words):6.1%}"
+              f"  {len(words) / (time.perf_counter() - t0):>27,.0f} words/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Import-time profile of the entry points, each in a fresh interpreter.
+
+    python -m benchmarks.bench_imports
+    python -m benchmarks.bench_imports --compare benchmarks/results/imports_<older>.json
+
+For every target a child `python -X importtime` runs the snippet --repeats times; we keep
+the median wall time of the snippet itself, which heavy packages ended up loaded (torch,
+ultralytics, cv2, ...) and the slowest imports by cumulative time from the last run.
+"translate" is a text-only worker: it should not load numpy, torch or any model code.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.bench_pipeline import RESULTS_DIR, REGRESSION_RATIO, _git_commit
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# name -> snippet run in a fresh interpreter
+TARGETS = {
+    "translate": "from braille_transcriptor.strategies import get_strategy; "
+                 "get_strategy('Russian').grade1.from_braille('⠘⠊⠺⠁⠝')",
+    "recognize_chars": "import recognize_chars",
+    "detect_and_crop": "import detect_and_crop",
+    "pipeline": "import pipeline",
+    "batch_cli": "import batch_cli",
+    "torch (reference)": "import torch",
+    "ultralytics (reference)": "from ultralytics import YOLO",
+}
+HEAVY = ["numpy", "PIL", "cv2", "torch", "torchvision", "ultralytics", "onnxruntime", "pypdfium2", "streamlit"]
+
+_CHILD = """
+import sys, time
+print("PRELOADED", ",".join(sys.modules))
+t0 = time.perf_counter()
+exec({snippet!r})
+seconds = time.perf_counter() - t0
+print("RESULT", seconds, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def _slowest(importtime_log: str, top: int, preloaded=()):
+    """
+    Top cumulative entries of `python -X importtime` stderr, as (module, ms).
+    preloaded: modules imported by interpreter startup (site, encodings, ...), left out
+    """
+    rows = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # nested imports are indented under their parent
+        rows.append((name[1:], int(cumulative) / 1000))
+    # only top-level imports: their cumulative time covers everything below them
+    top_level = [(name, ms) for name, ms in rows if not name.startswith(" ") and name not in preloaded]
+    return sorted(top_level, key=lambda row: -row[1])[:top]
+
+
+def profile(snippet: str, repeats: int = 5, top: int = 8):
+    times, loaded, preloaded, log = [], [], [], ""
+    command = [sys.executable, "-X", "importtime", "-c", _CHILD.format(snippet=snippet, heavy=HEAVY)]
+    for _ in range(repeats):
+        out = subprocess.run(command, capture_output=True, text=True, cwd=ROOT)
+        lines = dict(line.split(" ", 1) for line in out.stdout.splitlines() if line.startswith(("RESULT", "PRELOADED")))
+        if out.returncode != 0 or "RESULT" not in lines:
+            return {"error": (out.stderr.strip().splitlines() or ["failed"])[-1]}
+        seconds, _, modules = lines["RESULT"].partition(" ")
+        times.append(float(seconds))
+        loaded = [m for m in modules.split(",") if m]
+        preloaded = lines.get("PRELOADED", "").split(",")
+        log = out.stderr
+    return {
+        "ms": statistics.median(times) * 1000,
+        "loaded": loaded,
+        "slowest": _slowest(log, top, set(preloaded)),
+    }
+
+
+def compare(current, reference):
+    print(f"\nCompared with {reference['environment'].get('commit', '?')} (ratio > 1 = slower now):")
+    for name, entry in current["targets"].items():
+        prev = reference["targets"].get(name, {})
+        if "ms" not in entry or "ms" not in prev:
+            continue
+        ratio = entry["ms"] / prev["ms"] if prev["ms"] > 0 else float("inf")
+        flag = " !" if ratio > REGRESSION_RATIO else ""
+        print(f"  {name:<26}{prev['ms']:8.1f}ms -> {entry['ms']:8.1f}ms  ({ratio:.2f}){flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import time of the entry points in fresh interpreters.")
+    parser.add_argument("--targets", nargs="+", default=list(TARGETS), choices=list(TARGETS))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="slowest imports listed per target")
+    parser.add_argument("--out", type=Path, default=None, help="JSON output (default: results/imports_<commit>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="earlier JSON result to compare with")
+    args = parser.parse_args(argv)
+
+    report = {
+        "environment": {"commit": _git_commit(), "python": sys.version.split()[0]},
+        "targets": {name: profile(TARGETS[name], args.repeats, args.top) for name in args.targets},
+    }
+    for name, entry in report["targets"].items():
+        if "error" in entry:
+            print(f"{name:<26}error: {entry['error']}")
+            continue
+        print(f"{name:<26}{entry['ms']:8.1f}ms  loads: {', '.join(entry['loaded']) or '-'}")
+        for module, ms in entry["slowest"]:
+            print(f"{'':<28}{module:<32}{ms:8.1f}ms")
+
+    out = args.out or RESULTS_DIR / f"imports_{report['environment']['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {out}")
+
+    if args.compare is not None:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Stage-level benchmark of the page pipeline on synthetic braille pages.
+
+    python -m benchmarks.bench_pipeline --dpi 150 200 300 --density 0.25 1.0
+    python -m benchmarks.bench_pipeline --compare benchmarks/results/<older>.json
+
+Every (dpi, density) case renders a synthetic page (benchmarks/synthetic.py), encodes it to
+PNG and times each pipeline stage separately: decode, detect, crop, recognize, assemble,
+translate and render (overlay), median over --repeats runs after one warm-up run.
+Runs offline on CPU: detection defaults to the classical blob detector and, without
+--recog, BrailleNet runs with untrained weights (same cost, meaningless labels).
+Results go to benchmarks/results/<git commit>.json (git-ignored); --compare prints per-stage ratios
+against an earlier file and flags slowdowns.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.synthetic import render_page
+
+RESULTS_DIR = Path(__file__).parent / "results"
+STAGE_NAMES = ["decode", "detect", "crop", "recognize", "assemble", "translate", "render"]
+# a stage this much slower than the reference run is reported as a regression
+REGRESSION_RATIO = 1.2
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=Path(__file__).parent, timeout=10)
+        return out.stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def environment():
+    import torch
+
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "torch": torch.__version__,
+        "torch_threads": torch.get_num_threads(),
+        "numpy": np.__version__,
+    }
+
+
+def untrained_weights(path: Path):
+    """Save a randomly initialized BrailleNet state dict (fixed seed) for offline timing runs."""
+    import torch
+    from models.model_definition import BrailleNet
+    from recognize_chars import CLASS_NAMES
+
+    torch.manual_seed(0)
+    torch.save(BrailleNet(num_classes=len(CLASS_NAMES)).state_dict(), path)
+    return path
+
+
+def time_page(png: bytes, config):
+    """One pass through every stage; returns {stage: seconds} and the PageResult."""
+    from pipeline import PageJob, STAGES, run_stage, finish_job
+
+    job = PageJob(Image.open(BytesIO(png)))
+    for name, fn in STAGES:
+        run_stage(name, fn, job, config)
+    result = finish_job(job, config)
+    return dict(result.timings), result
+
+
+def run_case(language, dpi, density, config, repeats: int = 3, seed: int = 0):
+    page = render_page(language, dpi, density, seed)
+    buffer = BytesIO()
+    page.image.save(buffer, format="PNG")
+    png = buffer.getvalue()
+
+    time_page(png, config)  # warm-up: model loads, allocator, caches
+    runs = []
+    for _ in range(repeats):
+        timings, result = time_page(png, config)
+        runs.append(timings)
+
+    stages = {name: statistics.median(run.get(name, 0.0) for run in runs) * 1000 for name in STAGE_NAMES}
+    total = sum(stages.values())
+    return {
+        "language": language,
+        "dpi": dpi,
+        "density": density,
+        "page_size": list(page.image.size),
+        "cells_expected": len(page.cells),
+        "cells_detected": len(result.unicode),
+        "stages_ms": stages,
+        "total_ms": total,
+        "cells_per_sec": len(result.unicode) / (total / 1000) if total > 0 else 0.0,
+    }
+
+
+def _case_key(case):
+    return (case["language"], case["dpi"], case["density"])
+
+
+def compare(current, reference):
+    """Print per-stage time ratios current / reference for the cases both runs share."""
+    old = {_case_key(case): case for case in reference["cases"]}
+    print(f"\nCompared with {reference['environment'].get('commit', '?')} (ratio > 1 = slower now):")
+    regressions = 0
+    for case in current["cases"]:
+        prev = old.get(_case_key(case))
+        if prev is None:
+            continue
+        parts = []
+        for name in STAGE_NAMES + ["total"]:
+            new_ms = case["total_ms"] if name == "total" else case["stages_ms"][name]
+            old_ms = prev["total_ms"] if name == "total" else prev["stages_ms"].get(name, 0.0)
+            if old_ms < 1.0:  # sub-millisecond stages are mostly noise
+                continue
+            ratio = new_ms / old_ms
+            flag = "!" if ratio > REGRESSION_RATIO else ""
+            regressions += bool(flag)
+            parts.append(f"{name} {ratio:.2f}{flag}")
+        print(f"  {case['language']} {case['dpi']}dpi d={case['density']}: " + "  ".join(parts))
+    if regressions:
+        print(f"{regressions} stage timings more than {REGRESSION_RATIO:.1f}x slower (marked !)")
+
+
+def print_cases(cases):
+    header = f"{'case':<24}{'cells':>7}" + "".join(f"{name:>11}" for name in STAGE_NAMES) + f"{'total':>11}"
+    print(header)
+    for case in cases:
+        label = f"{case['language'][:2]} {case['dpi']}dpi d={case['density']}"
+        print(f"{label:<24}{case['cells_detected']:>7}"
+              + "".join(f"{case['stages_ms'][name]:>9.1f}ms" for name in STAGE_NAMES)
+              + f"{case['total_ms']:>9.1f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-stage pipeline benchmark on synthetic braille pages.")
+    parser.add_argument("--dpi", type=int, nargs="+", default=[150, 200, 300])
+    parser.add_argument("--density", type=float, nargs="+", default=[0.25, 1.0])
+    parser.add_argument("--language", default="Russian")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--detector", default="blob", choices=["blob", "yolo"])
+    parser.add_argument("--yolo", type=Path, default=Path("models") / "yolo8l.pt")
+    parser.add_argument("--recog", type=Path, default=None, help="BrailleNet weights (default: untrained)")
+    parser.add_argument("--threads", type=int, default=None, help="torch CPU threads")
+    parser.add_argument("--out", type=Path, default=None, help="JSON output (default: results/<commit>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="earlier JSON result to compare with")
+    args = parser.parse_args(argv)
+
+    # CPU numbers only: hide GPUs before torch is imported (the pipeline picks cuda when it can)
+    os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+    import torch
+    from pipeline import PipelineConfig
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        recog = args.recog or untrained_weights(Path(tmp) / "braillenet_untrained.pth")
+        config = PipelineConfig(yolo_model_path=args.yolo, recog_model_path=recog, language=args.language,
+                                detector=args.detector, render=True)
+
+        start = time.perf_counter()
+        cases = [run_case(args.language, dpi, density, config, args.repeats)
+                 for dpi in args.dpi for density in args.density]
+        elapsed = time.perf_counter() - start
+
+    report = {
+        "environment": environment(),
+        "config": {"detector": args.detector, "recog": str(args.recog) if args.recog else "untrained",
+                   "repeats": args.repeats},
+        "elapsed_s": elapsed,
+        "cases": cases,
+    }
+    print_cases(cases)
+
+    out = args.out or RESULTS_DIR / f"{report['environment']['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {out}")
+
+    if args.compare is not None:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
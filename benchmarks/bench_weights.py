@@ -0,0 +1,143 @@
+"""
+Cold start and per-worker memory of the model weights: pickled checkpoints vs memory-mapped.
+
+    python -m benchmarks.bench_weights --workers 4
+    python -m benchmarks.bench_weights --yolo models/yolo8l.pt --recog models/recognition_model.pth
+
+Starts --workers fresh processes per mode, each loading + warming BrailleNet and YOLO
+through the model registry, and keeps them all alive until every one has reported:
+load / first-inference / cold-start (both) time, RSS, and from /proc smaps_rollup the USS (private pages) and PSS (shared pages
+split between the processes mapping them). Summed PSS is what the node actually pays.
+  legacy: the .pt / .pth files as they are (torch.load copies, ultralytics unpickles + fuses)
+  mmap:   models/mmap_weights.py artifacts (mapped state dicts, assigned without copies)
+Without --yolo a random YOLOv8 of --yolo-scale is built from the ultralytics config (offline);
+without --recog BrailleNet gets random weights. Timing and memory do not depend on values.
+"""
+import argparse
+import json
+import multiprocessing
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_pipeline import RESULTS_DIR, environment, untrained_weights
+
+
+def memory_info():
+    """returns: {rss, pss, uss} bytes of this process (pss/uss need linux /proc)"""
+    try:
+        with open("/proc/self/smaps_rollup", "r") as f:
+            next(f)  # address range header
+            kb = {}
+            for line in f:
+                key, value = line.split(":", 1)
+                kb[key] = int(value.split()[0]) * 1024
+        info = {"rss": kb.get("Rss"), "pss": kb.get("Pss"),
+                "uss": kb.get("Private_Clean", 0) + kb.get("Private_Dirty", 0)}
+    except OSError:
+        from metrics import _max_rss_bytes
+        info = {"rss": _max_rss_bytes(), "pss": None, "uss": None}
+    return info
+
+
+def random_yolo(path: Path, scale: str = "l"):
+    """Random-weight YOLOv8 saved like a trained ultralytics checkpoint (half-precision pickled model)."""
+    import torch
+    from ultralytics.nn.tasks import DetectionModel
+
+    model = DetectionModel(f"yolov8{scale}.yaml", nc=1, verbose=False)
+    torch.save({"model": model.half(), "ema": None, "train_args": {}}, path)
+    return path
+
+
+def _worker(yolo_path, recog_path, torch_threads, barrier, results):
+    t0 = time.perf_counter()
+    import torch
+    from models.registry import registry, LOADERS
+
+    torch.set_num_threads(torch_threads)
+    t1 = time.perf_counter()
+    yolo = registry.get_yolo(str(yolo_path), "cpu")
+    recog = registry.get_braillenet(str(recog_path), "cpu")
+    t2 = time.perf_counter()
+    # first inference (ultralytics sets its predictor up here)
+    LOADERS["yolo"][1](yolo, "cpu")
+    LOADERS["braillenet"][1](recog, "cpu")
+    t3 = time.perf_counter()
+    record = {"import_s": t1 - t0, "load_s": t2 - t1, "warm_s": t3 - t2, "cold_start_s": t3 - t1}
+    # everybody loaded: now shared pages are split between all workers
+    barrier.wait()
+    record.update(memory_info())
+    results.put(record)
+    barrier.wait()
+
+
+def run_mode(yolo_path, recog_path, workers: int, torch_threads: int = 1):
+    ctx = multiprocessing.get_context("spawn")
+    barrier, results = ctx.Barrier(workers), ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(yolo_path, recog_path, torch_threads, barrier, results))
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+    records = [results.get(timeout=600) for _ in procs]
+    for p in procs:
+        p.join()
+
+    def median(key):
+        values = [r[key] for r in records if r.get(key) is not None]
+        return statistics.median(values) if values else None
+
+    return {
+        "workers": workers,
+        "load_s": median("load_s"),
+        "warm_s": median("warm_s"),
+        "cold_start_s": median("cold_start_s"),
+        "import_s": median("import_s"),
+        "rss_mb": median("rss") / 2 ** 20,
+        "uss_mb": median("uss") / 2 ** 20 if median("uss") is not None else None,
+        "pss_mb": median("pss") / 2 ** 20 if median("pss") is not None else None,
+        "node_pss_mb": sum(r["pss"] for r in records) / 2 ** 20 if median("pss") is not None else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Weight loading: pickled vs memory-mapped artifacts.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--yolo", type=Path, default=None, help="ultralytics .pt (default: random YOLOv8)")
+    parser.add_argument("--yolo-scale", default="l", choices=list("nsmlx"))
+    parser.add_argument("--recog", type=Path, default=None, help="BrailleNet .pth (default: untrained)")
+    parser.add_argument("--out", type=Path, default=None, help="JSON output (default: results/weights_<commit>.json)")
+    args = parser.parse_args(argv)
+
+    from models.mmap_weights import export_yolo, export_state_dict, load_state_dict
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        yolo = args.yolo or random_yolo(tmp / f"yolov8{args.yolo_scale}.pt", args.yolo_scale)
+        recog = args.recog or untrained_weights(tmp / "braillenet.pth")
+        yolo_mmap, _ = export_yolo(yolo, tmp / ("yolo" + ".mmap.pt"))
+        recog_mmap = export_state_dict(load_state_dict(recog), tmp / "braillenet.mmap.pth")
+
+        report = {"environment": environment(), "yolo": str(args.yolo or f"random yolov8{args.yolo_scale}"),
+                  "modes": {}}
+        for mode, paths in (("legacy", (yolo, recog)), ("mmap", (yolo_mmap, recog_mmap))):
+            # first pass warms the page cache so both modes read from memory
+            run_mode(*paths, workers=1)
+            report["modes"][mode] = run_mode(*paths, workers=args.workers)
+
+    print(f"{'mode':<8}{'workers':>8}{'load':>9}{'warmup':>9}{'cold':>9}"
+          f"{'RSS':>10}{'USS':>10}{'PSS':>10}{'node PSS':>11}")
+    for mode, r in report["modes"].items():
+        print(f"{mode:<8}{r['workers']:>8}{r['load_s']:>8.2f}s{r['warm_s']:>8.2f}s{r['cold_start_s']:>8.2f}s"
+              f"{r['rss_mb']:>8.0f}MB{r['uss_mb'] or 0:>8.0f}MB{r['pss_mb'] or 0:>8.0f}MB{r['node_pss_mb'] or 0:>9.0f}MB")
+
+    out = args.out or RESULTS_DIR / f"weights_{report['environment']['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {out}")
+
+
+if __name__ == "__main__":
+    main()
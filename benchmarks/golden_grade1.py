@@ -0,0 +1,160 @@
+"""
+Golden corpus of the English and French Grade 1 decoders.
+
+    python -m benchmarks.golden_grade1            # check the current decoders against the data file
+    python -m benchmarks.golden_grade1 --write    # (re)record it from the current decoders
+
+benchmarks/data/grade1_golden.json holds [braille, from_braille output, exception type] cases
+(one of the last two is null) for seeded random cell strings, hand-picked indicator runs and
+the encoded sample text. The alphabets shipped in this tree only hold the indicators, so the corpus also runs every decoder on fixture alphabets with
+letters, digits and punctuation, one of them with two-cell capital word / terminator indicators.
+"""
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+from braille_transcriptor.braille_alphabets import BrailleAlphabet, Dictionary
+from benchmarks.synthetic import SAMPLE_TEXT
+
+DATA_FILE = Path(__file__).parent / "data" / "grade1_golden.json"
+SEED = 2022
+WORDS_PER_ALPHABET = 200
+
+_LETTERS = dict(zip("abcdefghijklmnopqrstuvwxyz", "⠁⠃⠉⠙⠑⠋⠛⠓⠊⠚⠅⠇⠍⠝⠕⠏⠟⠗⠎⠞⠥⠧⠺⠭⠽⠵"))
+_DIGITS = dict(zip("1234567890", "⠁⠃⠉⠙⠑⠋⠛⠓⠊⠚"))
+# overlapping and back-to-back indicators, numbers running into letters, quotes
+EDGE_CASES = ["⠠⠠⠄⠁⠃", "⠁⠠⠠⠄⠃⠠⠠", "⠠⠄⠠⠠⠁", "⠼⠁⠠⠠⠃⠠⠄⠉", "⠼⠁⠃⠰⠉", "⠼⠁⠃⠉⠙", "⠘⠁⠼⠃⠘", "⠨⠁⠃⠱⠉",
+              "⠨⠱⠨", "⠘⠘⠁", "⠦⠁⠃⠴", "⠦⠦⠁⠴⠴", "⠁⠴", "⠼⠱⠁", "⠱⠼⠁", "⠠", "⠠⠠", "⠄⠠",
+              # recognizer noise: an unmatched closing quote before a capital on a non-letter
+              "⠴⠘⠂", "⠁⠴⠘⠆", "⠦⠁⠴⠴⠘⠂", "⠭⠅⠨⠙⠴⠇⠘⠆", "⠘⠼⠁", "⠠⠂⠴"]
+_CHARS = {' ': '⠀', ',': '⠂', ';': '⠆', ':': '⠒', '.': '⠲', '!': '⠖', '“': '⠦', '”': '⠴', '-': '⠤'}
+
+
+class _FixtureAlphabet(BrailleAlphabet):
+    """Complete grade 1 table; indicators given as (capital_word, capital_symbol, capital_terminator)"""
+
+    def __init__(self, indicators=("⠨", "⠘", "⠱")):
+        super().__init__()
+        capital_word, capital_symbol, capital_terminator = indicators
+        self.grade1_map = {
+            'alpha': {'capital_word': capital_word, 'capital_symbol': capital_symbol,
+                      'capital_terminator': capital_terminator, 'alpha': '⠰', **_LETTERS},
+            'numeric': {'numeric': '⠼', **_DIGITS},
+            'char': dict(_CHARS),
+        }
+
+
+class _Outer:
+    def __init__(self, dictionary):
+        self.dictionary = dictionary
+
+
+def alphabets():
+    """name -> (language, alphabet)"""
+    return {
+        "english": ("english", Dictionary.English.value),
+        "french": ("french", Dictionary.French.value),
+        "english-full": ("english", _FixtureAlphabet()),
+        "french-full": ("french", _FixtureAlphabet()),
+        "english-two-cell": ("english", _FixtureAlphabet(("⠠⠠", "⠠", "⠠⠄"))),
+        "french-two-cell": ("french", _FixtureAlphabet(("⠠⠠", "⠠", "⠠⠄"))),
+    }
+
+
+def decoder(language: str, alphabet):
+    """Grade1 of language bound to alphabet"""
+    if language == "english":
+        from braille_transcriptor.strategies.english import EnglishStrategy as strategy
+    else:
+        from braille_transcriptor.strategies.french import FrenchStrategy as strategy
+    return strategy.Grade1(_Outer(alphabet))
+
+
+def corpus(language: str, alphabet, seed: int = SEED, n_words: int = WORDS_PER_ALPHABET):
+    """Random cell strings over the alphabet's cells (plus an unknown cell and a latin letter)."""
+    rng = random.Random(seed)
+    grade1_map = alphabet.grade1_map
+    cells = sorted({c for section in grade1_map.values() for value in section.values() for c in value} | {"⠿", "x"})
+    space = grade1_map['char'][" "]
+    lines = list(EDGE_CASES)
+    for _ in range(n_words):
+        words = ["".join(rng.choice(cells) for _ in range(rng.randint(1, 8))) for _ in range(rng.randint(1, 3))]
+        lines.append(space.join(words))
+    # the encoded sample text (capitals, digits, punctuation) of both languages
+    grade1 = decoder(language, alphabet)
+    for text in (SAMPLE_TEXT["English"], SAMPLE_TEXT["French"], "ABC def 12ab WORD Mixed 3x IT'S 2024!"):
+        try:
+            lines.append(grade1.to_braille(text))
+        except (KeyError, IndexError):
+            pass
+    return lines
+
+
+def decode(grade1, braille: str):
+    """returns: (text, None) or (None, exception type name)"""
+    try:
+        return grade1.from_braille(braille), None
+    except Exception as e:
+        return None, type(e).__name__
+
+
+def record():
+    golden = {}
+    for name, (language, alphabet) in alphabets().items():
+        grade1 = decoder(language, alphabet)
+        golden[name] = [[braille, *decode(grade1, braille)] for braille in corpus(language, alphabet)]
+    return golden
+
+
+def verify(golden):
+    """returns: list of (alphabet, braille, expected, actual) mismatches"""
+    mismatches = []
+    available = alphabets()
+    for name, cases in golden.items():
+        language, alphabet = available[name]
+        grade1 = decoder(language, alphabet)
+        for braille, *expected in cases:
+            actual = list(decode(grade1, braille))
+            if actual != expected:
+                mismatches.append((name, braille, expected, actual))
+    return mismatches
+
+
+def write(golden, path: Path):
+    # one case per line keeps diffs of the data file readable
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{\n")
+        for i, (name, cases) in enumerate(golden.items()):
+            f.write(f"{json.dumps(name)}: [\n")
+            f.write(",\n".join(json.dumps(case, ensure_ascii=False) for case in cases))
+            f.write("\n]" + (",\n" if i < len(golden) - 1 else "\n"))
+        f.write("}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Golden corpus of the Grade 1 decoders.")
+    parser.add_argument("--write", action="store_true", help="record the data file from the current decoders")
+    parser.add_argument("--data", type=Path, default=DATA_FILE)
+    args = parser.parse_args(argv)
+
+    if args.write:
+        golden = record()
+        write(golden, args.data)
+        print(f"wrote {sum(map(len, golden.values()))} cases to {args.data}")
+        return 0
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        golden = json.load(f)
+    mismatches = verify(golden)
+    total = sum(map(len, golden.values()))
+    for name, braille, expected, actual in mismatches[:20]:
+        print(f"{name}: {braille!r}\n  expected {expected!r}\n  actual   {actual!r}")
+    print(f"{total - len(mismatches)}/{total} cases match")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
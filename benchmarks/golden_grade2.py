@@ -0,0 +1,164 @@
+"""
+Golden corpus of the English Grade 2 engine, on a fixture contraction table.
+
+    python -m benchmarks.golden_grade2            # check Grade2 against the data file and the round trips
+    python -m benchmarks.golden_grade2 --write    # (re)record the data file from the current engine
+
+The shipped English grade2_map is empty, so EnglishStrategy never builds Grade2; every case
+here runs it on _FixtureGrade2 (20 whole-word signs, 17 group signs, UEB cells).
+ROUND_TRIPS must come back from from_braille(to_braille(text)) unchanged and DECODES must
+decode as written: they pin down whole-word signs, longest-first overlapping group signs,
+the space cell between words, letters after numbers and grade 1 passages. Grade 2 drops
+capitals in both directions (the indicators are filtered out before the capital pass), so
+round trips are lowercase.
+benchmarks/data/grade2_golden.json records [text, braille, exception type] encodings and
+[braille, text, exception type] decodes of seeded random words and cell strings and of the
+sample text, so any other change of behaviour shows up against it.
+"""
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+from braille_transcriptor.braille_alphabets import BrailleAlphabet
+from benchmarks.golden_grade1 import _LETTERS, _DIGITS, _CHARS, write
+from benchmarks.synthetic import SAMPLE_TEXT
+
+DATA_FILE = Path(__file__).parent / "data" / "grade2_golden.json"
+SEED = 2023
+WORDS = 300
+
+STANDALONE = {'but': '⠃', 'can': '⠉', 'do': '⠙', 'every': '⠑', 'from': '⠋', 'go': '⠛', 'have': '⠓',
+              'just': '⠚', 'like': '⠇', 'more': '⠍', 'not': '⠝', 'people': '⠏', 'so': '⠎', 'that': '⠞',
+              'us': '⠥', 'very': '⠧', 'will': '⠺', 'it': '⠭', 'you': '⠽', 'as': '⠵'}
+GROUP_SIGNS = {'and': '⠯', 'for': '⠿', 'of': '⠷', 'the': '⠮', 'with': '⠾', 'ing': '⠬', 'ch': '⠡', 'sh': '⠩',
+               'th': '⠹', 'wh': '⠱', 'ou': '⠳', 'st': '⠌', 'ar': '⠜', 'ed': '⠫', 'er': '⠻', 'ow': '⠪', 'gh': '⠣'}
+
+ROUND_TRIPS = [
+    # whole-word signs
+    "but", "you", "people", "it", "but you can not go",
+    # group signs, overlapping ones longest first (with+er, not w+i+th+er; the, not th+e)
+    "father", "mother", "together", "wither", "theirs", "thing", "shouting", "knowing", "although",
+    "children", "ched", "standard", "forward", "ofthe",
+    # words whose letters spell a group sign only across a sign boundary
+    "bus", "rather", "whether",
+    # several words, numbers, letters after a number (kept behind the letter indicator)
+    "the father and mother", "hello world", "abc123", "12", "for the shouting children",
+    "12a", "3rd", "a1b2", "12and",
+]
+# braille -> text
+DECODES = [
+    ("⠃", "but"),              # whole-word sign
+    ("⠰⠃", "b"),               # grade 1 indicator: the letter, not the word sign
+    ("⠰⠃⠥⠞", "but"),           # grade 1 passage: letters only
+    ("⠾⠻", "wither"),
+    ("⠮⠀⠯⠀⠍⠕⠮⠗", "the and mother"),
+    ("⠼⠁⠃⠰⠁", "12a"),
+    ("⠿", "for"),
+]
+
+
+class _FixtureGrade2(BrailleAlphabet):
+    """Grade 2 table with the two-cell capital indicators of golden_grade1's fixtures"""
+
+    def __init__(self):
+        super().__init__()
+        self.grade2_map = {
+            'alpha': {'capital_word': '⠠⠠', 'capital_symbol': '⠠', 'capital_terminator': '⠠⠄', 'alpha': '⠰',
+                      **_LETTERS},
+            'numeric': {'numeric': '⠼', **_DIGITS},
+            'char': dict(_CHARS),
+            'standalone': dict(STANDALONE),
+            'group_sign': dict(GROUP_SIGNS),
+        }
+
+
+class _Outer:
+    def __init__(self, dictionary):
+        self.dictionary = dictionary
+
+
+def engine():
+    from braille_transcriptor.strategies.english import EnglishStrategy
+
+    return EnglishStrategy.Grade2(_Outer(_FixtureGrade2()))
+
+
+def corpus(seed: int = SEED, n_words: int = WORDS):
+    """returns: (texts to encode, cell strings to decode)"""
+    rng = random.Random(seed)
+    # words built from group signs and letters, so signs overlap and run into each other
+    pieces = list(GROUP_SIGNS) + list(STANDALONE) + list(_LETTERS)
+    texts = ["".join(rng.choice(pieces) for _ in range(rng.randint(1, 4))) for _ in range(n_words)]
+    texts += ["Hello WORLD", "A1b2 C3", "IT'S 2024!", SAMPLE_TEXT["English"]]
+    grade2_map = _FixtureGrade2().grade2_map
+    cells = sorted({c for section in grade2_map.values() for value in section.values() for c in value} | {"⠿"})
+    space = grade2_map['char'][" "]
+    brailles = [space.join("".join(rng.choice(cells) for _ in range(rng.randint(1, 6)))
+                           for _ in range(rng.randint(1, 3))) for _ in range(n_words)]
+    return texts, brailles
+
+
+def run(function, argument):
+    """returns: (output, None) or (None, exception type name)"""
+    try:
+        return function(argument), None
+    except Exception as e:
+        return None, type(e).__name__
+
+
+def record():
+    grade2 = engine()
+    texts, brailles = corpus()
+    return {
+        "to_braille": [[text, *run(grade2.to_braille, text)] for text in texts],
+        "from_braille": [[braille, *run(grade2.from_braille, braille)] for braille in brailles],
+    }
+
+
+def verify(golden):
+    """returns: list of (case kind, input, expected, actual) mismatches"""
+    grade2 = engine()
+    mismatches = []
+    for kind, function in (("to_braille", grade2.to_braille), ("from_braille", grade2.from_braille)):
+        for argument, *expected in golden[kind]:
+            actual = list(run(function, argument))
+            if actual != expected:
+                mismatches.append((kind, argument, expected, actual))
+    # from_braille ends every result with a space
+    for text in ROUND_TRIPS:
+        actual = run(lambda t: grade2.from_braille(grade2.to_braille(t)).rstrip(" "), text)[0]
+        if actual != text:
+            mismatches.append(("round trip", text, text, actual))
+    for braille, text in DECODES:
+        actual = run(lambda b: grade2.from_braille(b).rstrip(" "), braille)[0]
+        if actual != text:
+            mismatches.append(("decode", braille, text, actual))
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Golden corpus of the Grade 2 engine.")
+    parser.add_argument("--write", action="store_true", help="record the data file from the current engine")
+    parser.add_argument("--data", type=Path, default=DATA_FILE)
+    args = parser.parse_args(argv)
+
+    if args.write:
+        golden = record()
+        write(golden, args.data)
+        print(f"wrote {sum(map(len, golden.values()))} cases to {args.data}")
+        return 0
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        golden = json.load(f)
+    mismatches = verify(golden)
+    total = sum(map(len, golden.values())) + len(ROUND_TRIPS) + len(DECODES)
+    for kind, argument, expected, actual in mismatches[:20]:
+        print(f"{kind}: {argument!r}\n  expected {expected!r}\n  actual   {actual!r}")
+    print(f"{total - len(mismatches)}/{total} cases match")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Regression check of the Russian post-correction: correctly transcribed text must come back
+unchanged, whether or not its words are in the lexicon.
+
+    python -m benchmarks.roundtrip_russian            # exit status 1 on any changed word
+    python -m benchmarks.roundtrip_russian --fuzzy    # also list what the opt-in fuzzy search changes
+
+Each word and sentence below is encoded with to_braille and decoded with from_braille. The
+words are common words and inflected forms that the lexicon (braille_transcriptor/lexicons/
+russian.txt) lacks, several one dot away from a lexicon word (ветер/вечер, ноги/ночи), so a
+correction that treats the lexicon as the whole vocabulary rewrites them. Listed misreadings
+must still be fixed.
+"""
+import argparse
+import sys
+
+SENTENCES = [
+    "Ветер дул, ноги болели. Дочь сказала в большом доме",
+    "Над рекой стоял старый дом, и в его окнах по вечерам горел тёплый свет.",
+]
+# not in the lexicon: everyday words and inflections of lexicon words
+WORDS = """
+ветер ноги дочь большом большую большими кошка собака лошадь корова птица рыба дерево лес
+река море озеро гора поле город деревня улица школа книга письмо слово голос рука голова
+глаза лицо сердце душа мысль время неделя месяц утро полдень вечером ночью зима весна лето
+осень погода дождь снег солнце небо звезда луна облако друг подруга брат сестра сын отец
+мать бабушка дедушка дети люди человек работа деньги вода хлеб молоко мясо чай кофе сахар
+соль стол стул окно дверь стена комната кухня постель лампа часы телефон машина поезд
+дорога мост берег лодка корабль остров страна народ язык история музыка песня картина
+красный синий зелёный белый чёрный новый старый молодой хороший плохой маленький высокий
+низкий длинный короткий тёплый холодный быстро медленно всегда никогда сегодня завтра
+вчера читать писать говорить думать знать видеть слышать любить ждать жить идти бежать
+стоять сидеть лежать спать есть пить работать играть петь смотреть помнить понимать
+домой дома домов рекой реки окнах вечерам горел стоял бегали собирали смеялись уходил пекла
+пела песни яблоки двору самой ночи свет светом старого старому старым
+""".split()
+# (misreading, expected) pairs from the lexicon's exact fixes
+FIXES = [("Сергеевия сказал", "Сергеевич сказал"), ("ояенъ", "очень")]
+
+
+def roundtrip(grade1, text: str):
+    return grade1.from_braille(grade1.to_braille(text))
+
+
+def check(grade1):
+    """returns: list of (input, expected, output) mismatches"""
+    mismatches = []
+    for text in SENTENCES + WORDS:
+        output = roundtrip(grade1, text)
+        if output != text:
+            mismatches.append((text, text, output))
+    for text, expected in FIXES:
+        output = roundtrip(grade1, text)
+        if output != expected:
+            mismatches.append((text, expected, output))
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Russian post-correction leaves correct text unchanged.")
+    parser.add_argument("--fuzzy", action="store_true", help="also report what the opt-in fuzzy search changes")
+    args = parser.parse_args(argv)
+
+    from braille_transcriptor.strategies.russian import RussianStrategy
+
+    grade1 = RussianStrategy().grade1
+    mismatches = check(grade1)
+    for text, expected, output in mismatches:
+        print(f"{text!r}\n  expected {expected!r}\n  actual   {output!r}")
+    total = len(SENTENCES) + len(WORDS) + len(FIXES)
+    print(f"{total - len(mismatches)}/{total} cases unchanged or fixed")
+
+    if args.fuzzy:
+        grade1.fuzzy_correction = True
+        changed = [(text, output) for text, _, output in check(grade1)]
+        print(f"fuzzy search changes {len(changed)}/{total}: "
+              + ", ".join(f"{text} -> {output}" for text, output in changed if " " not in text))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
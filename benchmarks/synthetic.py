@@ -0,0 +1,141 @@
+"""
+Synthetic braille pages for benchmarks.
+
+Text is encoded with the language strategy's grade1.to_braille, word-wrapped onto an A4
+page with standard braille spacing (2.5mm dot pitch, 6.2mm cell pitch, 10mm line pitch,
+1.5mm dots) at the requested DPI, and rendered as dark anti-aliased dots on paper with
+noise and a slight blur. Ground-truth cell boxes use the same framing as the detectors
+(half a dot pitch of margin around the 2x3 grid).
+
+Only the Russian alphabet table is complete at the moment; characters a strategy leaves
+unencoded (e.g. English letters) are skipped, so use Russian for realistic pages.
+"""
+from dataclasses import dataclass, field
+from typing import List
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# mm
+PAGE_SIZE = (210.0, 297.0)
+MARGIN = 15.0
+DOT_PITCH = 2.5
+CELL_PITCH = 6.2
+LINE_PITCH = 10.0
+DOT_DIAMETER = 1.5
+
+BRAILLE_SPACE = "⠀"
+
+SAMPLE_TEXT = {
+    "Russian": (
+        "Над рекой стоял старый дом, и в его окнах по вечерам горел тёплый свет. "
+        "Дети бегали по двору, собирали яблоки и смеялись до самой ночи. "
+        "Утром отец уходил в поле, а мать пекла хлеб и пела песни. "
+        "В школе учитель читал нам книги о далёких странах, морях и горах. "
+        "Мы слушали тихо, боясь пропустить хоть одно слово. "
+        "Зимой снег засыпал дорогу, и до города можно было добраться только на санях. "
+        "Весной вода поднималась, луга становились зелёными, а птицы возвращались с юга. "
+        "Каждый день был похож на предыдущий, но в каждом было что-то новое: 12 учеников, "
+        "3 учителя, 1 библиотека; вопросы, ответы (и снова вопросы)!"
+    ),
+    "English": (
+        "The quick brown fox jumps over the lazy dog near the river bank. "
+        "Reading braille by touch takes practice, patience and good light for the sighted helper."
+    ),
+    "French": (
+        "Le petit chat dort sur la chaise pres de la fenetre ouverte. "
+        "Les enfants lisent des livres en braille a la bibliotheque du quartier."
+    ),
+}
+
+
+@dataclass
+class SyntheticPage:
+    image: Image.Image  # RGB
+    boxes: np.ndarray  # (N,4) int ground-truth cell boxes, reading order
+    cells: List[str] = field(default_factory=list)  # braille unicode per box, reading order
+    lines: List[str] = field(default_factory=list)  # braille text per line (with BRAILLE_SPACE)
+    dpi: int = 200
+    density: float = 1.0
+    skipped: int = 0  # characters to_braille left unencoded
+
+
+def encode_text(text: str, language: str = "Russian"):
+    """
+    Braille words of text via the language strategy.
+    returns: (list of braille words, number of skipped unencoded characters)
+    """
+    from recognize_chars import _get_strategy
+
+    braille = _get_strategy(language).grade1.to_braille(text)
+    kept = [c for c in braille if c == " " or "⠀" <= c <= "⣿"]
+    skipped = len(braille) - len(kept)
+    words = "".join(kept).replace(" ", BRAILLE_SPACE).split(BRAILLE_SPACE)
+    return [w for w in words if w], skipped
+
+
+def _wrap(words, cells_per_line, n_lines):
+    lines, current = [], ""
+    i = 0
+    while len(lines) < n_lines and words:
+        word = words[i % len(words)][:cells_per_line]
+        candidate = word if not current else current + BRAILLE_SPACE + word
+        if len(candidate) > cells_per_line:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+        i += 1
+    return lines
+
+
+def render_page(language: str = "Russian", dpi: int = 200, density: float = 1.0, seed: int = 0,
+                text: str = None, noise: float = 6.0):
+    """
+    Render one synthetic page.
+    density: fraction of the page's braille lines that carry text (0..1]
+    text: source text (default: SAMPLE_TEXT[language], shuffled by seed and repeated to fill)
+    returns: SyntheticPage
+    """
+    rng = np.random.default_rng(seed)
+    if text is None:
+        sentences = SAMPLE_TEXT.get(language, SAMPLE_TEXT["Russian"]).split(". ")
+        rng.shuffle(sentences)
+        text = ". ".join(sentences)
+    words, skipped = encode_text(text, language)
+
+    px = dpi / 25.4
+    width, height = int(PAGE_SIZE[0] * px), int(PAGE_SIZE[1] * px)
+    cells_per_line = int((PAGE_SIZE[0] - 2 * MARGIN - 2 * DOT_PITCH) / CELL_PITCH) + 1
+    n_lines = int((PAGE_SIZE[1] - 2 * MARGIN - 2 * DOT_PITCH) / LINE_PITCH) + 1
+    lines = _wrap(words, cells_per_line, max(1, int(round(n_lines * density))))
+
+    paper = 225
+    page = np.full((height, width), paper, np.float32)
+    pitch, radius = DOT_PITCH * px, DOT_DIAMETER * px / 2
+    shift = 4  # sub-pixel dot centers
+    boxes, cells = [], []
+    for li, line in enumerate(lines):
+        top = (MARGIN + li * LINE_PITCH) * px
+        for ci, cell in enumerate(line):
+            if cell == BRAILLE_SPACE:
+                continue
+            left = (MARGIN + ci * CELL_PITCH) * px
+            bits = ord(cell) - 0x2800
+            for dot in range(6):
+                if bits & (1 << dot):
+                    cx = left + (dot // 3) * pitch
+                    cy = top + (dot % 3) * pitch
+                    ink = float(rng.uniform(50, 90))
+                    cv2.circle(page, (int(round(cx * 2 ** shift)), int(round(cy * 2 ** shift))),
+                               int(round(radius * 2 ** shift)), ink, -1, cv2.LINE_AA, shift)
+            boxes.append((left - pitch / 2, top - pitch / 2, left + 1.5 * pitch, top + 2.5 * pitch))
+            cells.append(cell)
+
+    page = cv2.GaussianBlur(page, (0, 0), max(0.5, px * 0.08))
+    page += rng.normal(0, noise, page.shape).astype(np.float32)
+    gray = np.clip(page, 0, 255).astype(np.uint8)
+    image = Image.fromarray(gray).convert("RGB")
+    boxes = np.round(np.asarray(boxes, dtype=np.float64).reshape(-1, 4)).astype(np.int64)
+    return SyntheticPage(image, boxes, cells, lines, dpi, density, skipped)
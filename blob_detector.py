@@ -0,0 +1,292 @@
+"""
+Classical braille cell detector: dots -> pitch -> 2x3 grid -> cell boxes.
+
+A fast alternative to YOLO for clean embossed / printed scans:
+    1. binarize (Otsu, or adaptive for uneven lighting) and take connected components
+    2. keep dot-like components (size close to the median dot, compact, roughly round)
+    3. estimate the dot pitch from nearest-neighbour spacing and the page skew
+    4. group dots into text lines of three dot rows and into left/right dot columns,
+       pair columns one pitch apart into cells, place single columns on the cell grid
+    5. emit one xyxy box per cell, half a pitch of margin around the dot grid (the same
+       framing as the detector boxes BrailleNet was trained on)
+
+Lines are anchored on their highest dot row; a line where no cell uses dots 1 or 4 is read
+one row too high. Very noisy or handwritten-looking pages should stay on YOLO.
+
+    python blob_detector.py pages/ --yolo models/yolo8l.pt
+
+benchmarks both detectors on a directory of pages and reports how well the boxes agree.
+"""
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from layout import estimate_skew
+
+# standard braille spacing in dot pitches: cell to cell (6.2mm / 2.5mm)
+CELL_PITCH = 2.48
+
+
+def _gray(image):
+    if isinstance(image, np.ndarray):
+        return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if image.ndim == 3 else image
+    return np.asarray(image.convert("L"))
+
+
+def binarize(gray, dark_dots: bool = True, adaptive_block: int = 0):
+    """
+    Foreground mask of the dots (255 = dot).
+    adaptive_block: odd window size for a local mean threshold (0 = global Otsu)
+    """
+    mode = cv2.THRESH_BINARY_INV if dark_dots else cv2.THRESH_BINARY
+    if adaptive_block:
+        return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, mode, adaptive_block, 10)
+    _, mask = cv2.threshold(gray, 0, 255, mode | cv2.THRESH_OTSU)
+    return mask
+
+
+def find_dots(mask, min_area: int = 4):
+    """
+    Centroids of the dot-like connected components.
+    returns: (N,2) float x,y and the median dot diameter
+    """
+    n, _, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    stats, centroids = stats[1:], centroids[1:]  # drop background
+    area = stats[:, cv2.CC_STAT_AREA]
+    w, h = stats[:, cv2.CC_STAT_WIDTH], stats[:, cv2.CC_STAT_HEIGHT]
+    candidates = area >= min_area
+    if not candidates.any():
+        return np.zeros((0, 2)), 0.0
+    median_area = np.median(area[candidates])
+    keep = (candidates & (area >= 0.25 * median_area) & (area <= 4 * median_area)
+            & (w <= 2 * h) & (h <= 2 * w) & (area >= 0.4 * w * h))
+    return centroids[keep], float(np.sqrt(4 * median_area / np.pi))
+
+
+def _nearest_spacing(a, b, band, max_gap):
+    """Gaps along a between consecutive dots of the same band along b (vectorized)."""
+    bands = np.floor(b / band)
+    order = np.lexsort((a, bands))
+    same = bands[order][1:] == bands[order][:-1]
+    gaps = np.diff(a[order])
+    return gaps[same & (gaps > 0) & (gaps <= max_gap)]
+
+
+def estimate_pitch(dots, diameter):
+    """
+    Dot pitch (center to center inside a cell) from the smallest recurring spacing
+    between horizontally and vertically adjacent dots.
+    """
+    if len(dots) < 2 or diameter <= 0:
+        return 0.0
+    gaps = np.concatenate([
+        _nearest_spacing(dots[:, 0], dots[:, 1], diameter, 6 * diameter),
+        _nearest_spacing(dots[:, 1], dots[:, 0], diameter, 6 * diameter),
+    ])
+    gaps = gaps[gaps >= 1.2 * diameter]
+    if not len(gaps):
+        return 2.0 * diameter
+    smallest = np.percentile(gaps, 10)
+    return float(np.median(gaps[gaps <= 1.25 * smallest]))
+
+
+def _clusters(values, gap):
+    """Split sorted values where consecutive ones are more than gap apart; returns labels."""
+    return np.concatenate([[0], np.cumsum(np.diff(values) > gap)])
+
+
+def _line_cells(xs, pitch):
+    """
+    Left dot-column x of every cell of one text line.
+    xs: x of the dots of the line
+    """
+    xs = np.sort(xs)
+    col_id = _clusters(xs, pitch / 2)
+    cols = np.array([xs[col_id == c].mean() for c in range(col_id[-1] + 1)])
+
+    lefts, paired = [], []
+    i = 0
+    while i < len(cols):
+        if i + 1 < len(cols) and 0.75 * pitch <= cols[i + 1] - cols[i] <= 1.25 * pitch:
+            lefts.append(cols[i])
+            paired.append(True)
+            i += 2
+        else:
+            lefts.append(cols[i])
+            paired.append(False)
+            i += 1
+    lefts = np.array(lefts)
+    paired = np.array(paired)
+
+    # cell pitch of this line from consecutive full cells, standard spacing otherwise
+    steps = np.diff(lefts[paired]) if paired.sum() > 1 else np.zeros(0)
+    steps = steps[(steps > 1.8 * pitch) & (steps < 3.2 * pitch)]
+    cell_pitch = float(np.median(steps)) if len(steps) else CELL_PITCH * pitch
+
+    # a lone column is a right column when that puts it on the neighbour's cell grid
+    for i in np.flatnonzero(~paired):
+        ref = [j for j in (i - 1, i + 1) if 0 <= j < len(lefts) and paired[j]]
+        if not ref:
+            continue
+        d = lefts[i] - lefts[ref[0]]
+        as_left = abs(d / cell_pitch - round(d / cell_pitch))
+        as_right = abs((d - pitch) / cell_pitch - round((d - pitch) / cell_pitch))
+        if as_right < as_left:
+            lefts[i] -= pitch
+    return lefts
+
+
+def fit_cells(dots, pitch, skew: float = 0.0):
+    """
+    Group dot centroids into 2x3 cells.
+    returns: list of (left column x, top row y) in deskewed coordinates
+    """
+    if not len(dots) or pitch <= 0:
+        return []
+    x = dots[:, 0]
+    y = dots[:, 1] - skew * x  # deskewed
+
+    order = np.argsort(y, kind="stable")
+    row_id = _clusters(y[order], pitch / 2)
+    row_y = np.array([y[order][row_id == r].mean() for r in range(row_id[-1] + 1)])
+
+    cells = []
+    r = 0
+    while r < len(row_y):
+        top = row_y[r]
+        # a text line spans three dot rows, at most two pitches
+        last = r
+        while last + 1 < len(row_y) and row_y[last + 1] - top <= 2.5 * pitch:
+            last += 1
+        line = (row_id >= r) & (row_id <= last)
+        for left in _line_cells(x[order][line], pitch):
+            cells.append((left, top))
+        r = last + 1
+    return cells
+
+
+def detect_blobs(image, dark_dots: bool = True, adaptive_block: int = 0, deskew: bool = True):
+    """
+    Detect braille cells without a neural network.
+    image: PIL image or numpy array (RGB or grayscale)
+    returns: list of (x1,y1,x2,y2) pixel boxes clipped to the page, like detect_and_crop.detect_boxes
+    """
+    gray = _gray(image)
+    img_h, img_w = gray.shape
+    dots, diameter = find_dots(binarize(gray, dark_dots, adaptive_block))
+    pitch = estimate_pitch(dots, diameter)
+    if pitch <= 0:
+        return []
+    skew = estimate_skew(dots[:, 0], dots[:, 1], np.full(len(dots), pitch), np.full(len(dots), diameter)) \
+        if deskew else 0.0
+
+    boxes = []
+    half = pitch / 2
+    for left, top in fit_cells(dots, pitch, skew):
+        top += skew * (left + half)  # back to page coordinates
+        x1, y1 = int(round(left - half)), int(round(top - half))
+        x2, y2 = int(round(left + pitch + half)), int(round(top + 2 * pitch + half))
+        boxes.append((max(x1, 0), max(y1, 0), min(x2, img_w), min(y2, img_h)))
+    return [box for box in boxes if box[2] > box[0] and box[3] > box[1]]
+
+
+def box_iou(a, b):
+    """IoU matrix between (N,4) and (M,4) xyxy arrays."""
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(rb - lt, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-6)
+
+
+def agreement(reference, candidate, iou: float = 0.5, chunk: int = 2048):
+    """
+    One-to-one agreement between two box sets (mutual best IoU matches above iou).
+    returns: dict with matched, precision (of candidate), recall (of reference), mean_iou
+    """
+    reference = np.asarray(reference, dtype=np.float32).reshape(-1, 4)
+    candidate = np.asarray(candidate, dtype=np.float32).reshape(-1, 4)
+    if not len(reference) or not len(candidate):
+        return {"matched": 0, "precision": 0.0, "recall": 0.0, "mean_iou": 0.0}
+    best_c = np.empty(len(reference), dtype=np.int64)
+    best_iou = np.empty(len(reference), dtype=np.float32)
+    best_r = np.full(len(candidate), -1, dtype=np.int64)
+    best_r_iou = np.zeros(len(candidate), dtype=np.float32)
+    for start in range(0, len(reference), chunk):
+        m = box_iou(reference[start:start + chunk], candidate)
+        best_c[start:start + chunk] = m.argmax(axis=1)
+        best_iou[start:start + chunk] = m.max(axis=1)
+        col_best = m.max(axis=0)
+        better = col_best > best_r_iou
+        best_r[better] = m.argmax(axis=0)[better] + start
+        best_r_iou[better] = col_best[better]
+    mutual = (best_r[best_c] == np.arange(len(reference))) & (best_iou >= iou)
+    matched = int(mutual.sum())
+    return {
+        "matched": matched,
+        "precision": matched / len(candidate),
+        "recall": matched / len(reference),
+        "mean_iou": float(best_iou[mutual].mean()) if matched else 0.0,
+    }
+
+
+def compare_detectors(paths, yolo_model_path, iou: float = 0.5, **blob_options):
+    """
+    Run YOLO and the blob detector on every page.
+    returns: list of per-page dicts (timings, box counts and agreement, YOLO as reference)
+    """
+    from PIL import Image
+    from detect_and_crop import detect_yolo
+
+    rows = []
+    for path in paths:
+        page = Image.open(path).convert("RGB")
+        detect_yolo(page, yolo_model_path)  # load + warm outside the timing
+        t0 = time.perf_counter()
+        yolo_boxes, _ = detect_yolo(page, yolo_model_path)
+        t1 = time.perf_counter()
+        blob_boxes = detect_blobs(page, **blob_options)
+        t2 = time.perf_counter()
+        row = {"page": str(path), "yolo_s": t1 - t0, "blob_s": t2 - t1,
+               "yolo_boxes": len(yolo_boxes), "blob_boxes": len(blob_boxes)}
+        row.update(agreement(yolo_boxes, blob_boxes, iou))
+        rows.append(row)
+    return rows
+
+
+def main(argv=None):
+    from page_source import IMAGE_EXTENSIONS
+
+    parser = argparse.ArgumentParser(description="Benchmark the blob detector against YOLO.")
+    parser.add_argument("pages", type=Path, help="page image or directory of page images")
+    parser.add_argument("--yolo", type=Path, default=Path("models") / "yolo8l.pt")
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU for two boxes to count as the same cell")
+    parser.add_argument("--light-dots", action="store_true", help="dots brighter than the paper")
+    parser.add_argument("--adaptive-block", type=int, default=0, help="local threshold window (odd, 0 = Otsu)")
+    args = parser.parse_args(argv)
+
+    paths = [args.pages] if args.pages.is_file() else \
+        sorted(p for p in args.pages.rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS)
+    rows = compare_detectors(paths, args.yolo, args.iou, dark_dots=not args.light_dots,
+                             adaptive_block=args.adaptive_block)
+    for row in rows:
+        print(f"{Path(row['page']).name:<30} yolo {row['yolo_s'] * 1000:8.1f} ms {row['yolo_boxes']:5d} boxes | "
+              f"blob {row['blob_s'] * 1000:7.1f} ms {row['blob_boxes']:5d} boxes | "
+              f"P {row['precision']:.3f} R {row['recall']:.3f} IoU {row['mean_iou']:.3f}")
+    if rows:
+        yolo_s = sum(r["yolo_s"] for r in rows)
+        blob_s = sum(r["blob_s"] for r in rows)
+        matched = sum(r["matched"] for r in rows)
+        print(f"\n{len(rows)} pages: yolo {yolo_s:.2f}s, blob {blob_s:.2f}s ({yolo_s / max(blob_s, 1e-9):.1f}x faster); "
+              f"precision {matched / max(sum(r['blob_boxes'] for r in rows), 1):.3f}, "
+              f"recall {matched / max(sum(r['yolo_boxes'] for r in rows), 1):.3f}")
+
+
+if __name__ == "__main__":
+    main()
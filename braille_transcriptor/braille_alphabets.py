@@ -1,4 +1,9 @@
+import threading
+from dataclasses import dataclass
 from enum import Enum
+from types import MappingProxyType
+
+from braille_transcriptor.contractions import ContractionTables
 
 
 class Language(Enum):
@@ -8,11 +13,93 @@ class Language(Enum):
     Russian = "russian"
 
 
+def _swap(mapping):
+    # on duplicate cells the later entry wins, like the {v: k} swaps the strategies used to do
+    return {v: k for k, v in mapping.items()}
+
+
+def _without_indicators(mapping):
+    # indicator entries ('capital_symbol', 'numeric', ...) are the keys longer than one character
+    return {k: v for k, v in mapping.items() if len(k) == 1}
+
+
+def _translate_table(mapping):
+    """str.translate table of the single-character keys (others can never match one character)."""
+    return MappingProxyType(str.maketrans(_without_indicators(mapping)))
+
+
+@dataclass(frozen=True)
+class CodecTables:
+    """
+    Read-only lookup tables of one grade of an alphabet, compiled once and shared by every
+    strategy instance. Cells map to text in the *_decode tables.
+    encode / decode: 'alpha' + 'char' sections, the word-level tables
+    alpha_decode: 'alpha' section only (capital decoding)
+    numeric / numeric_decode: 'numeric' section
+    letter_decode / digit_decode / char_decode: 'alpha' / 'numeric' / 'char' without the indicators
+    encode_table / decode_table: encode / decode as str.translate tables
+    """
+    encode: MappingProxyType
+    decode: MappingProxyType
+    alpha_decode: MappingProxyType
+    numeric: MappingProxyType
+    numeric_decode: MappingProxyType
+    letter_decode: MappingProxyType
+    digit_decode: MappingProxyType
+    char_decode: MappingProxyType
+    encode_table: MappingProxyType
+    decode_table: MappingProxyType
+
+    @classmethod
+    def compile(cls, grade_map: dict):
+        alpha, numeric, char = grade_map.get('alpha', {}), grade_map.get('numeric', {}), grade_map.get('char', {})
+        encode = alpha | char
+        decode = _swap(encode)
+        return cls(
+            encode=MappingProxyType(encode),
+            decode=MappingProxyType(decode),
+            alpha_decode=MappingProxyType(_swap(alpha)),
+            numeric=MappingProxyType(dict(numeric)),
+            numeric_decode=MappingProxyType(_swap(numeric)),
+            letter_decode=MappingProxyType(_swap(_without_indicators(alpha))),
+            digit_decode=MappingProxyType(_swap(_without_indicators(numeric))),
+            char_decode=MappingProxyType(_swap(char)),
+            encode_table=_translate_table(encode),
+            decode_table=_translate_table(decode),
+        )
+
+
 class BrailleAlphabet:
     """Base class for Braille alphabet mappings"""
     def __init__(self):
         self.grade1_map = {}
         self.grade2_map = {}
+        self._tables = {}
+        self._tables_lock = threading.Lock()
+
+    def tables(self, grade: int = 1):
+        """
+        CodecTables of grade1_map / grade2_map, compiled on first use.
+        The maps are not expected to change afterwards.
+        """
+        tables = self._tables.get(grade)
+        if tables is None:
+            with self._tables_lock:
+                tables = self._tables.get(grade)
+                if tables is None:
+                    grade_map = self.grade1_map if grade == 1 else self.grade2_map
+                    tables = self._tables[grade] = CodecTables.compile(grade_map)
+        return tables
+
+    def contractions(self):
+        """ContractionTables of grade2_map, compiled on first use."""
+        tables = self._tables.get("contractions")
+        if tables is None:
+            with self._tables_lock:
+                tables = self._tables.get("contractions")
+                if tables is None:
+                    tables = self._tables["contractions"] = ContractionTables.compile(self.grade2_map)
+        return tables
 
 
 class EnglishBrailleAlphabet(BrailleAlphabet):
@@ -116,8 +203,30 @@ class RussianBrailleAlphabet(BrailleAlphabet):
         self.grade2_map = {}
 
 
-class Dictionary(Enum):
-    English = EnglishBrailleAlphabet()
-    French = FrenchBrailleAlphabet()
-    Arabic = ArabicBrailleAlphabet()
-    Russian = RussianBrailleAlphabet()
\ No newline at end of file
+class _LazyAlphabet:
+    """Dictionary entry whose alphabet is built on the first .value read, then shared."""
+
+    def __init__(self, name, factory):
+        self.name = name
+        self._factory = factory
+        self._value = None
+        self._lock = threading.Lock()
+
+    @property
+    def value(self):
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self._factory()
+        return self._value
+
+
+class Dictionary:
+    """
+    Alphabet per language (Dictionary.Russian.value). Only the alphabets a process
+    actually uses get built.
+    """
+    English = _LazyAlphabet("English", EnglishBrailleAlphabet)
+    French = _LazyAlphabet("French", FrenchBrailleAlphabet)
+    Arabic = _LazyAlphabet("Arabic", ArabicBrailleAlphabet)
+    Russian = _LazyAlphabet("Russian", RussianBrailleAlphabet)
@@ -0,0 +1,38 @@
+"""
+Grade 2 contractions compiled once per alphabet: whole-word signs as read-only dicts, group
+signs as read-only pattern tables for the cached leftmost-longest search (search.py).
+
+    tables = Dictionary.English.value.contractions()
+    replace_patterns("father", tables.contract)   # 'fa⠮r' once 'the' is a group sign
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+
+
+@dataclass(frozen=True)
+class ContractionTables:
+    """
+    standalone / standalone_decode: whole-word signs, word <-> cells
+    contract: group signs, text -> cells
+    expand: group signs and letters, cells -> text (a letter wins over a one-cell group sign)
+    symbols: the 'alpha' and 'char' cells, cells -> text
+    The pattern tables are never rebuilt, so search.py keeps one automaton per table.
+    """
+    standalone: MappingProxyType
+    standalone_decode: MappingProxyType
+    contract: MappingProxyType
+    expand: MappingProxyType
+    symbols: MappingProxyType
+
+    @classmethod
+    def compile(cls, grade_map: dict):
+        alpha, char = grade_map.get('alpha', {}), grade_map.get('char', {})
+        standalone, group_sign = grade_map.get('standalone', {}), grade_map.get('group_sign', {})
+        letters = {k: v for k, v in alpha.items() if len(k) == 1}
+        return cls(
+            standalone=MappingProxyType(dict(standalone)),
+            standalone_decode=MappingProxyType({v: k for k, v in standalone.items()}),
+            contract=MappingProxyType(dict(group_sign)),
+            expand=MappingProxyType({v: k for k, v in group_sign.items()} | {v: k for k, v in letters.items()}),
+            symbols=MappingProxyType({v: k for k, v in (alpha | char).items()}),
+        )
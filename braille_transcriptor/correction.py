@@ -0,0 +1,195 @@
+"""
+Lexicon post-correction of translated words.
+
+    corrector = get_corrector("russian")
+    corrector.correct("сергеевия")               # 'сергеевич': a listed misreading
+    corrector.correct("тамой")                   # None: not a listed misreading
+    corrector.correct("тамой", fuzzy=True)       # 'самой'
+
+By default only the exact fixes of the lexicon file are applied. The lexicon is far from the
+whole vocabulary, so the fuzzy search below would also "correct" real words it lacks
+(ветер -> вечер, большом -> большой); it is opt-in until the lexicon is large enough.
+
+Each language's lexicon (braille_transcriptor/lexicons/<language>.txt) is loaded once into a
+SymSpell-style deletion index: every word is filed under itself and each string left after
+deleting up to MAX_EDITS of its letters. A misread word is looked up under its own deletions,
+which finds all lexicon words within MAX_EDITS insertions / deletions / substitutions, and the
+candidates are ranked by a weighted edit distance. A substitution costs less the fewer dots
+separate the two letters' cells (and whatever the lexicon file says for known recognizer
+confusions such as я/ч), so a corrected word is one the recognizer could plausibly have misread.
+"""
+import threading
+from pathlib import Path
+
+LEXICON_DIR = Path(__file__).parent / "lexicons"
+MAX_EDITS = 2
+# words shorter than this are only fixed by exact entries
+MIN_LENGTH = 4
+# allowed distance per letter of the misread word, capped at MAX_COST
+COST_PER_LETTER = 0.1
+MAX_COST = 1.0
+# substitution cost by number of differing dots between two cells (0: same cell)
+DOT_COSTS = (0.1, 0.35, 0.7)
+_CACHE_SIZE = 50000
+
+
+def _deletions(word: str, edits: int):
+    """word and every string left after deleting up to edits of its characters"""
+    found = {word}
+    frontier = {word}
+    for _ in range(edits):
+        frontier = {w[:i] + w[i+1:] for w in frontier for i in range(len(w))} - found
+        found |= frontier
+    return found
+
+
+class Corrector:
+    """
+    words: {word: frequency}
+    fixes: {misreading: word}, applied as they are
+    substitutions: {(read, written): cost}; deletions: {spurious letter: cost}
+    """
+
+    def __init__(self, words=None, fixes=None, substitutions=None, deletions=None):
+        self.words = dict(words or {})
+        self.fixes = dict(fixes or {})
+        self.substitutions = dict(substitutions or {})
+        self.deletions = dict(deletions or {})
+        self._index = {}
+        for word in self.words:
+            for key in _deletions(word, MAX_EDITS):
+                self._index.setdefault(key, []).append(word)
+        self._index = {key: tuple(words) for key, words in self._index.items()}
+        # an insertion plus a deletion costs at least this much
+        self._indel_pair = 1.0 + min(self.deletions.values(), default=1.0)
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path, alphabet=None):
+        """
+        Lexicon file (format in lexicons/russian.txt); alphabet: {letter: cell}, for the
+        dot-distance substitution costs.
+        """
+        words, fixes, substitutions, deletions = {}, {}, {}, {}
+        if alphabet:
+            letters = {k: v for k, v in alphabet.items() if len(k) == 1 and len(v) == 1}
+            for a, cell_a in letters.items():
+                for b, cell_b in letters.items():
+                    if a != b:
+                        dots = bin((ord(cell_a) - 0x2800) ^ (ord(cell_b) - 0x2800)).count("1")
+                        if dots < len(DOT_COSTS):
+                            substitutions[(a, b)] = DOT_COSTS[dots]
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if "->" in line:
+                    wrong, _, right = line.partition("->")
+                    fixes[wrong.strip()] = right.strip()
+                elif "~" in line:
+                    read, _, rest = line.partition("~")
+                    written, cost = rest.split()
+                    if written == "_":
+                        deletions[read.strip()] = float(cost)
+                    else:
+                        substitutions[(read.strip(), written)] = float(cost)
+                else:
+                    word, _, frequency = line.partition(" ")
+                    words[word] = int(frequency or 1)
+        return cls(words, fixes, substitutions, deletions)
+
+    def distance(self, read: str, word: str, limit: float = MAX_COST):
+        """Weighted edit distance from read to word, or None once it exceeds limit."""
+        substitutions, deletions = self.substitutions, self.deletions
+        previous = [float(j) for j in range(len(word) + 1)]
+        for i, a in enumerate(read, 1):
+            delete = deletions.get(a, 1.0)
+            current = [previous[0] + delete]
+            for j, b in enumerate(word, 1):
+                substitute = previous[j-1] if a == b else previous[j-1] + substitutions.get((a, b), 1.0)
+                current.append(min(previous[j] + delete, current[j-1] + 1.0, substitute))
+            if min(current) > limit:
+                return None
+            previous = current
+        return previous[-1] if previous[-1] <= limit else None
+
+    def _substitution_distance(self, read: str, word: str, limit: float):
+        """distance() of two words of the same length that cannot afford an insertion and a deletion"""
+        substitutions = self.substitutions
+        cost = 0.0
+        for a, b in zip(read, word):
+            if a != b:
+                cost += substitutions.get((a, b), 1.0)
+                if cost > limit:
+                    return None
+        return cost
+
+    def _search(self, word: str):
+        limit = min(COST_PER_LETTER * len(word), MAX_COST)
+        # same-length candidates within the limit differ by substitutions only
+        substitutions_only = limit < self._indel_pair
+        index = self._index
+        candidates = set().union(*[index[key] for key in _deletions(word, MAX_EDITS) if key in index])
+        best, best_key = None, None
+        for candidate in candidates:
+            # every missing letter is an insertion
+            if len(candidate) - len(word) > limit:
+                continue
+            if substitutions_only and len(candidate) == len(word):
+                cost = self._substitution_distance(word, candidate, limit)
+            else:
+                cost = self.distance(word, candidate, limit)
+            if cost is None:
+                continue
+            rank = (cost, -self.words[candidate], candidate)
+            if best_key is None or rank < best_key:
+                best, best_key = candidate, rank
+        return best
+
+    def correct(self, word: str, fuzzy: bool = False):
+        """
+        Fix of a (lowercase) listed misreading; with fuzzy, otherwise the lexicon word the
+        word most likely stands for. None when there is nothing to fix.
+        """
+        if word in self.fixes:
+            return self.fixes[word]
+        if not fuzzy or word in self.words or len(word) < MIN_LENGTH:
+            return None
+        cached = self._cache.get(word, False)
+        if cached is not False:
+            return cached
+        corrected = self._search(word)
+        with self._lock:
+            if len(self._cache) >= _CACHE_SIZE:
+                self._cache.clear()
+            self._cache[word] = corrected
+        return corrected
+
+
+_correctors = {}
+_lock = threading.Lock()
+
+
+def get_corrector(language: str):
+    """
+    Shared Corrector of a language ('russian', ...), loaded on first use; a language without
+    a lexicon file gets one that corrects nothing.
+    """
+    language = language.lower()
+    corrector = _correctors.get(language)
+    if corrector is None:
+        with _lock:
+            corrector = _correctors.get(language)
+            if corrector is None:
+                path = LEXICON_DIR / f"{language}.txt"
+                if path.exists():
+                    from braille_transcriptor.braille_alphabets import Dictionary
+                    alphabet = getattr(Dictionary, language.capitalize(), None)
+                    letters = alphabet.value.grade1_map.get('alpha', {}) if alphabet is not None else None
+                    corrector = Corrector.from_file(path, letters)
+                else:
+                    corrector = Corrector()
+                _correctors[language] = corrector
+    return corrector
@@ -1,38 +1,124 @@
+"""
+Pattern search over braille / text strings with Aho-Corasick automatons.
 
-from ahocorasick import Automaton
+    search_braille_patterns("⠁⠃⠉", {"⠁⠃": "ab", "⠃⠉": "bc"})   # [(0, 1, 'ab')]
+    search_many(lines, patterns)                                 # one automaton for every line
+    replace_patterns("⠁⠃⠉", {"⠁⠃": "ab", "⠃⠉": "bc"})          # 'ab⠉'
+    replace_matches(word, automaton)                             # automaton from automaton_for
 
+Automatons are built once per pattern table and cached by the table's identity, so pass the
+same (read-only) mapping each time, e.g. the compiled CodecTables maps; a table changed in place
+after its first search keeps matching against its old contents.
+Matches are leftmost-longest and never overlap: at the leftmost position where a pattern
+starts the longest one wins, and the search resumes after it. Grade 2 contraction and symbol
+lookup (English Grade2, tables from braille_transcriptor/contractions.py) runs on replace_matches.
+"""
+import threading
+from collections import OrderedDict
 
-def search_braille_patterns(text, patterns):
-    # Create an Automaton object
-    automaton = Automaton()
+# pattern tables whose automatons are kept
+CACHE_SIZE = 64
+
+# id(patterns) -> (patterns, automaton); holding the table keeps its id from being reused
+_automatons = OrderedDict()
+_lock = threading.Lock()
 
-    # Add patterns to the Automaton
-    for pattern,  value in patterns.items():
-        automaton.add_word(pattern, (pattern, value))
 
-    # Build the Automaton
+def _build(patterns):
+    from ahocorasick import Automaton
+
+    automaton = Automaton()
+    for pattern, value in patterns.items():
+        if pattern:
+            automaton.add_word(pattern, (len(pattern), value))
     automaton.make_automaton()
+    return automaton
+
+
+def automaton_for(patterns):
+    """Cached automaton of a {pattern: value} table (None for a table without patterns)."""
+    key = id(patterns)
+    with _lock:
+        entry = _automatons.get(key)
+        if entry is not None and entry[0] is patterns:
+            _automatons.move_to_end(key)
+            return entry[1]
+    automaton = _build(patterns) if any(patterns) else None
+    with _lock:
+        _automatons[key] = (patterns, automaton)
+        while len(_automatons) > CACHE_SIZE:
+            _automatons.popitem(last=False)
+    return automaton
+
+
+def clear_cache():
+    with _lock:
+        _automatons.clear()
+
 
-    # Search for patterns in the text
+def _search(text, automaton):
+    if automaton is None or not text:
+        return []
+    # (start, -length) puts the longest of the matches starting at a position first
+    intervals = sorted((end - length + 1, -length, end, value) for end, (length, value) in automaton.iter(text))
     results = []
-    for end_index, (pattern, value) in automaton.iter(text):
-        start_index = end_index - len(pattern) + 1
-        results.append((start_index, end_index, value))
-
-    # Sort the results by pattern length in descending order
-    results.sort(key=lambda x: len(x[2]), reverse=True)
-
-    # Filter out overlapping patterns and keep only the largest pattern
-    filtered_results = []
-    for result in results:
-        start_index, end_index, pattern = result
-        is_overlap = False
-        for filtered_result in filtered_results:
-            filtered_start_index, filtered_end_index, _ = filtered_result
-            if start_index <= filtered_end_index and end_index >= filtered_start_index:
-                is_overlap = True
-                break
-        if not is_overlap:
-            filtered_results.append(result)
-
-    return filtered_results
+    last_end = -1
+    for start, _, end, value in intervals:
+        if start > last_end:
+            results.append((start, end, value))
+            last_end = end
+    return results
+
+
+def search_braille_patterns(text, patterns):
+    """
+    Non-overlapping leftmost-longest matches of the patterns in text.
+    patterns: {pattern: value}
+    returns: list of (start index, end index inclusive, value), in text order
+    """
+    return _search(text, automaton_for(patterns))
+
+
+def search_many(texts, patterns):
+    """search_braille_patterns for every text against one automaton; returns a list per text"""
+    automaton = automaton_for(patterns)
+    return [_search(text, automaton) for text in texts]
+
+
+def replace_matches(text, automaton):
+    """
+    text with each non-overlapping leftmost-longest match replaced by its value; characters
+    outside the matches are kept.
+    automaton: from automaton_for, resolved once when the same table serves many words
+    """
+    if automaton is None or not text:
+        return text
+    parts = []
+    last = 0
+    # matches come by end position; when none overlap (single-cell tables, most words) each
+    # one is kept as it comes
+    for end, (length, value) in automaton.iter(text):
+        start = end - length + 1
+        if start < last:
+            break
+        if start > last:
+            parts.append(text[last:start])
+        parts.append(value)
+        last = end + 1
+    else:
+        if last < len(text):
+            parts.append(text[last:])
+        return "".join(parts)
+    parts = []
+    last = 0
+    for start, end, value in _search(text, automaton):
+        parts.append(text[last:start])
+        parts.append(value)
+        last = end + 1
+    parts.append(text[last:])
+    return "".join(parts)
+
+
+def replace_patterns(text, patterns):
+    """replace_matches against the cached automaton of a {pattern: value} table"""
+    return replace_matches(text, automaton_for(patterns))
@@ -1,6 +1,52 @@
-from .english import EnglishStrategy
-from .french import FrenchStrategy
-from .arabic import ArabicStrategy
-from .russian import RussianStrategy  # Add this line
+"""
+Language strategies, loaded on first use: a language's module (and its alphabet) is
+imported the first time get_strategy asks for it, and one instance per language is
+shared afterwards (strategies keep no per-call state).
+"""
+import importlib
+import threading
 
-__all__ = ['EnglishStrategy', 'FrenchStrategy', 'ArabicStrategy', 'RussianStrategy']
\ No newline at end of file
+# language -> (module, class)
+STRATEGIES = {
+    "english": ("braille_transcriptor.strategies.english", "EnglishStrategy"),
+    "french": ("braille_transcriptor.strategies.french", "FrenchStrategy"),
+    "arabic": ("braille_transcriptor.strategies.arabic", "ArabicStrategy"),
+    "russian": ("braille_transcriptor.strategies.russian", "RussianStrategy"),
+}
+DEFAULT_LANGUAGE = "english"
+
+_instances = {}
+_lock = threading.Lock()
+
+
+def _load_class(language: str):
+    module_name, class_name = STRATEGIES[language]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def get_strategy(language: str):
+    """
+    Shared strategy instance for language ('English', 'russian', ...); unknown languages
+    fall back to English.
+    """
+    language = language.lower()
+    if language not in STRATEGIES:
+        language = DEFAULT_LANGUAGE
+    strategy = _instances.get(language)
+    if strategy is None:
+        with _lock:
+            strategy = _instances.get(language)
+            if strategy is None:
+                strategy = _instances[language] = _load_class(language)()
+    return strategy
+
+
+def __getattr__(name):
+    # `from braille_transcriptor.strategies import RussianStrategy` still works, lazily
+    for language, (_, class_name) in STRATEGIES.items():
+        if class_name == name:
+            return _load_class(language)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ['EnglishStrategy', 'FrenchStrategy', 'ArabicStrategy', 'RussianStrategy', 'get_strategy']
@@ -22,6 +22,7 @@ class ArabicStrategy(Strategy):
             self.grade1_map = outer.dictionary.grade1_map
             self.ALPHA = self.grade1_map['alpha']['alpha']
             self.NUMERIC = self.grade1_map['numeric']['numeric']
+            self.tables = outer.dictionary.tables(1)
 
         def number_encoder(self, word: str):
             word += " "
@@ -34,7 +35,7 @@ class ArabicStrategy(Strategy):
                     if (not previous.isdigit()):
                         result += self.NUMERIC
 
-                    result += self.grade1_map['numeric'][main]
+                    result += self.tables.numeric[main]
 
                 else:
                     if (previous.isdigit()):
@@ -44,29 +45,15 @@ class ArabicStrategy(Strategy):
             return result
 
         def to_braille(self, text):
-            words = text.split(" ")
-            text = ""
-            for word in words:
-
+            words = []
+            for word in text.split(" "):
                 new_word = self.number_encoder(word)
-                result = ""
-                braille_dict = self.grade1_map['alpha'] | self.grade1_map['char']
-                for i in range(len(new_word)):
-                    main = new_word[i]
-
-                    if (main in braille_dict):
-                        result += braille_dict[main]
-                    else:
-                        result += new_word[i]
-
-                text += result + self.grade1_map['char'][" "]
-            return text[:-1]
+                words.append(new_word.translate(self.tables.encode_table))
+            return self.tables.encode[" "].join(words)
 
         def number_decoder(self, braille: str):
             result = ""
-            # swap the dictionary
-            swapped_numeric_dict = {v: k for k,
-                                    v in self.grade1_map['numeric'].items()}
+            swapped_numeric_dict = self.tables.numeric_decode
             numeric_mode = False
 
             for i in range(len(braille)):
@@ -84,24 +71,11 @@ class ArabicStrategy(Strategy):
 
         def from_braille(self, braille):
 
-            braille_words = braille.split(self.grade1_map['char'][" "])
-            final_braille = ""
-            braille_dict = self.grade1_map['alpha'] | self.grade1_map['char']
-            # swap the dictionary
-            swaped_dict = {v: k for k, v in braille_dict.items()}
-
-            for word in braille_words:
+            words = []
+            for word in braille.split(self.tables.encode[" "]):
                 word = self.number_decoder(word)
-                result = ""
-                for i in range(len(word)):
-                    main = word[i]
-
-                    if (main not in swaped_dict):
-                        result += main
-                    else:
-                        result += swaped_dict[main]
-                final_braille += result + " "
-            return final_braille[:-1]
+                words.append(word.translate(self.tables.decode_table))
+            return " ".join(words)
 
     class Grade2(Grade):
 
@@ -1,42 +1,6 @@
 from .strategy import *
-from ahocorasick import Automaton
-import re
-
-
-def search_braille_patterns(text, patterns):
-    # Create an Automaton object
-    automaton = Automaton()
-
-    # Add patterns to the Automaton
-    for pattern,  value in patterns.items():
-        automaton.add_word(pattern, (pattern, value))
-
-    # Build the Automaton
-    automaton.make_automaton()
-
-    # Search for patterns in the text
-    results = []
-    for end_index, (pattern, value) in automaton.iter(text):
-        start_index = end_index - len(pattern) + 1
-        results.append((start_index, end_index, value))
-
-    # Sort the results by pattern length in descending order
-    results.sort(key=lambda x: len(x[2]), reverse=True)
-
-    # Filter out overlapping patterns and keep only the largest pattern
-    filtered_results = []
-    for result in results:
-        start_index, end_index, pattern = result
-        is_overlap = False
-        for filtered_result in filtered_results:
-            filtered_start_index, filtered_end_index, _ = filtered_result
-            if start_index <= filtered_end_index and end_index >= filtered_start_index:
-                is_overlap = True
-                break
-        if not is_overlap:
-            filtered_results.append(result)
-
-    return filtered_results
+from braille_transcriptor.search import automaton_for, replace_matches
+from itertools import chain
 
 
 class EnglishStrategy(Strategy):
@@ -66,6 +30,13 @@ class EnglishStrategy(Strategy):
             self.CAPITAL_TERMINATOR = self.grade1_map['alpha']['capital_terminator']
             self.ALPHA = self.grade1_map['alpha']['alpha']
             self.NUMERIC = self.grade1_map['numeric']['numeric']
+            self.tables = outer.dictionary.tables(1)
+            self.SPACE = self.tables.encode[" "]
+            self._numeric_resets = frozenset((self.ALPHA, self.CAPITAL_WORD, self.CAPITAL_SYMBOL))
+            self._capital_pairs = capital_pairs(self.CAPITAL_WORD, self.CAPITAL_TERMINATOR)
+            # words without any of these cells decode with a plain table lookup
+            self._mode_cells = frozenset(self.NUMERIC + self.ALPHA + self.CAPITAL_WORD + self.CAPITAL_SYMBOL
+                                         + self.CAPITAL_TERMINATOR)
 
         def number_encoder(self, word: str):
             word += " "
@@ -78,7 +49,7 @@ class EnglishStrategy(Strategy):
                     if (not previous.isdigit()):
                         result += self.NUMERIC
 
-                    result += self.grade1_map['numeric'][main]
+                    result += self.tables.numeric[main]
 
                 else:
                     if (previous.isdigit() and main.islower()):
@@ -110,93 +81,64 @@ class EnglishStrategy(Strategy):
             return result
 
         def to_braille(self, text):
-            words = text.split(" ")
-            text = ""
-            for word in words:
-
+            words = []
+            for word in text.split(" "):
                 new_word = self.number_encoder(word)
                 new_word = self.capital_encoder(new_word)
-                result = ""
-                braille_dict = self.grade1_map['alpha'] | self.grade1_map['char']
-                for i in range(len(new_word)):
-                    main = new_word[i]
-
-                    if (main in braille_dict):
-                        result += braille_dict[main]
-                    else:
-                        result += new_word[i]
-
-                text += result + self.grade1_map['char'][" "]
-            return text[:-1]
-
-        def number_decoder(self, braille: str):
-            result = ""
-            # swap the dictionary
-            swapped_numeric_dict = {v: k for k,
-                                    v in self.grade1_map['numeric'].items()}
-            numeric_mode = False
-
-            for i in range(len(braille)):
-                main = braille[i]
-                if (main == self.NUMERIC):
+                words.append(new_word.translate(self.tables.encode_table))
+            return self.tables.encode[" "].join(words)
+
+        def _decode_word(self, word: str):
+            """
+            One left-to-right pass: numeric mode on each cell as it is read, capital symbol /
+            word / terminator one cell behind it (they look at the next numeric-decoded cell).
+            """
+            if self._mode_cells.isdisjoint(word):
+                return word.translate(self.tables.decode_table)
+            numeric_decode, alpha_decode = self.tables.numeric_decode, self.tables.alpha_decode
+            NUMERIC, CAPITAL_SYMBOL, ALPHA = self.NUMERIC, self.CAPITAL_SYMBOL, self.ALPHA
+            resets, pairs = self._numeric_resets, self._capital_pairs
+            result = []
+            numeric_mode = capital_mode = False
+            previous, main = " ", None
+
+            for cell in chain(word, (None,)):
+                # numeric mode
+                if cell is None:
+                    next = " "
+                elif cell == NUMERIC:
                     numeric_mode = True
-                elif (main == self.ALPHA or main == self.CAPITAL_WORD or main == self.CAPITAL_SYMBOL):
-                    numeric_mode = False
-                    result += main
-                elif (numeric_mode and main in swapped_numeric_dict):
-                    result += swapped_numeric_dict[main]
-                else:
-                    result += main
-            return result
-
-        def capital_decoder(self, braille: str):
-            braille += " "
-            result = ""
-            # swap the dictionary
-            swapped_alpha_dict = {v: k for k,
-                                  v in self.grade1_map['alpha'].items()}
-            capital_mode = False
-
-            for i in range(len(braille) - 1):
-                previous, main, next = braille[i-1], braille[i], braille[i+1]
-                if (main+next == self.CAPITAL_WORD or previous+main == self.CAPITAL_WORD):
-                    capital_mode = True
-                elif (main+next == self.CAPITAL_TERMINATOR or previous+main == self.CAPITAL_TERMINATOR):
-                    capital_mode = False
-                elif (main not in swapped_alpha_dict):
-                    result += main
-                elif (previous == self.CAPITAL_SYMBOL):
-                    result += swapped_alpha_dict[main].upper()
-                elif (capital_mode):
-                    result += swapped_alpha_dict[main].upper()
-                elif (main == self.CAPITAL_SYMBOL or main == self.ALPHA):
                     continue
+                elif cell in resets:
+                    numeric_mode = False
+                    next = cell
+                elif numeric_mode and cell in numeric_decode:
+                    next = numeric_decode[cell]
                 else:
-                    result += main
-            return result
+                    next = cell
+
+                # capitals, for the cell before
+                if main is not None:
+                    ahead = behind = None
+                    if pairs:
+                        ahead, behind = pairs.get(main + next), pairs.get(previous + main)
+                    if ahead or behind:
+                        capital_mode = True
+                    elif ahead is False or behind is False:
+                        capital_mode = False
+                    elif main not in alpha_decode:
+                        result.append(main)
+                    elif previous == CAPITAL_SYMBOL or capital_mode:
+                        result.append(alpha_decode[main].upper())
+                    elif main != CAPITAL_SYMBOL and main != ALPHA:
+                        result.append(main)
+                    previous = main
+                main = next
+
+            return "".join(result).translate(self.tables.decode_table)
 
         def from_braille(self, braille):
-
-            braille_words = braille.split(self.grade1_map['char'][" "])
-            final_braille = ""
-            braille_dict = self.grade1_map['alpha'] | self.grade1_map['char']
-            # swap the dictionary
-            swaped_dict = {v: k for k, v in braille_dict.items()}
-
-            for word in braille_words:
-                word = self.number_decoder(word)
-                word = self.capital_decoder(word)
-                result = ""
-                for i in range(len(word)):
-                    main = word[i]
-
-                    if (main not in swaped_dict):
-                        result += main
-
-                    else:
-                        result += swaped_dict[main]
-                final_braille += result + " "
-            return final_braille[:-1]
+            return " ".join([self._decode_word(word) for word in braille.split(self.SPACE)])
 
     class Grade2():
 
@@ -207,6 +149,16 @@ class EnglishStrategy(Strategy):
             self.CAPITAL_TERMINATOR = self.grade2_map['alpha']['capital_terminator']
             self.ALPHA = self.grade2_map['alpha']['alpha']
             self.NUMERIC = self.grade2_map['numeric']['numeric']
+            self.tables = outer.dictionary.tables(2)
+            # standalone and group signs, compiled once per alphabet
+            self.contractions = outer.dictionary.contractions()
+            # their search automatons, resolved once instead of per word
+            self._contract = automaton_for(self.contractions.contract)
+            self._expand = automaton_for(self.contractions.expand)
+            self._symbols = automaton_for(self.contractions.symbols)
+            # words without any of these cells need no number / capital decoding
+            self._mode_cells = frozenset(self.NUMERIC + self.ALPHA + self.CAPITAL_WORD + self.CAPITAL_SYMBOL
+                                         + self.CAPITAL_TERMINATOR)
 
         def number_encoder(self, word: str):
             word += " "
@@ -219,7 +171,7 @@ class EnglishStrategy(Strategy):
                     if (not previous.isdigit()):
                         result += self.NUMERIC
 
-                    result += self.grade2_map['numeric'][main]
+                    result += self.tables.numeric[main]
 
                 else:
                     if (previous.isdigit() and main.islower()):
@@ -251,67 +203,45 @@ class EnglishStrategy(Strategy):
             return result
 
         def contraction_encoder(self, word: str):
-
-            filtered_word = ''
-            word += " "
-            i = 0
-
-            # to do handle grade 1 mode
-            while i < len(word) - 1:
-                char = word[i]
-                if (char == self.ALPHA):
+            if self._mode_cells.isdisjoint(word):
+                # no indicator to filter out
+                filtered_word = word
+            else:
+                filtered = []
+                word += " "
+                i = 0
+
+                # capital indicators are dropped; the letter indicator after a number is kept
+                while i < len(word) - 1:
+                    char = word[i]
+                    if char != self.CAPITAL_SYMBOL and char != self.CAPITAL_WORD and word[i]+word[i+1] != self.CAPITAL_TERMINATOR and word[i-1]+word[i] != self.CAPITAL_TERMINATOR:
+                        filtered.append(char)
                     i += 1
-                elif char != self.CAPITAL_SYMBOL and char != self.CAPITAL_WORD and word[i]+word[i+1] != self.CAPITAL_TERMINATOR and word[i-1]+word[i] != self.CAPITAL_TERMINATOR:
-                    filtered_word += char
-                i += 1
+                filtered_word = "".join(filtered)
 
             # stand alone word sign
-            if (filtered_word in self.grade2_map['standalone']):
-                filtered_word = self.grade2_map['standalone'][filtered_word]
-
-            else:
-                # group_sing
-                diff = 0
-                for key, value in self.grade2_map['group_sign'].items():
-                    matches = list(re.finditer(key, filtered_word))
-                    for match in matches:
-                        if (match):
-                            start_index = match.start(0)
-                            end_index = match.end(0) - 1
-                            key_len = len(key)
-                            val_len = len(value)
-                            filtered_word = filtered_word[:start_index] + \
-                                re.escape(value) + filtered_word[end_index+1:]
-                            diff += key_len - val_len
-
-            return filtered_word
+            if (filtered_word in self.contractions.standalone):
+                return self.contractions.standalone[filtered_word]
+            # group signs, longest first
+            return replace_matches(filtered_word, self._contract)
 
         def to_braille(self, text):
-            words = text.split(" ")
-            final_result = ""
-            for word in words:
-
-                new_word = self.number_encoder(word)
-                new_word = self.capital_encoder(new_word)
+            words = []
+            for word in text.split(" "):
+                if word.isalpha() and word.islower():
+                    # no digit or capital to mark
+                    new_word = word
+                else:
+                    new_word = self.number_encoder(word)
+                    new_word = self.capital_encoder(new_word)
                 new_word = self.contraction_encoder(new_word)
-                result = ""
-                braille_dict = self.grade2_map['alpha'] | self.grade2_map['char']
-                for i in range(len(new_word)):
-                    main = new_word[i]
-
-                    if (main in braille_dict):
-                        result += braille_dict[main]
-                    else:
-                        result += new_word[i]
-
-                final_result += result + " "
-            return final_result[:-1]
+                words.append(new_word.translate(self.tables.encode_table))
+            # the space cell, which from_braille splits words on
+            return self.tables.encode[" "].join(words)
 
         def number_decoder(self, braille: str):
             result = ""
-            # swap the dictionary
-            swapped_numeric_dict = {v: k for k,
-                                    v in self.grade2_map['numeric'].items()}
+            swapped_numeric_dict = self.tables.numeric_decode
             numeric_mode = False
 
             for i in range(len(braille)):
@@ -330,9 +260,7 @@ class EnglishStrategy(Strategy):
         def capital_decoder(self, braille: str):
             braille += " "
             result = ""
-            # swap the dictionary
-            swapped_alpha_dict = {v: k for k,
-                                  v in self.grade2_map['alpha'].items()}
+            swapped_alpha_dict = self.tables.alpha_decode
             capital_mode = False
 
             for i in range(len(braille) - 1):
@@ -354,80 +282,37 @@ class EnglishStrategy(Strategy):
             return result
 
         def contraction_decoder(self, braille):
-            gs_dict = self.grade2_map['group_sign']
-            swaped_gs_dict = {v: k for k, v in gs_dict.items()}
-            sa_dict = self.grade2_map['standalone']
-            swaped_sa_dict = {v: k for k, v in sa_dict.items()}
-
-            braille_words = braille.split(self.grade2_map['char'][" "])
-            braille_dict = self.grade2_map['alpha']
-            # swap the dictionary
-            swaped_dict = {v: k for k, v in braille_dict.items()}
-
-            braille = self.symbol_decoder(braille, swaped_dict)
-
-            filtered_word = ''
-            braille += " "
-
-            for i in range(len(braille) - 1):
-                char = braille[i]
-                if (char == self.ALPHA and braille[i - 1] == " "):
-                    return braille
-                elif char != self.CAPITAL_SYMBOL and char != self.CAPITAL_WORD and braille[i]+braille[i+1] != self.CAPITAL_TERMINATOR and braille[i-1]+braille[i] != self.CAPITAL_TERMINATOR:
-                    filtered_word += char
-
-            if (filtered_word in swaped_sa_dict):
-                filtered_word = swaped_sa_dict[filtered_word]
-
+            if self._mode_cells.isdisjoint(braille):
+                # no indicator to filter out
+                filtered_word = braille
             else:
-                diff = 0
-                for key, value in swaped_gs_dict.items():
-                    matches = list(re.finditer(key, filtered_word))
-                    for match in matches:
-                        if (match):
-                            start_index = match.start(0)
-                            end_index = match.end(0) - 1
-
-                            key_len = end_index - start_index + 1
-                            val_len = len(value)
-
-                            filtered_word = filtered_word[:start_index] + \
-                                re.escape(value) + filtered_word[end_index+1:]
-                            diff += val_len - key_len
+                filtered = []
+                braille += " "
+
+                for i in range(len(braille) - 1):
+                    char = braille[i]
+                    if (char == self.ALPHA and braille[i - 1] == " "):
+                        # grade 1 passage: no contractions
+                        return braille[:-1]
+                    elif char != self.CAPITAL_SYMBOL and char != self.CAPITAL_WORD and braille[i]+braille[i+1] != self.CAPITAL_TERMINATOR and braille[i-1]+braille[i] != self.CAPITAL_TERMINATOR:
+                        filtered.append(char)
+                filtered_word = "".join(filtered)
 
-            return filtered_word
-
-        def symbol_decoder(self, word, swaped_dict):
-            search_result = search_braille_patterns(word, swaped_dict)
-            diff = 0
-            for item in search_result:
-
-                start_index, end_index, value = item
-
-                original_len = end_index - start_index + 1
-                new_len = len(value)
-
-                word = word[:start_index+diff] + \
-                    value + word[end_index+1+diff:]
-                # print(word, item, diff)
-
-                diff += new_len - original_len
-            return word
+            # stand alone word sign
+            if (filtered_word in self.contractions.standalone_decode):
+                return self.contractions.standalone_decode[filtered_word]
+            # group signs and letters, longest first
+            return replace_matches(filtered_word, self._expand)
 
         def from_braille(self, braille):
-
-            braille_words = braille.split(self.grade2_map['char'][" "])
-            braille_dict = self.grade2_map['alpha'] | self.grade2_map['char']
-            # swap the dictionary
-            swaped_dict = {v: k for k, v in braille_dict.items()}
-            result = ""
-            for word in braille_words:
-
-                new_word = self.number_decoder(word)
-                new_word = self.contraction_decoder(new_word)
-                new_word = self.capital_decoder(new_word)
-                new_word = self.symbol_decoder(new_word, swaped_dict)
-
-                result += new_word + " "
-                # print(result)
-            return result
\ No newline at end of file
+            words = []
+            for word in braille.split(self.tables.encode[" "]):
+                if self._mode_cells.isdisjoint(word):
+                    new_word = self.contraction_decoder(word)
+                else:
+                    new_word = self.number_decoder(word)
+                    new_word = self.contraction_decoder(new_word)
+                    new_word = self.capital_decoder(new_word)
+                new_word = replace_matches(new_word, self._symbols)
+                words.append(new_word)
+            return " ".join(words) + " "
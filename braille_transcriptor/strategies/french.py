@@ -25,6 +25,13 @@ class FrenchStrategy(Strategy):
             self.CAPITAL_TERMINATOR = self.grade1_map['alpha']['capital_terminator']
             self.ALPHA = self.grade1_map['alpha']['alpha']
             self.NUMERIC = self.grade1_map['numeric']['numeric']
+            self.tables = outer.dictionary.tables(1)
+            self.SPACE = self.tables.encode[" "]
+            self._numeric_resets = frozenset((self.ALPHA, self.CAPITAL_WORD, self.CAPITAL_SYMBOL))
+            self._capital_pairs = capital_pairs(self.CAPITAL_WORD, self.CAPITAL_TERMINATOR)
+            # words without any of these cells decode with a plain table lookup
+            self._mode_cells = frozenset(self.NUMERIC + self.ALPHA + self.CAPITAL_WORD + self.CAPITAL_SYMBOL
+                                         + self.CAPITAL_TERMINATOR + '\u2826\u2834')
 
         def number_encoder(self, word: str):
             word += " "
@@ -37,7 +44,7 @@ class FrenchStrategy(Strategy):
                     if (not previous.isdigit()):
                         result += self.NUMERIC
 
-                    result += self.grade1_map['numeric'][main]
+                    result += self.tables.numeric[main]
 
                 else:
                     if (previous.isdigit() and main.islower()):
@@ -52,7 +59,6 @@ class FrenchStrategy(Strategy):
 
             for i in range(len(word) - 1):
                 previous, main, next = word[i-1], word[i], word[i+1]
-                print(self.CAPITAL_SYMBOL)
                 if (main.isupper()):
                     if (not previous.isupper()):
                         if (next.isupper()):
@@ -69,106 +75,107 @@ class FrenchStrategy(Strategy):
             return result
 
         def to_braille(self, text):
-            words = text.split(" ")
-            text = ""
-            for word in words:
-
+            words = []
+            for word in text.split(" "):
                 new_word = self.number_encoder(word)
                 new_word = self.capital_encoder(new_word)
-                result = ""
-                braille_dict = self.grade1_map['alpha'] | self.grade1_map['char']
-                for i in range(len(new_word)):
-                    main = new_word[i]
-
-                    if (main in braille_dict):
-                        result += braille_dict[main]
-                    else:
-                        result += new_word[i]
-
-                text += result + self.grade1_map['char'][" "]
-            return text[:-1]
-
-        def number_decoder(self, braille: str):
-            braille += " "
-            result = ""
-            # swap the dictionary
-            swapped_numeric_dict = {v: k for k,
-                                    v in self.grade1_map['numeric'].items()}
-            numeric_mode = False
-
-            for i in range(len(braille) - 1):
-                previous, main, next = braille[i-1], braille[i], braille[i+1]
-                if (previous+main == self.CAPITAL_TERMINATOR or main+next == self.CAPITAL_TERMINATOR):
-                    result += main
-                elif (main == self.NUMERIC):
-                    numeric_mode = True
-                elif (main == self.ALPHA or main == self.CAPITAL_WORD or main == self.CAPITAL_SYMBOL):
-                    numeric_mode = False
-                    result += main
-                elif (numeric_mode and main in swapped_numeric_dict):
-                    result += swapped_numeric_dict[main]
-                else:
-                    result += main
-            return result
-
-        def capital_decoder(self, braille: str):
-            braille += " "
-            result = ""
-            # swap the dictionary
-            swapped_alpha_dict = {v: k for k,
-                                  v in self.grade1_map['alpha'].items()}
-            capital_mode = False
-
-            for i in range(len(braille) - 1):
-                previous, main, next = braille[i-1], braille[i], braille[i+1]
-                if (main+next == self.CAPITAL_WORD or previous+main == self.CAPITAL_WORD):
-                    capital_mode = True
-                elif (main+next == self.CAPITAL_TERMINATOR or previous+main == self.CAPITAL_TERMINATOR):
-                    capital_mode = False
-                elif (main.isdigit()):
-                    capital_mode = False
-                    result += main
-                elif (previous == self.CAPITAL_SYMBOL):
-                    result += swapped_alpha_dict[main].upper()
-                elif (capital_mode):
-                    result += swapped_alpha_dict[main].upper()
-                elif (main == self.CAPITAL_SYMBOL or main == self.ALPHA):
-                    continue
+                words.append(new_word.translate(self.tables.encode_table))
+            return self.tables.encode[" "].join(words)
+
+        def _decode_word(self, word: str):
+            """
+            One left-to-right pass: numeric mode on each cell as it is read, capital symbol /
+            word / terminator one cell behind it (they look at the next numeric-decoded cell),
+            then the cell lookup with the quote pairing. Noise the old multi-pass decoder raised
+            on (a capital indicator before a non-letter, an unmatched closing quote) is decoded.
+            """
+            if self._mode_cells.isdisjoint(word):
+                return word.translate(self.tables.decode_table)
+            numeric_decode, alpha_decode, decode = (self.tables.numeric_decode, self.tables.alpha_decode,
+                                                    self.tables.decode)
+            NUMERIC, CAPITAL_SYMBOL, ALPHA = self.NUMERIC, self.CAPITAL_SYMBOL, self.ALPHA
+            CAPITAL_TERMINATOR = self.CAPITAL_TERMINATOR
+            two_cell_terminator = len(CAPITAL_TERMINATOR) == 2
+            resets, pairs = self._numeric_resets, self._capital_pairs
+            # characters of the decoded word, so a closing quote can rewrite its opening one
+            result = []
+            queue = []
+            position = 0  # characters the capital stage has let through
+            numeric_mode = capital_mode = False
+            previous, main = " ", None
+            last = len(word) - 1
+
+            for i in range(last + 2):
+                # numeric mode (a two-cell terminator is passed through untouched)
+                if i > last:
+                    next = " "
                 else:
-                    result += main
-            return result
+                    cell = word[i]
+                    if two_cell_terminator and (
+                            (word[i-1] if i else " ") + cell == CAPITAL_TERMINATOR
+                            or cell + (word[i+1] if i < last else " ") == CAPITAL_TERMINATOR):
+                        next = cell
+                    elif cell == NUMERIC:
+                        numeric_mode = True
+                        continue
+                    elif cell in resets:
+                        numeric_mode = False
+                        next = cell
+                    elif numeric_mode and cell in numeric_decode:
+                        next = numeric_decode[cell]
+                    else:
+                        next = cell
+
+                # capitals, for the cell before
+                if main is not None:
+                    ahead = behind = None
+                    if pairs:
+                        ahead, behind = pairs.get(main + next), pairs.get(previous + main)
+                    out = None
+                    if ahead or behind:
+                        capital_mode = True
+                    elif ahead is False or behind is False:
+                        capital_mode = False
+                    elif main.isdigit():
+                        capital_mode = False
+                        out = main
+                    elif previous == CAPITAL_SYMBOL or capital_mode:
+                        # a capital before a cell that is no letter (recognizer noise) is dropped
+                        out = alpha_decode[main].upper() if main in alpha_decode else main
+                    elif main != CAPITAL_SYMBOL and main != ALPHA:
+                        out = main
+                    previous = main
+
+                    # cell lookup
+                    if out is not None:
+                        for char in out:
+                            if char not in decode:
+                                result.append(char)
+                            elif char == '\u2826':
+                                queue.append(position)
+                                result.append("?")
+                            elif char == '\u2834':
+                                if queue:
+                                    # the opening quote's placeholder becomes a quote too
+                                    index = queue.pop()
+                                    if index < len(result):
+                                        result[index] = '”'
+                                    else:
+                                        result.append('”')
+                                else:
+                                    # no opening quote (recognizer noise): nothing to rewrite
+                                    pass
+                                # the closing quote itself, matched or not
+                                result.append('”')
+                            else:
+                                result.extend(decode[char])
+                            position += 1
+                main = next
+
+            return "".join(result)
 
         def from_braille(self, braille):
-
-            braille_words = braille.split(self.grade1_map['char'][" "])
-            final_braille = ""
-            braille_dict = self.grade1_map['alpha'] | self.grade1_map['char']
-            # swap the dictionary
-            swaped_dict = {v: k for k, v in braille_dict.items()}
-
-            for word in braille_words:
-                word = self.number_decoder(word)
-                word = self.capital_decoder(word)
-                result = ""
-                queue = []
-                for i in range(len(word)):
-                    main = word[i]
-
-                    if (main not in swaped_dict):
-                        result += main
-
-                    elif (main == '\u2826'):
-                        queue.append(i)
-                        result += "?"
-
-                    elif (main == '\u2834'):
-                        index = queue.pop()
-                        result = result[:index] + '”' + result[index+1:] + "”"
-
-                    else:
-                        result += swaped_dict[main]
-                final_braille += result + " "
-            return final_braille
+            return " ".join([self._decode_word(word) for word in braille.split(self.SPACE)]) + " "
 
     class Grade2(Grade):
 
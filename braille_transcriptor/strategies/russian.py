@@ -1,42 +1,10 @@
 from .strategy import *
-from ahocorasick import Automaton
+from braille_transcriptor.correction import get_corrector
 import re
 
-
-def search_braille_patterns(text, patterns):
-    # Create an Automaton object
-    automaton = Automaton()
-
-    # Add patterns to the Automaton
-    for pattern,  value in patterns.items():
-        automaton.add_word(pattern, (pattern, value))
-
-    # Build the Automaton
-    automaton.make_automaton()
-
-    # Search for patterns in the text
-    results = []
-    for end_index, (pattern, value) in automaton.iter(text):
-        start_index = end_index - len(pattern) + 1
-        results.append((start_index, end_index, value))
-
-    # Sort the results by pattern length in descending order
-    results.sort(key=lambda x: len(x[2]), reverse=True)
-
-    # Filter out overlapping patterns and keep only the largest pattern
-    filtered_results = []
-    for result in results:
-        start_index, end_index, pattern = result
-        is_overlap = False
-        for filtered_result in filtered_results:
-            filtered_start_index, filtered_end_index, _ = filtered_result
-            if start_index <= filtered_end_index and end_index >= filtered_start_index:
-                is_overlap = True
-                break
-        if not is_overlap:
-            filtered_results.append(result)
-
-    return filtered_results
+# Braille punctuation left in translated words: ignored when matching, converted in the output
+_MATCH_DROP = str.maketrans('', '', '⠲⠆⠔')
+_PUNCTUATION = str.maketrans({'⠲': '.', '⠆': '.', '⠖': '!', '⠢': '?', '⠔': ''})
 
 
 class RussianStrategy(Strategy):
@@ -49,18 +17,20 @@ class RussianStrategy(Strategy):
         self.grade2 = self.Grade1(self)  # Russian typically doesn't use Grade 2, so use Grade 1
 
     class Grade1(Grade):
+        # lexicon search for words that are not listed misreadings; it also rewrites real
+        # words missing from the lexicon, so it is off unless the lexicon covers the text
+        # (turn it on per call: from_braille(braille, fuzzy_correction=True), or run_pipeline /
+        # batch_cli --fuzzy-correction / the app's checkbox)
+        fuzzy_correction = False
 
         def __init__(self, outer):
             self.outer = outer
             
-            # Get mappings from the dictionary
             alpha_map = outer.dictionary.grade1_map['alpha']
             numeric_map = outer.dictionary.grade1_map['numeric']
-            char_map = outer.dictionary.grade1_map['char']
-            
-            # Create reverse mappings for decoding
-            self.cyrillic_map = {v: k for k, v in alpha_map.items() 
-                               if k not in ['capital_word', 'capital_symbol', 'capital_terminator', 'alpha']}
+            # reverse mappings for decoding, compiled once per alphabet
+            self.tables = outer.dictionary.tables(1)
+            self.cyrillic_map = self.tables.letter_decode
             
             # Capital indicators
             self.CAPITAL_SYMBOL = alpha_map['capital_symbol']
@@ -68,14 +38,15 @@ class RussianStrategy(Strategy):
             
             # Numbers
             self.NUMERIC = numeric_map['numeric']
-            self.number_map = {v: k for k, v in numeric_map.items() if k != 'numeric'}
+            self.number_map = self.tables.digit_decode
             
             # Special characters
-            self.special_map = {v: k for k, v in char_map.items()}
+            self.special_map = self.tables.char_decode
 
-        def from_braille(self, braille):
+        def from_braille(self, braille, fuzzy_correction=None):
             """
             Convert Russian Braille to Cyrillic text with corrections
+            fuzzy_correction: also run the lexicon search on unlisted words (None = the class default)
             """
             result = ""
             i = 0
@@ -122,66 +93,27 @@ class RussianStrategy(Strategy):
                 i += 1
             
             # Apply Russian word corrections
-            result = self._apply_corrections(result.strip())
+            if fuzzy_correction is None:
+                fuzzy_correction = self.fuzzy_correction
+            result = self._apply_corrections(result.strip(), fuzzy_correction)
             return result
         
-        def _apply_corrections(self, text):
-            """Apply common corrections for Russian OCR errors"""
-            corrections = {
-                # Common OCR confusions between ⠟(я) and ⠯(ч)
-                'сергеевия': 'сергеевич',
-                'петровия': 'петрович', 
-                'ивановия': 'иванович',
-                'александровия': 'александрович',
-                'михайловия': 'михайлович',
-                'николаевия': 'николаевич',
-                
-                # Word-level corrections based on context
-                'татъюна': 'татьяна',
-                'барэню': 'барыня', 
-                'дворяик': 'дворник',
-                'прячка': 'прачка',
-                'праяка': 'прачка',
-                'слуяа': 'слуга',
-                'слуяи': 'слуги',
-                'гиё': 'его',
-                'йила': 'жила',
-                'ояенъ': 'очень',
-                'эделала': 'сделала',
-                'поскве': 'после',
-                'один⠔каю': 'одинокая',
-                'стараю': 'старая',
-                'бэло': 'было',
-                'ёмного': 'много',
-                'ёмоскву': 'москву',
-                'ёгирасина': 'герасима',
-                'дворнёикомё': 'дворником',
-                'гаврилаё': 'гаврила',
-                'бёааш': 'бесшумный',
-                'маяник': 'мужчина',
-                'гирасин': 'герасим',
-                'расин': 'герасим',
-                'рецкич': 'рецкий',
-                'дво': 'дворецкий',
-                
-                # Remove repeated characters at end
-                'ёёё': '',
-                'ёёёёёёёёё': '',
-            }
+        def _apply_corrections(self, text, fuzzy_correction=False):
+            """Correct misread words against the Russian lexicon (braille_transcriptor/lexicons/russian.txt)"""
+            corrector = get_corrector(self.outer.language.value)
             
             # Apply word-level corrections
-            words = text.split()
             corrected_words = []
             
-            for word in words:
+            for word in text.split():
                 # Remove punctuation for matching, then restore
                 clean_word = word.strip('.,!?;:()[]{}"-⠲⠆⠖⠢').lower()
                 
                 # Remove Braille punctuation that shouldn't be in text
-                clean_word = clean_word.replace('⠲', '').replace('⠆', '').replace('⠔', '')
+                clean_word = clean_word.translate(_MATCH_DROP)
                 
-                if clean_word in corrections:
-                    corrected = corrections[clean_word]
+                corrected = corrector.correct(clean_word, fuzzy_correction)
+                if corrected is not None:
                     if word and word[0].isupper() and corrected:
                         corrected = corrected.capitalize()
                     # Restore punctuation (convert Braille punctuation to regular)
@@ -198,8 +130,7 @@ class RussianStrategy(Strategy):
                     corrected_words.append(corrected)
                 else:
                     # Clean up Braille punctuation
-                    cleaned = word.replace('⠲', '.').replace('⠆', '.').replace('⠖', '!').replace('⠢', '?').replace('⠔', '')
-                    corrected_words.append(cleaned)
+                    corrected_words.append(word.translate(_PUNCTUATION))
             
             return ' '.join(corrected_words)
         
@@ -207,40 +138,29 @@ class RussianStrategy(Strategy):
             """
             Convert Cyrillic text to Russian Braille
             """
-            # Get forward mappings
-            alpha_map = self.outer.dictionary.grade1_map['alpha']
-            numeric_map = self.outer.dictionary.grade1_map['numeric']
-            char_map = self.outer.dictionary.grade1_map['char']
+            numeric_map = self.tables.numeric
+            # letters and special characters (the sections share no keys)
+            encode = self.tables.encode
             
-            result = ""
-            i = 0
+            result = []
+            previous = ""
             
-            while i < len(text):
-                char = text[i]
-                
+            for char in text:
                 # Handle uppercase
                 if char.isupper():
-                    result += self.CAPITAL_SYMBOL
+                    result.append(self.CAPITAL_SYMBOL)
                     char = char.lower()
                 
                 # Handle numbers
                 if char.isdigit():
-                    if i == 0 or not text[i-1].isdigit():
-                        result += self.NUMERIC
-                    result += numeric_map.get(char, char)
-                
-                # Handle Cyrillic
-                elif char in alpha_map:
-                    result += alpha_map[char]
+                    if not previous.isdigit():
+                        result.append(self.NUMERIC)
+                    result.append(numeric_map.get(char, char))
                 
-                # Handle special characters
-                elif char in char_map:
-                    result += char_map[char]
-                
-                # Handle unknown
+                # Handle Cyrillic, special characters and unknown
                 else:
-                    result += char
+                    result.append(encode.get(char, char))
                 
-                i += 1
+                previous = char
             
-            return result
\ No newline at end of file
+            return "".join(result)
@@ -24,4 +24,17 @@ class Strategy():
     language: Language
     dictionary: BrailleAlphabet
     grade1: Grade
-    grade2: Grade
\ No newline at end of file
+    grade2: Grade
+
+def capital_pairs(capital_word: str, capital_terminator: str):
+    """
+    Two-cell capital indicators as {cells: starts capital word mode}, for decoders that test
+    previous+main / main+next against them. Single-cell indicators can never equal such a
+    pair and are left out; capital word wins if both indicators are the same.
+    """
+    pairs = {}
+    if len(capital_terminator) == 2:
+        pairs[capital_terminator] = False
+    if len(capital_word) == 2:
+        pairs[capital_word] = True
+    return pairs
@@ -1,137 +1,271 @@
-from ultralytics import YOLO
 from pathlib import Path
 from PIL import Image
 import shutil
 import numpy as np
 import json
+import time
 
-def detect_and_crop(model_path: Path, images_dir: Path, output_dir: Path):
+from models.registry import registry
+from metrics import metrics
+from layout import DocumentLayout
+
+
+def cluster_and_sort(detections):
+    """
+    detections: list of (x1,y1,x2,y2)
+    returns: flattened list of cell dicts (row index, box, size, order) in reading order,
+    i.e. rows top->bottom, each row sorted left->right. See layout.DocumentLayout.
+    """
+    return DocumentLayout.from_boxes(detections).to_items()
+
+
+def result_boxes(result):
+    """
+    Boxes of one ultralytics Results straight from its tensors (no save_txt round trip).
+    returns: ((N,4) int64 x1,y1,x2,y2 clipped to the page, (N,) float32 confidences)
+    """
+    img_h, img_w = result.orig_shape
+    xyxy = result.boxes.xyxy.cpu().numpy()
+    scores = result.boxes.conf.cpu().numpy().astype(np.float32)
+    xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, img_w)
+    xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, img_h)
+    return xyxy.astype(np.int64).reshape(-1, 4), scores
+
+
+def detect_results(model, image, conf=0.1, iou=0.3):
+    """
+    Run the detector on a single in-memory page.
+    model: loaded YOLO model
+    image: PIL image (RGB) or numpy array
+    returns: ((N,4) int pixel boxes clipped to the page, (N,) confidences)
+    """
+    with registry.lock(model):
+        result = model.predict(source=image, conf=conf, iou=iou, verbose=False)[0]
+    return result_boxes(result)
+
+
+def detect_boxes(model, image, conf=0.1, iou=0.3):
+    """
+    Like detect_results, without the confidences.
+    returns: list of (x1,y1,x2,y2) pixel boxes clipped to the page
+    """
+    boxes, _ = detect_results(model, image, conf, iou)
+    return [tuple(int(v) for v in box) for box in boxes]
+
+
+def tile_origins(length: int, tile_size: int, overlap: int):
+    """
+    Start offsets of overlapping tiles covering [0, length).
+    The last tile is aligned to the end so every tile has the full size when possible.
+    Raises ValueError unless 0 <= overlap < tile_size: tiles would not advance otherwise.
+    """
+    if not 0 <= overlap < tile_size:
+        raise ValueError(f"tile overlap must be in [0, tile_size), got overlap={overlap}, tile_size={tile_size}")
+    if length <= tile_size:
+        return [0]
+    stride = tile_size - overlap
+    starts = list(range(0, length - tile_size, stride))
+    starts.append(length - tile_size)
+    return starts
+
+
+def nms_boxes(boxes, scores, iou=0.3):
+    """
+    Vectorized non-maximum suppression.
+    boxes: (N,4) float xyxy, scores: (N,)
+    returns: indices of kept boxes, highest score first
+    """
+    import torch
+    from torchvision.ops import nms
+
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+    keep = nms(torch.as_tensor(boxes, dtype=torch.float32), torch.as_tensor(scores, dtype=torch.float32), iou)
+    return keep.numpy()
+
+
+def detect_results_tiled(model, image, tile_size: int = 1280, overlap: int = 256, conf=0.1, iou=0.3,
+                         tile_batch: int = 4):
+    """
+    Run the detector on overlapping full-resolution tiles of a large page.
+    Only tile_batch tiles are materialized at a time, so memory does not grow with the page.
+    Boxes cut by an interior tile edge are dropped (the overlapping neighbour sees them whole,
+    so overlap must exceed the cell size), the rest are merged across seams with NMS.
+    model: loaded YOLO model
+    image: PIL image (RGB) or numpy array (RGB or grayscale)
+    returns: ((N,4) int pixel boxes in page coordinates, (N,) confidences), like detect_results
+    """
+    page = np.asarray(image)
+    if page.ndim == 2:
+        page = np.stack([page] * 3, axis=-1)
+    img_h, img_w = page.shape[:2]
+    origins = [(x, y) for y in tile_origins(img_h, tile_size, overlap) for x in tile_origins(img_w, tile_size, overlap)]
+    # a box this close to an inner tile edge is treated as cut by the seam
+    edge_margin = 2
+
+    all_boxes, all_scores = [], []
+    for start in range(0, len(origins), tile_batch):
+        batch = origins[start:start + tile_batch]
+        # ultralytics expects BGR numpy input
+        tiles = [np.ascontiguousarray(page[y:y + tile_size, x:x + tile_size, ::-1]) for x, y in batch]
+        with registry.lock(model):
+            results = model.predict(source=tiles, conf=conf, iou=iou, imgsz=tile_size, verbose=False)
+        for (x, y), tile, result in zip(batch, tiles, results):
+            xyxy = result.boxes.xyxy.cpu().numpy()
+            scores = result.boxes.conf.cpu().numpy()
+            if len(xyxy) == 0:
+                continue
+            tile_h, tile_w = tile.shape[:2]
+            cut = np.zeros(len(xyxy), dtype=bool)
+            if x > 0:
+                cut |= xyxy[:, 0] <= edge_margin
+            if y > 0:
+                cut |= xyxy[:, 1] <= edge_margin
+            if x + tile_w < img_w:
+                cut |= xyxy[:, 2] >= tile_w - edge_margin
+            if y + tile_h < img_h:
+                cut |= xyxy[:, 3] >= tile_h - edge_margin
+            xyxy = xyxy[~cut] + np.array([x, y, x, y], dtype=xyxy.dtype)
+            all_boxes.append(xyxy)
+            all_scores.append(scores[~cut])
+
+    if not all_boxes:
+        return np.zeros((0, 4), dtype=np.int64), np.zeros(0, dtype=np.float32)
+    boxes = np.concatenate(all_boxes)
+    scores = np.concatenate(all_scores)
+    keep = nms_boxes(boxes, scores, iou)
+    boxes, scores = boxes[keep], scores[keep]
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, img_w)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, img_h)
+    return boxes.astype(np.int64), scores.astype(np.float32)
+
+
+def detect_boxes_tiled(model, image, tile_size: int = 1280, overlap: int = 256, conf=0.1, iou=0.3, tile_batch: int = 4):
+    """
+    Like detect_results_tiled, without the confidences.
+    returns: list of (x1,y1,x2,y2) pixel boxes in page coordinates, like detect_boxes
+    """
+    boxes, _ = detect_results_tiled(model, image, tile_size, overlap, conf, iou, tile_batch)
+    return [tuple(int(v) for v in box) for box in boxes]
+
+
+def detect_yolo(image, model_path, tile_size=None, tile_overlap: int = 256):
+    """YOLO backend: whole page, or overlapping tiles when tile_size is set."""
+    model = registry.get_yolo(model_path)
+    if tile_size:
+        return detect_results_tiled(model, image, tile_size, tile_overlap)
+    return detect_results(model, image)
+
+
+def detect_dot_blobs(image, model_path=None, tile_size=None, tile_overlap: int = 256):
+    """Classical backend (blob_detector): no model, works on the whole page at once; confidence 1."""
+    from blob_detector import detect_blobs
+
+    boxes = np.asarray(detect_blobs(image), dtype=np.int64).reshape(-1, 4)
+    return boxes, np.ones(len(boxes), dtype=np.float32)
+
+
+# name -> detect(image, model_path, tile_size, tile_overlap) -> ((N,4) int xyxy, (N,) confidences)
+DETECTORS = {
+    "yolo": detect_yolo,
+    "blob": detect_dot_blobs,
+}
+
+
+def detect_cells(image, detector: str = "yolo", model_path=None, tile_size=None, tile_overlap: int = 256):
+    """
+    Find the braille cells of a page with the chosen backend.
+    detector: key of DETECTORS ('yolo' or 'blob'); register new backends there
+    returns: ((N,4) int x1,y1,x2,y2 boxes clipped to the page, any order; (N,) confidences)
+    """
+    if detector not in DETECTORS:
+        raise ValueError(f"Unknown detector: {detector}")
+    return DETECTORS[detector](image, model_path, tile_size, tile_overlap)
+
+
+def crop_cells(page, sorted_meta):
+    """
+    Slice every detected cell out of an in-memory page.
+    page: numpy array (H,W) or (H,W,C)
+    sorted_meta: output of cluster_and_sort
+    returns: list of array views in reading order (no copies, no encoding)
+    """
+    return [page[m["y1"]:m["y2"], m["x1"]:m["x2"]] for m in sorted_meta]
+
+
+def dump_crops(doc_folder: Path, img, sorted_meta, source=None):
+    """
+    Debug dump of the legacy on-disk layout: char_{idx}.jpg + metadata.json.
+    img: PIL image of the page (RGB)
+    source: optional path of the page image, recorded in metadata.json for draw_labels
+    """
+    doc_folder.mkdir(parents=True, exist_ok=True)
+    metadata = {"items": []}
+    if source is not None:
+        metadata["source"] = str(source)
+    for idx, meta in enumerate(sorted_meta, start=1):
+        x1, y1, x2, y2 = meta["x1"], meta["y1"], meta["x2"], meta["y2"]
+        cropped = img.crop((x1, y1, x2, y2))
+        # ensure crop is RGB before saving as JPEG
+        if cropped.mode != "RGB":
+            cropped = cropped.convert("RGB")
+        fname = f"char_{idx}.jpg"
+        cropped.save(doc_folder / fname)
+        item = {
+            "file": fname,
+            "row": meta["row"],
+            "x1": x1, "y1": y1, "x2": x2, "y2": y2,
+            "width": meta["width"], "height": meta["height"],
+            "order": idx
+        }
+        if "conf" in meta:
+            item["conf"] = meta["conf"]
+        metadata["items"].append(item)
+
+    # write metadata json
+    with open(doc_folder / "metadata.json", "w", encoding="utf-8") as m:
+        json.dump(metadata, m, indent=2, ensure_ascii=False)
+    return metadata
+
+
+def detect_and_crop(model_path: Path, images_dir: Path, output_dir: Path, save_artifacts: bool = False):
+    """
+    Detect every page of images_dir and write its crops + metadata.json under
+    output_dir/results/braille_characters/<stem>/.
+    Boxes and confidences are read straight from the predictor's Results tensors; each
+    metadata.json records the source page ('source') and the per-cell 'conf'.
+    save_artifacts: also let YOLO write annotated pages and labels/*.txt into output_dir/results
+                    (the old behaviour; not needed by anything downstream)
+    returns: (results_dir, crops_dir)
+    """
     results_dir = output_dir / "results"
-    labels_dir = results_dir / "labels"
     crops_dir = results_dir / "braille_characters"
 
     if output_dir.exists():
         shutil.rmtree(output_dir)
     crops_dir.mkdir(parents=True, exist_ok=True)
 
-    model = YOLO(model_path)
-    model.predict(
-        source=str(images_dir),
-        conf=0.1,
-        iou=0.3,
-        save=True,
-        save_txt=True,
-        save_conf=True,
-        project=str(output_dir),
-        name="results",
-        exist_ok=True,
-        show_labels=False,
-        show_conf=False,
-        line_width=1
-    )
-
-    def yolo_to_xyxy(xc, yc, w, h, img_w, img_h):
-        x1 = max(int((xc - w / 2) * img_w), 0)
-        y1 = max(int((yc - h / 2) * img_h), 0)
-        x2 = min(int((xc + w / 2) * img_w), img_w)
-        y2 = min(int((yc + h / 2) * img_h), img_h)
-        return x1, y1, x2, y2
-
-    def cluster_and_sort(detections):
-        """
-        detections: list of (x1,y1,x2,y2)
-        returns: list of rows where each row is sorted left->right.
-        Also we return a flattened list with row index and order preserved.
-        """
-        if not detections:
-            return []
-
-        arr = np.array(detections)
-        # sort by top coordinate (y1)
-        order_by_y = arr[arr[:,1].argsort()]
-        heights = order_by_y[:,3] - order_by_y[:,1]
-        avg_h = np.mean(heights) if len(heights) > 0 else 0
-        # break rows where vertical gap between tops is larger than half avg height
-        row_break = np.diff(order_by_y[:,1]) > (avg_h * 0.6 if avg_h > 0 else 10)
-        split_indices = np.where(row_break)[0] + 1
-        rows = np.split(order_by_y, split_indices)
-        sorted_rows = []
-        for r_idx, row in enumerate(rows):
-            # sort row left -> right (by x1)
-            row = row[row[:,0].argsort()]
-            # convert to list of dicts with row index
-            for box_idx, (x1, y1, x2, y2) in enumerate(row):
-                sorted_rows.append({
-                    "row": int(r_idx),
-                    "x1": int(x1), "y1": int(y1), "x2": int(x2), "y2": int(y2),
-                    "width": int(x2 - x1), "height": int(y2 - y1)
-                })
-        return sorted_rows
-
-    # Crop characters and write metadata
-    for label_file in labels_dir.glob("*.txt"):
-        stem = label_file.stem
-        img_file = next((images_dir / f"{stem}{ext}" for ext in [".jpg", ".png", ".jpeg"] if (images_dir / f"{stem}{ext}").exists()), None)
-        if not img_file:
-            # fallback: maybe YOLO saved the image in results_dir
-            candidate = results_dir / f"{stem}.jpg"
-            if candidate.exists():
-                img_file = candidate
-            else:
-                candidate = results_dir / f"{stem}.png"
-                if candidate.exists():
-                    img_file = candidate
-
-        if not img_file:
-            print(f"Image not found for {label_file}")
-            continue
-
-        doc_folder = crops_dir / stem
-        doc_folder.mkdir(parents=True, exist_ok=True)
-
-        # open as RGB to avoid paletted-mode save errors (e.g., webp/png palette)
-        img = Image.open(img_file).convert("RGB")
-        width, height = img.size
-        detections = []
-
-        with open(label_file, "r") as f:
-            for line in f:
-                parts = line.strip().split()
-                if len(parts) < 5:
-                    continue
-                # YOLO label format: class xc yc w h [conf if saved]
-                # handle both 5-field and 6-field lines
-                if len(parts) >= 6:
-                    _, xc, yc, w, h, _ = parts[:6]
-                else:
-                    _, xc, yc, w, h = parts[:5]
-                xc, yc, w, h = map(float, (xc, yc, w, h))
-                x1, y1, x2, y2 = yolo_to_xyxy(xc, yc, w, h, width, height)
-                detections.append((x1, y1, x2, y2))
-
-        sorted_meta = cluster_and_sort(detections)
-
-        # save cropped images and metadata
-        metadata = {"items": []}
-        for idx, meta in enumerate(sorted_meta, start=1):
-            x1, y1, x2, y2 = meta["x1"], meta["y1"], meta["x2"], meta["y2"]
-            cropped = img.crop((x1, y1, x2, y2))
-            # ensure crop is RGB before saving as JPEG
-            if cropped.mode != "RGB":
-                cropped = cropped.convert("RGB")
-            fname = f"char_{idx}.jpg"
-            cropped.save(doc_folder / fname)
-            item = {
-                "file": fname,
-                "row": meta["row"],
-                "x1": x1, "y1": y1, "x2": x2, "y2": y2,
-                "width": meta["width"], "height": meta["height"],
-                "order": idx
-            }
-            metadata["items"].append(item)
-
-        # write metadata json
-        with open(doc_folder / "metadata.json", "w", encoding="utf-8") as m:
-            json.dump(metadata, m, indent=2, ensure_ascii=False)
+    model = registry.get_yolo(model_path)
+    options = dict(source=str(images_dir), conf=0.1, iou=0.3, stream=True, verbose=False)
+    if save_artifacts:
+        options.update(save=True, save_txt=True, save_conf=True, project=str(output_dir), name="results",
+                       exist_ok=True, show_labels=False, show_conf=False, line_width=1)
+
+    with registry.lock(model):
+        # stream=True: one page of results in memory at a time
+        t0 = time.perf_counter()
+        for result in model.predict(**options):
+            # predict runs lazily: time since the previous page was written is this page's detection
+            detect_seconds = time.perf_counter() - t0
+            source = Path(result.path)
+            boxes, scores = result_boxes(result)
+            metrics.observe("detect", detect_seconds, source.stem, cells=len(boxes))
+            with metrics.stage("crop", source.stem) as rec:
+                # orig_img is the decoded page (BGR), no second read from disk
+                img = Image.fromarray(result.orig_img[:, :, ::-1])
+                layout = DocumentLayout.from_boxes(boxes, scores=scores)
+                dump_crops(crops_dir / source.stem, img, layout.to_items(), source=source)
+                rec.cells = len(layout)
+            t0 = time.perf_counter()
 
     return results_dir, crops_dir
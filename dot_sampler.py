@@ -0,0 +1,137 @@
+"""
+Analytic fast path for clean cells: read the six dots straight off the normalized crop.
+
+Every crop is sampled at the standard 2x3 braille grid (column centers at 1/4 and 3/4 of the
+width, row centers at 1/6, 1/2 and 5/6 of the height). A dot is "on" when its window is
+darker than `dot_threshold` on a background (0) .. ink (1) scale, and the cell's confidence
+is the smallest normalized margin among its six decisions, lowered when ink shows up away
+from the grid (misaligned or merged cells). Everything is vectorized over all crops of a page.
+
+DotCascade gates on that confidence: confident cells keep the analytic label, the rest go to
+BrailleNet. Both paths produce indices into CLASS_NAMES, so downstream code is unchanged.
+"""
+import threading
+
+import numpy as np
+
+# dot centers as fractions of (height, width), braille numbering: 1-2-3 left column, 4-5-6 right
+DOT_CENTERS = [(1 / 6, 1 / 4), (1 / 2, 1 / 4), (5 / 6, 1 / 4),
+               (1 / 6, 3 / 4), (1 / 2, 3 / 4), (5 / 6, 3 / 4)]
+
+
+def _class_of_mask():
+    from recognize_chars import CLASS_NAMES
+
+    table = np.full(64, -1, dtype=np.int64)
+    for class_idx, name in enumerate(CLASS_NAMES):
+        table[sum(1 << (int(d) - 1) for d in name)] = class_idx
+    return table
+
+
+def _box_means(integral, y0, x0, y1, x1):
+    """Mean of every crop over rows y0:y1, cols x0:x1 from (N, H+1, W+1) integral images."""
+    total = integral[:, y1, x1] - integral[:, y0, x1] - integral[:, y1, x0] + integral[:, y0, x0]
+    return total / ((y1 - y0) * (x1 - x0))
+
+
+def sample_dots(batch, radius: int = 1, dot_threshold: float = 0.35, min_contrast: float = 0.15):
+    """
+    Decode the dot pattern of every crop analytically.
+    batch: normalized [N,1,40,25] tensor or array (values in [-1, 1], dark ink low)
+    radius: half size of the square window averaged around each dot center
+    dot_threshold: window darkness (0 background .. 1 ink) above which a dot is on
+    min_contrast: background - ink range (0..1 gray) below which a crop is not trusted
+    returns: (class_idx int64 (N,), -1 for an empty cell; confidence float (N,) in [0, 1])
+    """
+    x = np.asarray(batch, dtype=np.float32).reshape(len(batch), *np.shape(batch)[-2:])
+    n, h, w = x.shape
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    x = (x + 1.0) * 0.5  # back to 0..1 gray
+
+    # background = median gray, ink = 2nd percentile (one partial sort for both)
+    flat = x.reshape(n, -1)
+    k_ink, k_bg = int(0.02 * flat.shape[1]), flat.shape[1] // 2
+    ranked = np.partition(flat, (k_ink, k_bg), axis=1)
+    background, ink = ranked[:, k_bg], ranked[:, k_ink]
+    contrast = background - ink
+    scale = np.maximum(contrast, 1e-6)
+
+    integral = np.zeros((n, h + 1, w + 1), dtype=np.float32)
+    integral[:, 1:, 1:] = x.cumsum(1).cumsum(2)
+
+    # darkness of each dot window, 0 = background .. 1 = ink
+    darkness = np.empty((n, 6), dtype=np.float32)
+    # area a dot may occupy: 80% of the dot pitch around each center
+    covered = np.zeros((h, w), dtype=bool)
+    half_y, half_x = int(round(0.4 * h / 3)), int(round(0.4 * w / 2))
+    for d, (fy, fx) in enumerate(DOT_CENTERS):
+        cy, cx = int(fy * h), int(fx * w)
+        y0, y1 = max(cy - radius, 0), min(cy + radius + 1, h)
+        x0, x1 = max(cx - radius, 0), min(cx + radius + 1, w)
+        darkness[:, d] = (background - _box_means(integral, y0, x0, y1, x1)) / scale
+        covered[max(cy - half_y, 0):cy + half_y + 1, max(cx - half_x, 0):cx + half_x + 1] = True
+
+    on = darkness > dot_threshold
+    mask = (on * (1 << np.arange(6))).sum(axis=1)
+    class_idx = _class_of_mask()[mask]
+
+    # margin of the least certain dot, 0 at the threshold .. 1 at pure background / ink
+    margin = np.where(on, (darkness - dot_threshold) / (1.0 - dot_threshold),
+                      (dot_threshold - darkness) / dot_threshold)
+    confidence = np.clip(margin.min(axis=1), 0.0, 1.0)
+
+    # ink away from the grid: darkest window of the same size outside the dot areas
+    k = 2 * radius + 1
+    if h >= k and w >= k:
+        local = (integral[:, k:, k:] - integral[:, :-k, k:] - integral[:, k:, :-k] + integral[:, :-k, :-k]) / (k * k)
+        off_grid = ~covered[radius:h - radius, radius:w - radius]
+        stray = (background[:, None] - local.reshape(n, -1)[:, off_grid.ravel()]).max(axis=1) / scale
+        confidence = np.minimum(confidence, np.clip(1.0 - stray / dot_threshold, 0.0, 1.0))
+
+    confidence[(contrast < min_contrast) | (class_idx < 0)] = 0.0
+    return class_idx, confidence.astype(np.float32)
+
+
+class DotCascade:
+    """
+    Confidence gate in front of BrailleNet, safe to share between threads and pages.
+    threshold: cells whose analytic confidence is below this go to the CNN
+    counters: fast (analytic label kept) and cnn (sent to BrailleNet)
+    """
+
+    def __init__(self, threshold: float = 0.5, radius: int = 1, dot_threshold: float = 0.35,
+                 min_contrast: float = 0.15):
+        self.threshold = threshold
+        self.radius = radius
+        self.dot_threshold = dot_threshold
+        self.min_contrast = min_contrast
+        self._lock = threading.Lock()
+        self.fast = 0
+        self.cnn = 0
+
+    def split(self, batch):
+        """
+        returns: (class_idx from the analytic path, bool mask of cells that need the CNN)
+        """
+        class_idx, confidence = sample_dots(batch, self.radius, self.dot_threshold, self.min_contrast)
+        needs_cnn = confidence < self.threshold
+        with self._lock:
+            n_cnn = int(needs_cnn.sum())
+            self.cnn += n_cnn
+            self.fast += len(class_idx) - n_cnn
+        return class_idx, needs_cnn
+
+    def stats(self):
+        with self._lock:
+            total = self.fast + self.cnn
+            return {
+                "fast": self.fast,
+                "cnn": self.cnn,
+                "fast_fraction": self.fast / total if total else 0.0,
+                "cnn_fraction": self.cnn / total if total else 0.0,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.fast = self.cnn = 0
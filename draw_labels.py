@@ -1,47 +1,76 @@
 from PIL import Image, ImageDraw, ImageFont
-import numpy as np
 from pathlib import Path
+import json
+
+from layout import DocumentLayout
+from metrics import metrics
+
+
+def _load_font():
+    try:
+        return ImageFont.truetype("arial.ttf", 11)
+    except:
+        return ImageFont.load_default()
+
+
+def render_labels(img, boxes, predictions, assembled_text: str = "", translated_text: str = "",
+                  draw_boxes: bool = False, font=None):
+    """
+    Draw predictions under each box plus the assembled/translated text header.
+    img: PIL image (modified in place, converted to RGB if needed)
+    boxes: sequence of (x1,y1,x2,y2) in the same order as predictions
+    draw_boxes: also outline each box (for pages not already annotated by YOLO)
+    """
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if font is None:
+        font = _load_font()
+    draw = ImageDraw.Draw(img)
+    width, height = img.size
+
+    for idx, (x1, y1, x2, y2) in enumerate(boxes):
+        if idx >= len(predictions): break
+        if draw_boxes:
+            draw.rectangle([x1, y1, x2, y2], outline="blue", width=1)
+        # draw bbox label (predicted dot pattern or unicode)
+        draw.text((x1, y2 + 2), predictions[idx], fill="red", font=font)
+
+    # draw assembled braille and translated text at top-left area
+    margin = 8
+    # naive wrapping: cut to fit width -> prefer user to tweak if too long
+    draw.rectangle([0, 0, width, 60], fill=(255,255,255,200))
+    draw.text((margin, margin), "Braille: " + assembled_text, fill="black", font=font)
+    draw.text((margin, margin + 18), "Text: " + (translated_text if translated_text else "N/A"), fill="black", font=font)
+    return img
+
 
 def draw_labels(results_dir: Path):
-    labels_dir = results_dir / "labels"
     predictions_dir = results_dir / "braille_characters"
     output_dir = results_dir / "labeled_docs"
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    try:
-        font = ImageFont.truetype("arial.ttf", 11)
-    except:
-        font = ImageFont.load_default()
-
-    def yolo_to_xyxy(xc, yc, w, h, img_w, img_h):
-        return int((xc - w / 2) * img_w), int((yc - h / 2) * img_h), int((xc + w / 2) * img_w), int((yc + h / 2) * img_h)
-
-    def cluster_and_sort(detections):
-        detections = np.array(detections)
-        detections = detections[detections[:,1].argsort()]
-        heights = detections[:,3] - detections[:,1]
-        avg_h = np.mean(heights) if len(heights) else 0
-        row_break = np.diff(detections[:,1]) > (avg_h / 2 if avg_h>0 else 10)
-        split_indices = np.where(row_break)[0] + 1
-        rows = np.split(detections, split_indices)
-        sorted_boxes = []
-        for row in rows:
-            row = row[row[:,0].argsort()]
-            sorted_boxes.extend(row.tolist())
-        return sorted_boxes
-
-    for label_file in labels_dir.glob("*.txt"):
-        stem = label_file.stem
+    font = _load_font()
+
+    for meta_file in predictions_dir.glob("*/metadata.json"):
+        doc_folder = meta_file.parent
+        stem = doc_folder.name
+        with open(meta_file, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+
+        # page annotated by YOLO (save_artifacts runs), else the source page without boxes
         img_file = results_dir / f"{stem}.jpg"
         if not img_file.exists():
             img_file = results_dir / f"{stem}.png"
+        boxes_drawn = img_file.exists()
+        if not boxes_drawn and metadata.get("source"):
+            img_file = Path(metadata["source"])
         if not img_file.exists():
             continue
 
         # load predictions and translated if available
-        predictions_file = predictions_dir / stem / "predictions.txt"
-        assembled_file = predictions_dir / stem / "assembled_braille.txt"
-        translated_file = predictions_dir / stem / "translated.txt"
+        predictions_file = doc_folder / "predictions.txt"
+        assembled_file = doc_folder / "assembled_braille.txt"
+        translated_file = doc_folder / "translated.txt"
 
         if not predictions_file.exists():
             continue
@@ -51,33 +80,16 @@ def draw_labels(results_dir: Path):
         assembled_text = assembled_file.read_text(encoding="utf-8") if assembled_file.exists() else ""
         translated_text = translated_file.read_text(encoding="utf-8") if translated_file.exists() else ""
 
-        img = Image.open(img_file).convert("RGB")
-        draw = ImageDraw.Draw(img)
-        width, height = img.size
-
-        detections = []
-        with open(label_file, "r") as f:
-            for line in f:
-                parts = line.strip().split()
-                if len(parts) < 5: continue
-                _, xc, yc, w, h = map(float, parts[:5])
-                detections.append(yolo_to_xyxy(xc, yc, w, h, width, height))
-
-        detections = cluster_and_sort(detections)
-        for idx, (x1, y1, x2, y2) in enumerate(detections):
-            if idx >= len(predictions): break
-            # draw bbox label (predicted dot pattern or unicode)
-            draw.text((x1, y2 + 2), predictions[idx], fill="red", font=font)
-
-        # draw assembled braille and translated text at top-left area
-        margin = 8
-        # draw a semi-transparent rectangle for readability
-        text_block = "Braille: " + assembled_text + "\nText: " + translated_text
-        # naive wrapping: cut to fit width -> prefer user to tweak if too long
-        draw.rectangle([0, 0, width, 60], fill=(255,255,255,200))
-        draw.text((margin, margin), "Braille: " + assembled_text, fill="black", font=font)
-        draw.text((margin, margin + 18), "Text: " + (translated_text if translated_text else "N/A"), fill="black", font=font)
-
-        img.save(output_dir / f"{stem}_labeled.jpg")
+        with metrics.stage("draw", stem) as rec:
+            # reuse the layout the predictions were made in, so labels cannot drift from the cells
+            layout = DocumentLayout.from_items(metadata.get("items", []))
+
+            img = Image.open(img_file).convert("RGB")
+            img = render_labels(img, layout.boxes, predictions, assembled_text, translated_text,
+                                draw_boxes=not boxes_drawn, font=font)
+
+            img.save(output_dir / f"{stem}_labeled.jpg")
+            rec.cells = len(predictions)
+            rec.unknown = predictions.count("?")
 
     return output_dir
@@ -0,0 +1,150 @@
+"""
+Page layout of detected braille cells, shared by cropping, row assembly and overlay drawing.
+
+A DocumentLayout is built once per page from the detector boxes and stored as parallel
+numpy arrays (struct-of-arrays) in reading order: row by row, left to right.
+"""
+import numpy as np
+
+from braille_utils import estimate_space_threshold
+
+# a new row starts when the (deskewed) top edge jumps by more than this fraction of the mean height
+ROW_BREAK_FACTOR = 0.6
+
+
+def estimate_skew(cx, cy, widths, heights):
+    """
+    Median slope between horizontally adjacent cells, in O(n log n).
+    Cells are bucketed into horizontal bands one cell high (twice, offset by half a band so
+    pairs straddling a band edge are still seen), sorted by x inside each band, and the
+    slope of every close consecutive pair is collected.
+    """
+    if len(cx) < 2:
+        return 0.0
+    band = float(np.mean(heights)) or 1.0
+    max_dx = 3.0 * (float(np.median(widths)) or 1.0)
+    slopes = []
+    for offset in (0.0, 0.5 * band):
+        bands = np.floor((cy + offset) / band)
+        order = np.lexsort((cx, bands))
+        same_band = bands[order][1:] == bands[order][:-1]
+        dx = np.diff(cx[order])
+        dy = np.diff(cy[order])
+        close = same_band & (dx > 0) & (dx <= max_dx)
+        slopes.append(dy[close] / dx[close])
+    slopes = np.concatenate(slopes)
+    return float(np.median(slopes)) if len(slopes) else 0.0
+
+
+class DocumentLayout:
+    """
+    Cells of one page in reading order, as parallel arrays.
+    x1, y1, x2, y2: int box coordinates
+    row: row index of each cell
+    order: 1-based reading-order position (matches char_{order}.jpg / metadata 'order')
+    conf: detector confidence of each cell, None when unknown (e.g. old metadata.json)
+    """
+
+    def __init__(self, x1, y1, x2, y2, row, skew: float = 0.0, conf=None):
+        self.x1 = np.asarray(x1, dtype=np.int64)
+        self.y1 = np.asarray(y1, dtype=np.int64)
+        self.x2 = np.asarray(x2, dtype=np.int64)
+        self.y2 = np.asarray(y2, dtype=np.int64)
+        self.row = np.asarray(row, dtype=np.int64)
+        self.order = np.arange(1, len(self.x1) + 1)
+        self.skew = skew
+        self.conf = None if conf is None else np.asarray(conf, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.x1)
+
+    @classmethod
+    def from_boxes(cls, boxes, row_break_factor: float = ROW_BREAK_FACTOR, deskew: bool = True, scores=None):
+        """
+        Group detector boxes into rows and sort them into reading order.
+        boxes: (N,4) x1,y1,x2,y2 in any order
+        deskew: estimate the line slope first so slightly skewed rows are not split
+        scores: optional (N,) detector confidences, kept aligned with the boxes as `conf`
+        """
+        arr = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+        if len(arr) == 0:
+            return cls(*([np.zeros(0, dtype=np.int64)] * 5), conf=None if scores is None else np.zeros(0))
+
+        widths = arr[:, 2] - arr[:, 0]
+        heights = arr[:, 3] - arr[:, 1]
+        cx = (arr[:, 0] + arr[:, 2]) / 2.0
+        cy = (arr[:, 1] + arr[:, 3]) / 2.0
+        skew = estimate_skew(cx, cy, widths, heights) if deskew else 0.0
+
+        # sort by (deskewed) top coordinate
+        top = arr[:, 1] - skew * cx if skew else arr[:, 1]
+        by_top = np.argsort(top, kind="stable")
+        avg_h = np.mean(heights)
+        # break rows where vertical gap between tops is larger than a fraction of avg height
+        row_break = np.diff(top[by_top]) > (avg_h * row_break_factor if avg_h > 0 else 10)
+        row_of_sorted = np.concatenate([[0], np.cumsum(row_break)])
+        row = np.empty(len(arr), dtype=np.int64)
+        row[by_top] = row_of_sorted
+
+        # reading order: row, then left -> right (by x1)
+        reading = np.lexsort((arr[:, 0], row))
+        arr = arr[reading]
+        conf = None if scores is None else np.asarray(scores)[reading]
+        return cls(arr[:, 0], arr[:, 1], arr[:, 2], arr[:, 3], row[reading], skew, conf)
+
+    @classmethod
+    def from_items(cls, items):
+        """Rebuild from metadata.json items (already clustered), ordered by 'order'."""
+        items = sorted(items, key=lambda item: item.get("order", 0))
+        cols = [[item[k] for item in items] for k in ("x1", "y1", "x2", "y2", "row")]
+        conf = [item["conf"] for item in items] if items and all("conf" in item for item in items) else None
+        return cls(*cols, conf=conf)
+
+    @property
+    def boxes(self):
+        """(N,4) int array of x1,y1,x2,y2 in reading order."""
+        return np.stack([self.x1, self.y1, self.x2, self.y2], axis=1)
+
+    @property
+    def widths(self):
+        return self.x2 - self.x1
+
+    @property
+    def heights(self):
+        return self.y2 - self.y1
+
+    def row_slices(self):
+        """(row id, slice) of every row; cells of a row are contiguous in reading order."""
+        if len(self) == 0:
+            return []
+        starts = np.flatnonzero(np.diff(self.row)) + 1
+        bounds = np.concatenate([[0], starts, [len(self)]])
+        return [(int(self.row[a]), slice(int(a), int(b))) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def gaps(self):
+        """Horizontal gap between each cell and the previous cell of its row (0 for row starts)."""
+        gaps = np.zeros(len(self), dtype=np.int64)
+        if len(self) > 1:
+            same_row = self.row[1:] == self.row[:-1]
+            gaps[1:] = np.where(same_row, self.x1[1:] - self.x2[:-1], 0)
+        return gaps
+
+    def space_threshold(self, space_factor: float = 1.2):
+        return estimate_space_threshold(self.widths.tolist(), factor=space_factor)
+
+    def word_breaks(self, space_factor: float = 1.2):
+        """True where a word space goes before the cell."""
+        return self.gaps() > self.space_threshold(space_factor)
+
+    def to_items(self):
+        """List of dicts in the metadata.json item format (without 'file'), with 'conf' when known."""
+        items = [{
+            "row": int(r),
+            "x1": int(a), "y1": int(b), "x2": int(c), "y2": int(d),
+            "width": int(c - a), "height": int(d - b),
+            "order": int(o)
+        } for a, b, c, d, r, o in zip(self.x1, self.y1, self.x2, self.y2, self.row, self.order)]
+        if self.conf is not None:
+            for item, c in zip(items, self.conf):
+                item["conf"] = round(float(c), 4)
+        return items
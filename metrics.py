@@ -0,0 +1,240 @@
+"""
+Per-stage instrumentation: wall time, cell counts, unknown-cell counts and peak memory per
+stage and page, kept as structured records and exported in Prometheus text format.
+
+    from metrics import metrics
+    metrics.enable(trace_memory=True)   # or BRAILLE_METRICS=1 / BRAILLE_METRICS=memory
+    with metrics.stage("detect", page="scan_01") as rec:
+        boxes = ...
+        rec.cells = len(boxes)
+    metrics.records(); metrics.to_prometheus()
+
+Disabled (the default) `stage()` hands back one shared no-op context, so instrumented code
+pays an attribute check and a method call. `unknown` counts cells the stage could not
+resolve: '?' predictions for recognition, braille cells left untranslated for from_braille.
+Peak memory is the tracemalloc peak inside the stage (Python / numpy allocations, not torch
+tensors) and only when trace_memory is on; rss_max_bytes is the process high-water mark at
+the end of the stage. Both are process-wide, so overlapping stages on threads share them.
+"""
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+# upper bounds (seconds) of the stage duration histogram
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _max_rss_bytes():
+    if resource is None:
+        return None
+    # linux reports kilobytes
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def count_untranslated(text: str):
+    """Braille cells (U+2800..U+28FF) still present in translated text."""
+    return sum(1 for c in text if "⠀" <= c <= "⣿")
+
+
+@dataclass
+class StageRecord:
+    stage: str
+    page: str = ""
+    seconds: float = 0.0
+    cells: int = 0
+    unknown: int = 0
+    peak_bytes: Optional[int] = None
+    rss_max_bytes: Optional[int] = None
+    language: str = ""
+
+
+class _NullStage:
+    """Shared context for disabled metrics: ignores every counter written to it."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    _own = ("_owner", "record", "_t0", "_mem0")
+
+    def __init__(self, owner, record):
+        self._owner = owner
+        self.record = record
+
+    def __getattr__(self, name):
+        return getattr(self.record, name)
+
+    def __setattr__(self, name, value):
+        if name in self._own:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.record, name, value)
+
+    def __enter__(self):
+        if self._owner.trace_memory:
+            self._mem0 = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record = self.record
+        record.seconds = time.perf_counter() - self._t0
+        if self._owner.trace_memory and tracemalloc.is_tracing():
+            record.peak_bytes = max(tracemalloc.get_traced_memory()[1] - self._mem0, 0)
+        record.rss_max_bytes = _max_rss_bytes()
+        self._owner.add(record)
+        return False
+
+
+class Metrics:
+    """
+    Thread-safe collector of StageRecords plus running per-stage totals.
+    max_records: most recent records kept for records() / page reports (totals keep counting)
+    """
+
+    def __init__(self, max_records: int = 10000):
+        self.enabled = False
+        self.trace_memory = False
+        self._records = deque(maxlen=max_records)
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def enable(self, trace_memory: bool = False):
+        """trace_memory: also record tracemalloc peaks (slows allocation-heavy stages)"""
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.trace_memory = False
+
+    def stage(self, name: str, page: str = "", language: str = ""):
+        """
+        Context manager timing one stage of one page; set .cells / .unknown on it.
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, StageRecord(stage=name, page=str(page), language=language))
+
+    def observe(self, name: str, seconds: float, page: str = "", cells: int = 0, unknown: int = 0,
+                language: str = ""):
+        """Record a stage the caller timed itself (e.g. work done inside a lazy iterator)."""
+        if not self.enabled:
+            return
+        self.add(StageRecord(stage=name, page=str(page), seconds=seconds, cells=cells, unknown=unknown,
+                             rss_max_bytes=_max_rss_bytes(), language=language))
+
+    def add(self, record: StageRecord):
+        with self._lock:
+            self._records.append(record)
+            key = (record.stage, record.language)
+            totals = self._totals.get(key)
+            if totals is None:
+                totals = self._totals[key] = {"count": 0, "seconds": 0.0, "cells": 0, "unknown": 0,
+                                              "peak_bytes": 0, "buckets": [0] * len(DURATION_BUCKETS)}
+            totals["count"] += 1
+            totals["seconds"] += record.seconds
+            totals["cells"] += record.cells
+            totals["unknown"] += record.unknown
+            totals["peak_bytes"] = max(totals["peak_bytes"], record.peak_bytes or 0)
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if record.seconds <= bound:
+                    totals["buckets"][i] += 1
+
+    def records(self, page: Optional[str] = None):
+        """returns: list of record dicts (optionally of one page), oldest first"""
+        with self._lock:
+            records = list(self._records)
+        return [asdict(r) for r in records if page is None or r.page == page]
+
+    def page_report(self, page: str):
+        """returns: {stage: record dict} for one page (latest record per stage)"""
+        return {r["stage"]: r for r in self.records(page)}
+
+    def summary(self):
+        """returns: {stage: totals dict} over everything recorded since the last reset"""
+        with self._lock:
+            out = {}
+            for (stage, language), totals in self._totals.items():
+                name = f"{stage}[{language}]" if language else stage
+                out[name] = {k: v for k, v in totals.items() if k != "buckets"}
+            return out
+
+    def to_prometheus(self, prefix: str = "braille"):
+        """Running totals in the Prometheus text exposition format."""
+        with self._lock:
+            items = sorted(self._totals.items())
+            rss = _max_rss_bytes()
+
+        def labels(stage, language, le=None):
+            parts = [f'stage="{stage}"']
+            if language:
+                parts.append(f'language="{language}"')
+            if le is not None:
+                parts.append(f'le="{le}"')
+            return "{" + ",".join(parts) + "}"
+
+        lines = [f"# HELP {prefix}_stage_duration_seconds Wall time per stage and page.",
+                 f"# TYPE {prefix}_stage_duration_seconds histogram"]
+        for (stage, language), t in items:
+            for bound, n in zip(DURATION_BUCKETS, t["buckets"]):
+                lines.append(f"{prefix}_stage_duration_seconds_bucket{labels(stage, language, bound)} {n}")
+            lines.append(f"{prefix}_stage_duration_seconds_bucket{labels(stage, language, '+Inf')} {t['count']}")
+            lines.append(f"{prefix}_stage_duration_seconds_sum{labels(stage, language)} {t['seconds']:.6f}")
+            lines.append(f"{prefix}_stage_duration_seconds_count{labels(stage, language)} {t['count']}")
+        for metric, key, kind, help_text in (
+                ("stage_cells_total", "cells", "counter", "Cells handled per stage."),
+                ("stage_unknown_cells_total", "unknown", "counter", "Cells a stage could not resolve."),
+                ("stage_peak_memory_bytes", "peak_bytes", "gauge", "Largest traced allocation peak of a stage.")):
+            lines += [f"# HELP {prefix}_{metric} {help_text}", f"# TYPE {prefix}_{metric} {kind}"]
+            # peaks exist only while tracemalloc is on
+            lines += [f"{prefix}_{metric}{labels(stage, language)} {t[key]}" for (stage, language), t in items
+                      if key != "peak_bytes" or t[key]]
+        if rss is not None:
+            lines += [f"# HELP {prefix}_process_max_rss_bytes Process resident set high-water mark.",
+                      f"# TYPE {prefix}_process_max_rss_bytes gauge",
+                      f"{prefix}_process_max_rss_bytes {rss}"]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path, prefix: str = "braille"):
+        """Write to_prometheus() atomically (node_exporter textfile collector friendly)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus(prefix))
+        os.replace(tmp, path)
+
+    def reset(self):
+        with self._lock:
+            self._records.clear()
+            self._totals.clear()
+
+
+# process-wide collector; BRAILLE_METRICS=1 enables it, BRAILLE_METRICS=memory adds tracemalloc peaks
+metrics = Metrics()
+if os.environ.get("BRAILLE_METRICS", "").lower() in ("1", "true", "on", "memory"):
+    metrics.enable(trace_memory=os.environ["BRAILLE_METRICS"].lower() == "memory")
@@ -0,0 +1,180 @@
+"""
+Export BrailleNet weights to deployable inference artifacts.
+
+    python -m models.export models/recognition_model.pth --crops braille_characters/ --bench
+
+writes recognition_model.ts (TorchScript) and recognition_model.onnx next to the weights.
+BatchNorm layers are folded into the preceding conv / linear layer and dropout is dropped,
+so the exported graphs are plain conv -> relu -> pool stacks.
+With --crops, every backend is checked against eager PyTorch on those reference crops
+(argmax must agree) and --bench reports per-cell latency.
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+from torch import nn
+
+from models.model_definition import BrailleNet
+
+INPUT_SHAPE = (1, 40, 25)
+BACKENDS = ("eager", "torchscript", "onnx")
+
+
+def _fold(layer, bn):
+    """Copy of a Conv2d / Linear with the following BatchNorm folded into weight and bias."""
+    scale = bn.weight / torch.sqrt(bn.running_var + bn.eps)
+    if isinstance(layer, nn.Conv2d):
+        fused = nn.Conv2d(layer.in_channels, layer.out_channels, layer.kernel_size, layer.stride,
+                          layer.padding, layer.dilation, layer.groups, bias=True)
+        weight = layer.weight * scale.reshape(-1, 1, 1, 1)
+    else:
+        fused = nn.Linear(layer.in_features, layer.out_features, bias=True)
+        weight = layer.weight * scale.reshape(-1, 1)
+    bias = layer.bias if layer.bias is not None else torch.zeros_like(bn.running_mean)
+    with torch.no_grad():
+        fused.weight.copy_(weight)
+        fused.bias.copy_((bias - bn.running_mean) * scale + bn.bias)
+    return fused
+
+
+def fold_batchnorm(model: BrailleNet) -> nn.Sequential:
+    """
+    Inference-only copy of BrailleNet with every BatchNorm folded away.
+    returns: nn.Sequential in eval mode, same outputs as model.eval() up to float rounding
+    """
+    layers = []
+    for block in (model.conv1, model.conv2, model.conv3, model.conv4, model.conv5):
+        conv, bn, *rest = block
+        layers.append(_fold(conv, bn))
+        layers.extend(rest)
+    layers.append(nn.Flatten())
+    fc1, bn, relu, _dropout, fc2 = model.fc
+    layers += [_fold(fc1, bn), relu, fc2]
+    return nn.Sequential(*layers).eval()
+
+
+def load_folded(weights_path):
+    from recognize_chars import CLASS_NAMES
+
+    model = BrailleNet(num_classes=len(CLASS_NAMES))
+    model.load_state_dict(torch.load(weights_path, map_location="cpu"))
+    return fold_batchnorm(model.eval())
+
+
+def export_torchscript(folded: nn.Module, path: Path):
+    example = torch.zeros(1, *INPUT_SHAPE)
+    with torch.no_grad():
+        traced = torch.jit.trace(folded, example)
+    traced = torch.jit.freeze(traced)
+    traced.save(str(path))
+    return path
+
+
+def export_onnx(folded: nn.Module, path: Path, opset: int = 17):
+    example = torch.zeros(1, *INPUT_SHAPE)
+    # dynamic batch axis: pages have any number of cells
+    torch.onnx.export(folded, example, str(path), input_names=["crops"], output_names=["logits"],
+                      dynamic_axes={"crops": {0: "batch"}, "logits": {0: "batch"}},
+                      opset_version=opset, dynamo=False)
+    return path
+
+
+def export_all(weights_path, out_dir=None):
+    """
+    Write <stem>.ts and <stem>.onnx for a .pth checkpoint.
+    returns: {backend: artifact path}
+    """
+    weights_path = Path(weights_path)
+    out_dir = Path(out_dir) if out_dir else weights_path.parent
+    out_dir.mkdir(parents=True, exist_ok=True)
+    folded = load_folded(weights_path)
+    return {
+        "torchscript": export_torchscript(folded, out_dir / f"{weights_path.stem}.ts"),
+        "onnx": export_onnx(folded, out_dir / f"{weights_path.stem}.onnx"),
+    }
+
+
+def load_reference_crops(crops_dir, limit=None):
+    """Normalized [N,1,40,25] tensor of char_*.jpg crops found under crops_dir (detect_and_crop output)."""
+    from recognize_chars import prepare_crops
+
+    paths = sorted(Path(crops_dir).rglob("char_*.jpg"))[:limit]
+    batch, _, _ = prepare_crops(paths)
+    return batch
+
+
+def check_parity(artifacts, weights_path, crops):
+    """
+    Compare argmax of every backend against eager PyTorch.
+    artifacts: {backend: path}
+    returns: {backend: fraction of crops whose predicted class matches eager}
+    """
+    from recognize_chars import load_recognition_model, predict_classes
+
+    model, device = load_recognition_model(weights_path, "cpu")
+    reference = predict_classes(model, device, crops)
+    agreement = {}
+    for backend, path in artifacts.items():
+        model, device = load_recognition_model(path, "cpu", backend=backend)
+        agreement[backend] = float(np.mean(predict_classes(model, device, crops) == reference)) if len(crops) else 1.0
+    return agreement
+
+
+def benchmark(artifacts, weights_path, crops, batch_sizes=(1, 256), repeats=3):
+    """
+    Per-cell latency of every backend on CPU.
+    returns: {backend: {batch_size: ms per cell}}, best of repeats
+    """
+    from recognize_chars import load_recognition_model, predict_classes
+
+    paths = {"eager": weights_path, **artifacts}
+    report = {}
+    for backend, path in paths.items():
+        model, device = load_recognition_model(path, "cpu", backend=backend)
+        predict_classes(model, device, crops[:8])  # warm up
+        report[backend] = {}
+        for batch_size in batch_sizes:
+            best = float("inf")
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                predict_classes(model, device, crops, batch_size)
+                best = min(best, time.perf_counter() - t0)
+            report[backend][batch_size] = best / max(len(crops), 1) * 1000
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export BrailleNet to TorchScript and ONNX.")
+    parser.add_argument("weights", type=Path, help="BrailleNet .pth state dict")
+    parser.add_argument("--out", type=Path, default=None, help="output directory (default: next to weights)")
+    parser.add_argument("--crops", type=Path, default=None, help="directory of reference char_*.jpg crops")
+    parser.add_argument("--limit", type=int, default=2048, help="max reference crops")
+    parser.add_argument("--bench", action="store_true", help="report per-cell latency per backend")
+    args = parser.parse_args(argv)
+
+    artifacts = export_all(args.weights, args.out)
+    for backend, path in artifacts.items():
+        print(f"{backend:<12} {path}")
+    if args.crops is None:
+        return
+
+    crops = load_reference_crops(args.crops, args.limit)
+    print(f"\nParity vs eager on {len(crops)} reference crops:")
+    agreement = check_parity(artifacts, args.weights, crops)
+    for backend, rate in agreement.items():
+        print(f"  {backend:<12} argmax agreement {rate:.4%}")
+
+    if args.bench:
+        print("\nPer-cell latency (ms):")
+        for backend, per_batch in benchmark(artifacts, args.weights, crops).items():
+            print(f"  {backend:<12} " + "  ".join(f"batch {b}: {ms:.4f}" for b, ms in per_batch.items()))
+
+    if any(rate < 1.0 for rate in agreement.values()):
+        raise SystemExit("parity check failed: exported backend disagrees with eager")
+
+
+if __name__ == "__main__":
+    main()
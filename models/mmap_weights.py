@@ -0,0 +1,153 @@
+"""
+Memory-mapped model weights, shared read-only between worker processes.
+
+    python -m models.mmap_weights models/yolo8l.pt
+
+torch.load(mmap=True, weights_only=True) maps a zip-format state dict instead of reading it,
+and load_state_dict(assign=True) makes the model's parameters those mapped tensors: nothing
+is copied, pages come from the page cache and every worker on the node shares them.
+
+BrailleNet .pth files are already plain state dicts, the registry maps them directly
+(older non-zip checkpoints fall back to a normal load; re-save them with export_state_dict).
+
+Ultralytics .pt checkpoints pickle the whole half-precision model, which each worker then
+unpickles, converts to fp32 and fuses. export_yolo writes two files instead:
+    <stem>.mmap.pt       the fused fp32 DetectionModel with meta (empty) tensors, in the
+                         ultralytics checkpoint format, so YOLO() loads it in milliseconds
+    <stem>.mmap.weights  its state dict, mmap-able, conv weights in channels_last (the layout
+                         ultralytics switches to for inference on x86 CPUs)
+Point the detector at the .mmap.pt file. The predictor keeps a private copy of the model;
+after it is set up its tensors are re-pointed at the mapped ones wherever the layout matches.
+"""
+import argparse
+import copy
+from pathlib import Path
+
+import torch
+
+MMAP_SUFFIX = ".mmap.pt"
+WEIGHTS_SUFFIX = ".mmap.weights"
+
+
+def load_state_dict(path, device="cpu"):
+    """
+    Map a state dict saved with torch.save (zip format) without reading it into memory.
+    Legacy (pre-zip) files are loaded normally.
+    """
+    try:
+        state = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+    except RuntimeError:
+        # not a zip archive: cannot be mapped
+        state = torch.load(path, map_location="cpu", weights_only=True)
+    if str(device) != "cpu":
+        state = {k: v.to(device) for k, v in state.items()}
+    return state
+
+
+def export_state_dict(state, path):
+    """Save tensors contiguously in the zip format so load_state_dict can map them."""
+    torch.save({k: v.detach().clone() for k, v in state.items()}, path)
+    return Path(path)
+
+
+def _to_meta(model):
+    """Copy of model whose parameters and buffers are empty meta tensors (other tensor attributes kept)."""
+    skeleton = copy.deepcopy(model)
+    for module in skeleton.modules():
+        for name, param in module._parameters.items():
+            if param is not None:
+                module._parameters[name] = torch.nn.Parameter(param.to("meta"), requires_grad=False)
+        for name, buffer in module._buffers.items():
+            if buffer is not None:
+                module._buffers[name] = buffer.to("meta")
+    return skeleton
+
+
+def weights_path(path):
+    path = str(path)
+    return Path(path[:-len(MMAP_SUFFIX)] + WEIGHTS_SUFFIX)
+
+
+def export_yolo(weights, out=None, channels_last: bool = True):
+    """
+    Convert an ultralytics .pt checkpoint into the .mmap.pt + .mmap.weights pair.
+    out: path of the .mmap.pt file (default: next to weights)
+    returns: (skeleton path, weights path)
+    """
+    from ultralytics.nn.tasks import load_checkpoint
+
+    weights = Path(weights)
+    out = Path(out) if out is not None else weights.with_name(weights.stem + MMAP_SUFFIX)
+    model, ckpt = load_checkpoint(weights, device="cpu", fuse=True)
+    model = model.float().eval()
+    if channels_last:
+        model = model.to(memory_format=torch.channels_last)
+    # clone keeps each tensor's layout (channels_last conv weights stay channels_last)
+    torch.save({k: v.detach().clone() for k, v in model.state_dict().items()}, weights_path(out))
+    torch.save({"model": _to_meta(model), "train_args": ckpt.get("train_args", {}),
+                "version": ckpt.get("version"), "date": ckpt.get("date")}, out)
+    return out, weights_path(out)
+
+
+def _predictor_module(yolo):
+    """The nn.Module the predictor actually runs (AutoBackend layout differs between versions)."""
+    backend = yolo.predictor.model
+    for candidate in (getattr(getattr(backend, "backend", None), "model", None), getattr(backend, "model", None)):
+        if isinstance(candidate, torch.nn.Module):
+            return candidate
+    return None
+
+
+def share_predictor_weights(yolo, state):
+    """
+    Swap the predictor's private weight copies for the mapped tensors of the same layout.
+    returns: number of tensors now shared
+    """
+    module = _predictor_module(yolo)
+    if module is None:
+        return 0
+    own = module.state_dict()
+    shared = {k: v for k, v in state.items()
+              if k in own and own[k].dtype == v.dtype and own[k].stride() == v.stride() and own[k].device == v.device}
+    module.load_state_dict(shared, strict=False, assign=True)
+    return len(shared)
+
+
+def load_yolo(path, device="cpu", precision="fp32"):
+    """
+    YOLO from a .mmap.pt / .mmap.weights pair; on cpu in fp32 the weights stay mapped.
+    """
+    import numpy as np
+    from ultralytics import YOLO
+
+    state = load_state_dict(weights_path(path), device)
+    model = YOLO(str(path))
+    model.model.load_state_dict(state, assign=True)
+    model.overrides["device"] = device
+    model.overrides["half"] = precision == "fp16"
+    if str(device) == "cpu" and precision == "fp32":
+        # set the predictor up now (this is also the warm-up run), then point its copy of the
+        # model at the mapped weights
+        model.predict(source=np.zeros((640, 640, 3), dtype=np.uint8), verbose=False)
+        share_predictor_weights(model, state)
+    return model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write memory-mappable copies of the model weights.")
+    parser.add_argument("weights", type=Path, nargs="+", help="ultralytics .pt checkpoints and/or BrailleNet .pth")
+    parser.add_argument("--no-channels-last", action="store_true",
+                        help="keep YOLO conv weights contiguous (non-x86 inference hosts)")
+    args = parser.parse_args(argv)
+
+    for path in args.weights:
+        if path.suffix == ".pth":
+            out = export_state_dict(load_state_dict(path), path.with_name(path.stem + ".mmap.pth"))
+            print(f"{path} -> {out}")
+        else:
+            skeleton, tensors = export_yolo(path, channels_last=not args.no_channels_last)
+            print(f"{path} -> {skeleton} + {tensors}")
+
+
+if __name__ == "__main__":
+    main()
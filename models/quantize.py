@@ -0,0 +1,189 @@
+"""
+Static INT8 quantization of BrailleNet for CPU serving.
+
+    python -m models.quantize models/recognition_model.pth --calib braillenet_crops/ --eval labeled_crops/
+
+BatchNorm is folded first (models/export.py), conv/linear + ReLU pairs are fused, activation
+ranges are calibrated on a sample of real crops and the converted model is saved as frozen
+TorchScript (<stem>.int8.ts), loaded with backend="int8".
+
+--eval takes crops sorted into one folder per class name ('1', '12', ... '6', as CLASS_NAMES);
+the report gives fp32 and int8 accuracy and their delta per class, plus the throughput gain.
+Without labels, int8 is scored against the fp32 predictions instead.
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+from torch import nn
+from torch.ao import quantization as tq
+
+from models.export import INPUT_SHAPE, load_folded
+
+IMAGE_GLOB = ("*.jpg", "*.jpeg", "*.png")
+
+
+class _Quantizable(nn.Module):
+    def __init__(self, body):
+        super().__init__()
+        self.quant = tq.QuantStub()
+        self.body = body
+        self.dequant = tq.DeQuantStub()
+
+    def forward(self, x):
+        return self.dequant(self.body(self.quant(x)))
+
+
+def _fusable_pairs(body: nn.Sequential):
+    names = list(body._modules)
+    return [[a, b] for a, b in zip(names, names[1:])
+            if isinstance(body[int(a)], (nn.Conv2d, nn.Linear)) and isinstance(body[int(b)], nn.ReLU)]
+
+
+def quantize_static(weights_path, calibration, engine: str = "x86", batch_size: int = 256):
+    """
+    Post-training static quantization.
+    calibration: normalized [N,1,40,25] tensor of real crops (a few hundred is enough)
+    engine: quantized kernel backend ('x86' / 'fbgemm' on Intel/AMD, 'qnnpack' on ARM)
+    returns: quantized model (eval, cpu)
+    """
+    torch.backends.quantized.engine = engine
+    body = load_folded(weights_path)
+    body = tq.fuse_modules(body, _fusable_pairs(body))
+    model = _Quantizable(body).eval()
+    model.qconfig = tq.get_default_qconfig(engine)
+    tq.prepare(model, inplace=True)
+    with torch.no_grad():
+        for start in range(0, len(calibration), batch_size):
+            model(calibration[start:start + batch_size])
+    return tq.convert(model)
+
+
+def save_int8(model, path: Path):
+    with torch.no_grad():
+        traced = torch.jit.trace(model, torch.zeros(1, *INPUT_SHAPE))
+    torch.jit.freeze(traced).save(str(path))
+    return path
+
+
+def _images(folder):
+    return sorted(p for pattern in IMAGE_GLOB for p in Path(folder).rglob(pattern))
+
+
+def load_calibration(folder, limit: int = 512, seed: int = 0):
+    """Random sample of up to limit crops found under folder, as a normalized tensor."""
+    from recognize_chars import prepare_crops
+
+    paths = _images(folder)
+    rng = np.random.default_rng(seed)
+    if len(paths) > limit:
+        paths = [paths[i] for i in sorted(rng.choice(len(paths), limit, replace=False))]
+    batch, _, _ = prepare_crops(paths)
+    return batch
+
+
+def load_labeled(folder):
+    """
+    Crops of a folder-per-class tree (folder name = class name).
+    returns: (tensor, int array of class indices)
+    """
+    from recognize_chars import CLASS_NAMES, prepare_crops
+
+    paths, labels = [], []
+    for class_idx, name in enumerate(CLASS_NAMES):
+        found = _images(Path(folder) / name)
+        paths += found
+        labels += [class_idx] * len(found)
+    batch, positions, _ = prepare_crops(paths)
+    return batch, np.asarray(labels, dtype=np.int64)[positions]
+
+
+def _throughput(model, device, crops, batch_size=256, repeats=3):
+    from recognize_chars import predict_classes
+
+    predict_classes(model, device, crops[:8])
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        predict_classes(model, device, crops, batch_size)
+        best = min(best, time.perf_counter() - t0)
+    return len(crops) / best if best > 0 else 0.0
+
+
+def compare(weights_path, int8_path, crops, labels=None):
+    """
+    fp32 vs int8 on the same crops.
+    labels: true class indices; None scores int8 against the fp32 predictions
+    returns: dict with overall accuracy, per-class rows (class, count, fp32, int8, delta)
+             and cells/sec of both models on cpu
+    """
+    from recognize_chars import CLASS_NAMES, load_recognition_model, predict_classes
+
+    fp32, device = load_recognition_model(weights_path, "cpu")
+    int8, _ = load_recognition_model(int8_path, "cpu", backend="int8")
+    pred_fp32 = predict_classes(fp32, device, crops)
+    pred_int8 = predict_classes(int8, device, crops)
+    truth = pred_fp32 if labels is None else labels
+
+    per_class = []
+    for class_idx, name in enumerate(CLASS_NAMES):
+        mask = truth == class_idx
+        if not mask.any():
+            continue
+        acc_fp32 = float(np.mean(pred_fp32[mask] == class_idx))
+        acc_int8 = float(np.mean(pred_int8[mask] == class_idx))
+        per_class.append((name, int(mask.sum()), acc_fp32, acc_int8, acc_int8 - acc_fp32))
+
+    fp32_rate = _throughput(fp32, device, crops)
+    int8_rate = _throughput(int8, device, crops)
+    return {
+        "n": len(crops),
+        "labeled": labels is not None,
+        "fp32_accuracy": float(np.mean(pred_fp32 == truth)) if len(crops) else 0.0,
+        "int8_accuracy": float(np.mean(pred_int8 == truth)) if len(crops) else 0.0,
+        "per_class": per_class,
+        "fp32_cells_per_sec": fp32_rate,
+        "int8_cells_per_sec": int8_rate,
+        "speedup": int8_rate / fp32_rate if fp32_rate else 0.0,
+    }
+
+
+def print_report(report):
+    against = "labels" if report["labeled"] else "fp32 predictions"
+    print(f"Accuracy on {report['n']} crops (against {against}): "
+          f"fp32 {report['fp32_accuracy']:.4f}  int8 {report['int8_accuracy']:.4f}")
+    print(f"{'class':<8}{'n':>6}{'fp32':>9}{'int8':>9}{'delta':>9}")
+    for name, count, acc_fp32, acc_int8, delta in report["per_class"]:
+        print(f"{name:<8}{count:>6}{acc_fp32:>9.4f}{acc_int8:>9.4f}{delta:>+9.4f}")
+    print(f"Throughput: fp32 {report['fp32_cells_per_sec']:.0f} cells/s, "
+          f"int8 {report['int8_cells_per_sec']:.0f} cells/s ({report['speedup']:.2f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Static INT8 quantization of BrailleNet.")
+    parser.add_argument("weights", type=Path, help="BrailleNet .pth state dict")
+    parser.add_argument("--calib", type=Path, required=True, help="directory of real crops for calibration")
+    parser.add_argument("--calib-size", type=int, default=512)
+    parser.add_argument("--eval", type=Path, default=None, help="folder-per-class labeled crops for the report")
+    parser.add_argument("--engine", default="x86", choices=["x86", "fbgemm", "qnnpack"])
+    parser.add_argument("--out", type=Path, default=None, help="output file (default: <stem>.int8.ts next to weights)")
+    args = parser.parse_args(argv)
+
+    calibration = load_calibration(args.calib, args.calib_size)
+    if not len(calibration):
+        raise SystemExit(f"no calibration crops found under {args.calib}")
+    out = args.out or args.weights.with_name(f"{args.weights.stem}.int8.ts")
+    save_int8(quantize_static(args.weights, calibration, args.engine), out)
+    print(f"calibrated on {len(calibration)} crops -> {out}")
+
+    if args.eval is not None:
+        crops, labels = load_labeled(args.eval)
+    else:
+        crops, labels = calibration, None
+    print_report(compare(args.weights, out, crops, labels))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from pathlib import Path
+
+
+def _resolve_device(device=None):
+    import torch
+
+    if device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    return str(torch.device(device))
+
+
+def _module_nbytes(module):
+    """Bytes held by parameters + buffers of a torch module."""
+    total = 0
+    for t in list(module.parameters()) + list(module.buffers()):
+        total += t.numel() * t.element_size()
+    return total
+
+
+def _load_braillenet(path, device, precision):
+    import torch
+    from models.model_definition import BrailleNet
+    from recognize_chars import CLASS_NAMES
+    from models.mmap_weights import load_state_dict
+
+    # empty (meta) module, then the weights mapped from disk become its parameters:
+    # no random init, no copy, pages shared with every other worker reading the file
+    with torch.device("meta"):
+        model = BrailleNet(num_classes=len(CLASS_NAMES))
+    model.load_state_dict(load_state_dict(path, device), assign=True)
+    if precision == "fp16":
+        model = model.half()
+    model.eval()
+    return model, _module_nbytes(model)
+
+
+def _warm_braillenet(model, device):
+    import torch
+
+    dtype = next(iter(model.parameters()), torch.zeros(0)).dtype
+    with torch.no_grad():
+        model(torch.zeros(2, 1, 40, 25, dtype=dtype, device=device))
+
+
+def _load_braillenet_torchscript(path, device, precision):
+    import torch
+
+    model = torch.jit.load(path, map_location=device)
+    if precision == "fp16":
+        model = model.half()
+    model.eval()
+    return model, _module_nbytes(model)
+
+
+def _load_braillenet_int8(path, device, precision):
+    if device != "cpu" or precision != "fp32":
+        raise ValueError("the int8 backend runs on cpu only (fp32 in/out)")
+    return _load_braillenet_torchscript(path, device, precision)
+
+
+class OnnxBrailleNet:
+    """ONNX Runtime session behind the same call signature as the torch model (CPU only)."""
+
+    def __init__(self, path):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("the onnx backend needs onnxruntime (pip install onnxruntime)") from e
+
+        self.session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, batch):
+        import torch
+
+        logits = self.session.run(None, {self.input_name: batch.detach().cpu().numpy()})[0]
+        return torch.from_numpy(logits)
+
+
+def _load_braillenet_onnx(path, device, precision):
+    import os
+
+    if device != "cpu" or precision != "fp32":
+        raise ValueError("the onnx backend runs on cpu in fp32 only")
+    return OnnxBrailleNet(path), os.path.getsize(path)
+
+
+def _warm_braillenet_onnx(model, device):
+    import torch
+
+    model(torch.zeros(2, 1, 40, 25))
+
+
+def _load_yolo(path, device, precision):
+    from ultralytics import YOLO
+    from models.mmap_weights import MMAP_SUFFIX, load_yolo
+
+    if path.endswith(MMAP_SUFFIX):
+        # memory-mapped export, see models/mmap_weights.py
+        model = load_yolo(path, device, precision)
+        return model, _module_nbytes(model.model)
+    model = YOLO(path)
+    # overrides are merged into every predict() call of this instance
+    model.overrides["device"] = device
+    model.overrides["half"] = precision == "fp16"
+    return model, _module_nbytes(model.model)
+
+
+def _warm_yolo(model, device):
+    import numpy as np
+
+    if model.predictor is not None:
+        # already ran once (memory-mapped loads warm up while sharing the predictor's weights)
+        return
+    model.predict(source=np.zeros((640, 640, 3), dtype=np.uint8), verbose=False)
+
+
+# kind -> (loader(path, device, precision) -> (model, nbytes), warmup(model, device))
+LOADERS = {
+    "braillenet": (_load_braillenet, _warm_braillenet),
+    # exported artifacts, see models/export.py
+    "braillenet_torchscript": (_load_braillenet_torchscript, _warm_braillenet),
+    "braillenet_onnx": (_load_braillenet_onnx, _warm_braillenet_onnx),
+    # static int8 TorchScript, see models/quantize.py
+    "braillenet_int8": (_load_braillenet_int8, _warm_braillenet),
+    "yolo": (_load_yolo, _warm_yolo),
+}
+
+
+class _Entry:
+    def __init__(self, model, nbytes):
+        self.model = model
+        self.nbytes = nbytes
+        self.warmed = False
+        # serializes inference for models that are not thread-safe (ultralytics predictor)
+        self.lock = threading.Lock()
+
+
+class _Loading:
+    """Lock of one model being loaded and the calls holding or waiting for it."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = 0
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models keyed by (kind, path, device, precision).
+    Each model is loaded once and shared between calls and threads.
+    memory_budget: max bytes of resident weights, least recently used models are evicted first
+    (None = unlimited).
+    """
+
+    def __init__(self, memory_budget=None):
+        self.memory_budget = memory_budget
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._loading = {}  # key -> _Loading, so two threads never load the same model twice
+
+    def _key(self, kind, path, device, precision):
+        if kind not in LOADERS:
+            raise ValueError(f"Unknown model kind: {kind}")
+        return (kind, str(Path(path).resolve()), _resolve_device(device), precision)
+
+    def get(self, kind, path, device=None, precision="fp32", warmup=False):
+        key = self._key(kind, path, device, precision)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if entry.warmed or not warmup:
+                    return entry.model
+            loading = self._loading.get(key)
+            if loading is None:
+                loading = self._loading[key] = _Loading()
+            loading.users += 1
+
+        loader, warm = LOADERS[kind]
+        try:
+            with loading.lock:
+                # loaded by the call we waited for; if that load failed, this call retries it
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        self._entries.move_to_end(key)
+                if entry is None:
+                    entry = _Entry(*loader(key[1], key[2], precision))
+                    if warmup:
+                        warm(entry.model, key[2])
+                        entry.warmed = True
+                    with self._lock:
+                        self._entries[key] = entry
+                        self._evict(keep=key)
+                elif warmup and not entry.warmed:
+                    # loaded earlier without warm-up: run it now, not alongside inference
+                    with entry.lock:
+                        warm(entry.model, key[2])
+                    entry.warmed = True
+        finally:
+            # the last call out drops the lock, also after a failed load; while any call still
+            # waits on it, newcomers share it rather than loading next to the waiter
+            with self._lock:
+                loading.users -= 1
+                if loading.users == 0 and self._loading.get(key) is loading:
+                    del self._loading[key]
+        return entry.model
+
+    def get_yolo(self, path, device=None, precision="fp32", warmup=False):
+        return self.get("yolo", path, device, precision, warmup)
+
+    def get_braillenet(self, path, device=None, precision="fp32", warmup=False, backend="eager"):
+        """backend: 'eager' (.pth), 'torchscript' (.ts), 'onnx' (.onnx, cpu) or 'int8' (.int8.ts, cpu)"""
+        kind = "braillenet" if backend == "eager" else f"braillenet_{backend}"
+        return self.get(kind, path, device, precision, warmup)
+
+    def warmup(self, yolo_path=None, recog_path=None, device=None, precision="fp32", backend="eager"):
+        """Load and run a dummy input through the given models (call at startup)."""
+        if yolo_path is not None:
+            self.get_yolo(yolo_path, device, precision, warmup=True)
+        if recog_path is not None:
+            if backend in ("onnx", "int8"):
+                device = "cpu"
+            self.get_braillenet(recog_path, device, precision, warmup=True, backend=backend)
+
+    def lock(self, model):
+        """Context manager serializing inference on a shared model."""
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.model is model:
+                    return entry.lock
+        return nullcontext()
+
+    def key_of(self, model):
+        """(kind, path, device, precision) of a loaded model, None if it did not come from here"""
+        with self._lock:
+            for key, entry in self._entries.items():
+                if entry.model is model:
+                    return key
+        return None
+
+    def unload(self, kind, path, device=None, precision="fp32"):
+        key = self._key(kind, path, device, precision)
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def resident(self):
+        """List of (key, nbytes), least recently used first."""
+        with self._lock:
+            return [(key, entry.nbytes) for key, entry in self._entries.items()]
+
+    def resident_bytes(self):
+        with self._lock:
+            return sum(entry.nbytes for entry in self._entries.values())
+
+    def _evict(self, keep=None):
+        if self.memory_budget is None:
+            return
+        while self.resident_bytes() > self.memory_budget and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                self._entries.move_to_end(key)
+                key = next(iter(self._entries))
+            self._entries.pop(key)
+
+
+registry = ModelRegistry()
@@ -0,0 +1,169 @@
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Optional
+from PIL import Image
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+TIFF_EXTENSIONS = (".tif", ".tiff")
+PDF_EXTENSIONS = (".pdf",)
+PAGE_EXTENSIONS = IMAGE_EXTENSIONS + TIFF_EXTENSIONS + PDF_EXTENSIONS
+
+# PDFs are vector/compressed: rasterize at a braille-friendly resolution
+DEFAULT_PDF_DPI = 300
+
+
+@dataclass
+class Page:
+    """One decoded page of a book (single image, TIFF frame or PDF page)."""
+    book: str
+    index: int  # 0-based page index inside the book
+    image: Optional[Image.Image]  # RGB
+
+
+def _kind(source, name=None):
+    name = name or getattr(source, "name", None) or str(source)
+    suffix = Path(name).suffix.lower()
+    if suffix in PDF_EXTENSIONS:
+        return "pdf"
+    if suffix in TIFF_EXTENSIONS:
+        return "tiff"
+    return "image"
+
+
+def _rewind(source):
+    """File-likes are read from the start, so one upload can be counted, then iterated."""
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source
+
+
+def _iter_tiff(source, book):
+    with Image.open(_rewind(source)) as tiff:
+        for index in range(getattr(tiff, "n_frames", 1)):
+            tiff.seek(index)
+            # convert() copies the current frame, the file keeps only one frame decoded
+            yield Page(book, index, tiff.convert("RGB"))
+
+
+def _open_pdf(source):
+    try:
+        import pypdfium2 as pdfium
+    except ImportError as e:
+        raise ImportError("PDF input needs pypdfium2 (pip install pypdfium2)") from e
+
+    if hasattr(source, "read"):
+        source = _rewind(source).read()
+    return pdfium.PdfDocument(source)
+
+
+def _render_pdf_page(pdf, index, dpi):
+    pdf_page = pdf[index]
+    try:
+        return pdf_page.render(scale=dpi / 72).to_pil().convert("RGB")
+    finally:
+        pdf_page.close()
+
+
+def _iter_pdf(source, book, dpi):
+    pdf = _open_pdf(source)
+    try:
+        for index in range(len(pdf)):
+            yield Page(book, index, _render_pdf_page(pdf, index, dpi))
+    finally:
+        pdf.close()
+
+
+def iter_pages(source, name=None, dpi: int = DEFAULT_PDF_DPI) -> Iterator[Page]:
+    """
+    Lazily yield the pages of a book, one decoded page in memory at a time.
+    source: path or binary file-like (e.g. a Streamlit upload)
+    name: file name used to pick the decoder when source has none
+    dpi: rasterization resolution for PDF pages
+    """
+    book = Path(name or getattr(source, "name", None) or str(source)).stem
+    kind = _kind(source, name)
+    if kind == "pdf":
+        yield from _iter_pdf(source, book, dpi)
+    elif kind == "tiff":
+        yield from _iter_tiff(source, book)
+    else:
+        yield Page(book, 0, Image.open(_rewind(source)).convert("RGB"))
+
+
+def count_pages(source, name=None) -> int:
+    """Number of pages without decoding them."""
+    kind = _kind(source, name)
+    if kind == "pdf":
+        pdf = _open_pdf(source)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    if kind == "tiff":
+        with Image.open(_rewind(source)) as tiff:
+            return getattr(tiff, "n_frames", 1)
+    return 1
+
+
+def read_page(source, index: int, name=None, dpi: int = DEFAULT_PDF_DPI) -> Page:
+    """Decode a single page of a book by index."""
+    book = Path(name or getattr(source, "name", None) or str(source)).stem
+    kind = _kind(source, name)
+    if kind == "pdf":
+        pdf = _open_pdf(source)
+        try:
+            return Page(book, index, _render_pdf_page(pdf, index, dpi))
+        finally:
+            pdf.close()
+    with Image.open(_rewind(source)) as img:
+        img.seek(index)
+        return Page(book, index, img.convert("RGB"))
+
+
+@dataclass
+class BookResult:
+    """Per-page pipeline results of one book, in page order."""
+    book: str
+    pages: List[tuple] = field(default_factory=list)  # (page index, PageResult)
+
+    @property
+    def translated(self):
+        return "\n\n".join(result.translated for _, result in self.pages)
+
+    @property
+    def assembled_braille(self):
+        return "\n\n".join(result.assembled_braille for _, result in self.pages)
+
+
+def iter_book_results(source, name=None, dpi: int = DEFAULT_PDF_DPI, **pipeline_kwargs):
+    """
+    Stream every page of a book through detection, recognition and translation,
+    with the stages of consecutive pages overlapped (pipeline.iter_pipeline).
+    pipeline_kwargs are PipelineConfig fields.
+    yields: (Page, PageResult); Page.image is the labeled overlay when render=True, else None
+            (the decoded page is released inside the pipeline)
+    """
+    from pipeline import iter_pipeline
+
+    in_flight = deque()
+
+    def pages():
+        for page in iter_pages(source, name, dpi):
+            in_flight.append((page.book, page.index))
+            yield page
+
+    for result in iter_pipeline(pages(), **pipeline_kwargs):
+        book, index = in_flight.popleft()
+        yield Page(book, index, result.overlay), result
+
+
+def run_book(source, name=None, dpi: int = DEFAULT_PDF_DPI, **pipeline_kwargs) -> BookResult:
+    """
+    Run the pipeline over a whole book and group the results per page index.
+    Page images are released as soon as their page is processed.
+    """
+    book = BookResult(Path(name or getattr(source, "name", None) or str(source)).stem)
+    for page, result in iter_book_results(source, name, dpi, **pipeline_kwargs):
+        book.pages.append((page.index, result))
+    return book
@@ -0,0 +1,232 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+import time
+from PIL import Image
+import numpy as np
+
+from detect_and_crop import detect_cells, dump_crops, tile_origins
+from layout import DocumentLayout
+from crop_engine import crops_to_tensor
+from results import PageResult
+from metrics import metrics
+from recognize_chars import (_get_strategy, load_recognition_model, classify_batches,
+                             assemble_braille, translate_braille, DEFAULT_BATCH_SIZE)
+
+# MODELS PATHS
+YOLO_MODEL_PATH = Path("models") / "yolo8l.pt"
+RECOG_MODEL_PATH = Path("models") / "recognition_model.pth"
+
+
+def load_page(image):
+    """
+    image: path, PIL image or numpy array (RGB or grayscale)
+    returns: RGB PIL image
+    """
+    if isinstance(image, (str, Path)):
+        image = Image.open(image)
+    elif isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    # open as RGB to avoid paletted-mode errors (e.g., webp/png palette)
+    return image.convert("RGB")
+
+
+@dataclass
+class PipelineConfig:
+    """Settings shared by every stage of the page pipeline."""
+    yolo_model_path: Path = YOLO_MODEL_PATH
+    recog_model_path: Path = RECOG_MODEL_PATH
+    language: str = "English"
+    grade: int = 1
+    space_factor: float = 1.2
+    debug_dir: Optional[Path] = None
+    batch_size: int = DEFAULT_BATCH_SIZE
+    tile_size: Optional[int] = None
+    tile_overlap: int = 256
+    render: bool = False  # draw the labeled overlay (PageResult.overlay)
+    backend: str = "eager"  # recognizer backend: 'eager', 'torchscript', 'onnx' or 'int8'
+    cache: Optional[Any] = None  # glyph_cache.GlyphCache shared by the pages of a run
+    cascade: Optional[Any] = None  # dot_sampler.DotCascade, analytic fast path for clean cells
+    detector: str = "yolo"  # cell detector backend, see detect_and_crop.DETECTORS
+    fuzzy_correction: bool = False  # Russian lexicon search for unlisted misreads
+
+    def __post_init__(self):
+        # fail before the first page rather than in every page's detect stage
+        if self.tile_size is not None:
+            tile_origins(self.tile_size, self.tile_size, self.tile_overlap)
+
+
+class PageJob:
+    """State of one page while it moves through the stages."""
+
+    def __init__(self, image, name: str = ""):
+        self.image = image  # raw input, dropped once decoded
+        self.name = name
+        self.page = None  # RGB PIL image
+        self.gray = None  # (H,W) uint8
+        self.layout = None
+        self.prepared = None
+        self.cells = None
+        self.assembled = ""
+        self.translated = ""
+        self.timings = {}
+
+    def result(self):
+        return PageResult(name=self.name, layout=self.layout, class_idx=self.cells.class_idx,
+                          predictions=self.cells.predictions, unicode=self.cells.unicode,
+                          assembled_braille=self.assembled, translated=self.translated,
+                          failed=self.cells.failed, timings=self.timings)
+
+
+def stage_decode(job: PageJob, config: PipelineConfig):
+    if job.name == "" and isinstance(job.image, (str, Path)):
+        job.name = Path(job.image).stem
+    job.page = load_page(job.image)
+    job.image = None
+    # crops come from the grayscale page, same pixels as crop -> convert("L")
+    job.gray = np.asarray(job.page.convert("L"))
+
+
+def stage_detect(job: PageJob, config: PipelineConfig):
+    boxes, scores = detect_cells(job.page, config.detector, config.yolo_model_path,
+                                 config.tile_size, config.tile_overlap)
+    job.layout = DocumentLayout.from_boxes(boxes, scores=scores)
+
+
+def stage_crop(job: PageJob, config: PipelineConfig):
+    if config.debug_dir is not None:
+        dump_crops(Path(config.debug_dir), job.page, job.layout.to_items())
+
+    # one vectorized crop + resize + normalize pass for the whole page
+    cells, valid = crops_to_tensor(job.gray, job.layout.boxes)
+    failed = [f"char_{idx + 1}: empty box" for idx in np.flatnonzero(~valid)]
+    job.prepared = (cells[valid], np.flatnonzero(valid).tolist(), failed)
+    job.gray = None
+    if not config.render:
+        job.page = None
+
+
+def stage_recognize(job: PageJob, config: PipelineConfig):
+    recognition_model, device = load_recognition_model(config.recog_model_path, backend=config.backend)
+    job.cells = classify_batches(recognition_model, device, [job.prepared], config.batch_size,
+                                 config.cache, config.cascade)[0]
+    job.prepared = None
+
+
+def stage_assemble(job: PageJob, config: PipelineConfig):
+    strategy = _get_strategy(config.language)
+    job.assembled = assemble_braille(job.layout, job.cells.unicode, strategy, config.space_factor)
+
+
+def stage_translate(job: PageJob, config: PipelineConfig):
+    job.translated = translate_braille(_get_strategy(config.language), job.assembled, config.grade, page=job.name,
+                                       fuzzy_correction=config.fuzzy_correction)
+
+
+def stage_render(job: PageJob, config: PipelineConfig):
+    from draw_labels import render_labels
+
+    result = job.result()
+    result.overlay = render_labels(job.page, result.boxes, result.predictions,
+                                   result.assembled_braille, result.translated, draw_boxes=True)
+    job.page = None
+    return result
+
+
+# (timing name, stage function) in execution order
+STAGES = [
+    ("decode", stage_decode),
+    ("detect", stage_detect),
+    ("crop", stage_crop),
+    ("recognize", stage_recognize),
+    ("assemble", stage_assemble),
+    ("translate", stage_translate),
+]
+
+
+def run_stage(name, fn, job: PageJob, config: PipelineConfig):
+    with metrics.stage(name, job.name, config.language.lower()) as rec:
+        t0 = time.perf_counter()
+        out = fn(job, config)
+        job.timings[name] = time.perf_counter() - t0
+        if metrics.enabled and job.layout is not None:
+            rec.cells = len(job.layout)
+            rec.unknown = job.cells.predictions.count("?") if job.cells is not None else 0
+    return out
+
+
+def finish_job(job: PageJob, config: PipelineConfig) -> PageResult:
+    if config.render:
+        return run_stage("render", stage_render, job, config)
+    return job.result()
+
+
+def run_pipeline(image, yolo_model_path: Path = YOLO_MODEL_PATH, recog_model_path: Path = RECOG_MODEL_PATH,
+                 language: str = "English", grade: int = 1, space_factor: float = 1.2,
+                 debug_dir: Optional[Path] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 tile_size: Optional[int] = None, tile_overlap: int = 256, name: str = "",
+                 render: bool = False, backend: str = "eager", cache=None,
+                 cascade=None, detector: str = "yolo", fuzzy_correction: bool = False) -> PageResult:
+    """
+    Detect, crop, recognize and translate a single page without touching disk.
+    image: path, PIL image or numpy array
+    debug_dir: if given, also dump char_{idx}.jpg + metadata.json there (legacy layout)
+    batch_size: crops per BrailleNet forward pass
+    tile_size: run detection on overlapping full-resolution tiles of this size (large high-DPI scans);
+               None letterboxes the whole page as before
+    name: identifier stored on the result (defaults to the file stem when image is a path)
+    render: also draw the labeled overlay into PageResult.overlay
+    backend: recognizer backend, 'eager' (.pth), 'torchscript' (.ts), 'onnx' (.onnx, cpu) or
+             'int8' (.int8.ts, cpu); recog_model_path must point at the matching artifact
+             (see models/export.py, models/quantize.py)
+    cache: optional glyph_cache.GlyphCache; pass the same one for every page of a batch
+    cascade: optional dot_sampler.DotCascade; only low-confidence cells reach BrailleNet
+    detector: 'yolo', or 'blob' for the classical dot detector on clean scans (no YOLO model needed)
+    fuzzy_correction: Russian only, also fix misreads the lexicon does not list by searching it for
+                      the nearest word; off by default because it also rewrites real words missing
+                      from the lexicon
+    """
+    config = PipelineConfig(yolo_model_path, recog_model_path, language, grade, space_factor,
+                            debug_dir, batch_size, tile_size, tile_overlap, render, backend, cache, cascade,
+                            detector, fuzzy_correction)
+    job = PageJob(image, name)
+    for stage_name, fn in STAGES:
+        run_stage(stage_name, fn, job, config)
+    return finish_job(job, config)
+
+
+def _as_job(item):
+    # page_source.Page carries its own identity
+    if hasattr(item, "image") and hasattr(item, "index"):
+        return PageJob(item.image, f"{item.book}_p{item.index + 1}")
+    return PageJob(item)
+
+
+def iter_pipeline(images, config: Optional[PipelineConfig] = None, queue_size: int = 2, **kwargs):
+    """
+    Overlapped version of run_pipeline for many pages.
+    Page decode, detection, crop + recognition, assembly + translation and (optionally)
+    overlay rendering run as concurrent stages linked by bounded queues.
+    images: iterable of paths / PIL images / arrays / page_source.Page, consumed lazily
+    config: PipelineConfig, or pass its fields as kwargs
+    yields: PageResult in input order
+    """
+    from pipeline_executor import StagedExecutor
+
+    config = config or PipelineConfig(**kwargs)
+
+    def stage(*names_fns):
+        def fn(job):
+            for name, f in names_fns:
+                run_stage(name, f, job, config)
+            return job
+        return fn
+
+    stages = [
+        ("decode", stage(("decode", stage_decode))),
+        ("detect", stage(("detect", stage_detect))),
+        ("recognize", stage(("crop", stage_crop), ("recognize", stage_recognize))),
+        ("translate", stage(("assemble", stage_assemble), ("translate", stage_translate))),
+        ("render", lambda job: finish_job(job, config)),
+    ]
+    yield from StagedExecutor(stages, queue_size).run(_as_job(item) for item in images)
@@ -0,0 +1,100 @@
+"""
+Staged pipeline executor: every stage runs in its own thread and stages are connected by
+bounded queues, so page N+1 is decoded/detected while page N is recognized.
+
+The bounded queues give backpressure: a fast stage blocks once `queue_size` pages wait in
+front of a slow one, so at most ~(stages + 1) * queue_size pages are in memory whatever the
+batch length. Torch, ultralytics and PIL release the GIL in their heavy loops, which is
+where the overlap comes from.
+"""
+import queue
+import threading
+
+_DONE = object()
+
+
+class _Slot:
+    """One item travelling through the stages, with the first error it hit."""
+    __slots__ = ("item", "error")
+
+    def __init__(self, item):
+        self.item = item
+        self.error = None
+
+
+class StagedExecutor:
+    """
+    stages: list of (name, fn) where fn(item) -> item; run left to right on every item
+    queue_size: max items waiting between two stages
+    """
+
+    def __init__(self, stages, queue_size: int = 2):
+        self.stages = list(stages)
+        self.queue_size = queue_size
+
+    def run(self, items):
+        """
+        Feed items lazily through all stages.
+        yields: stage outputs in input order; an item whose stage raised re-raises here
+        """
+        stop = threading.Event()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+
+        def put(q, value):
+            # bounded put that gives up when the consumer went away
+            while not stop.is_set():
+                try:
+                    q.put(value, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def feed():
+            try:
+                for item in items:
+                    if not put(queues[0], _Slot(item)):
+                        return
+            except Exception as e:
+                slot = _Slot(None)
+                slot.error = e
+                put(queues[0], slot)
+            put(queues[0], _DONE)
+
+        def work(fn, q_in, q_out):
+            while True:
+                slot = q_in.get()
+                if slot is _DONE:
+                    put(q_out, _DONE)
+                    return
+                if slot.error is None:
+                    try:
+                        slot.item = fn(slot.item)
+                    except Exception as e:
+                        slot.error = e
+                if not put(q_out, slot):
+                    return
+
+        threads = [threading.Thread(target=feed, name="stage-feed", daemon=True)]
+        for i, (name, fn) in enumerate(self.stages):
+            threads.append(threading.Thread(target=work, args=(fn, queues[i], queues[i + 1]),
+                                            name=f"stage-{name}", daemon=True))
+        for t in threads:
+            t.start()
+
+        try:
+            while True:
+                slot = queues[-1].get()
+                if slot is _DONE:
+                    break
+                if slot.error is not None:
+                    raise slot.error
+                yield slot.item
+        finally:
+            stop.set()
+            # unblock stages waiting on a full/empty queue so the threads can exit
+            for q in queues:
+                try:
+                    q.put_nowait(_DONE)
+                except queue.Full:
+                    pass
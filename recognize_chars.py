@@ -1,64 +1,302 @@
 from PIL import Image
 from pathlib import Path
+import numpy as np
 import json
-from braille_utils import dotpattern_to_unicode, estimate_space_threshold
+import time
+from braille_utils import dotpattern_to_unicode
+from layout import DocumentLayout
+from results import CellPredictions, PageResult, write_page_result
+from metrics import metrics, count_untranslated
+
+from braille_transcriptor.strategies import get_strategy
+
+# class names: my model outputs labels that are string representations of active dots
+# keep the same list (length 63)
+CLASS_NAMES = ['1', '12', '123', '1234', '12345', '123456', '12346', '1235', '12356', '1236', '124', '1245', '12456',
+              '1246', '125', '1256', '126', '13', '134', '1345', '13456', '1346', '135', '1356', '136', '14', '145',
+              '1456', '146', '15', '156', '16', '2', '23', '234', '2345', '23456', '2346', '235', '2356', '236', '24',
+              '245', '2456', '246', '25', '256', '26', '3', '34', '345', '3456', '346', '35', '356', '36', '4', '45',
+              '456', '46', '5', '56', '6']
+CLASS_UNICODE = [dotpattern_to_unicode(name) for name in CLASS_NAMES]
+
+# crops per forward pass; large enough to keep SIMD/threads busy on CPU
+DEFAULT_BATCH_SIZE = 256
 
-# import strategies
-from braille_transcriptor.strategies.english import EnglishStrategy
-from braille_transcriptor.strategies.french import FrenchStrategy
-from braille_transcriptor.strategies.arabic import ArabicStrategy
-from braille_transcriptor.strategies.russian import RussianStrategy
 
 def _get_strategy(language: str):
-    # Language strategy selection
-    if language.lower() == "english":
-        strategy = EnglishStrategy()
-    elif language.lower() == "french": 
-        strategy = FrenchStrategy()
-    elif language.lower() == "arabic":
-        strategy = ArabicStrategy()
-    elif language.lower() == "russian":
-        strategy = RussianStrategy()
-    else:
-        strategy = EnglishStrategy()
-    
-    return strategy
-
-def recognize_characters(crops_dir: Path, model_path: Path, language: str = "English", grade: int = 1, space_factor: float = 1.2):
+    # shared instance per language, its module is imported on first use
+    return get_strategy(language)
+
+
+def _language_label(strategy):
+    language = getattr(strategy, "language", None)
+    return getattr(language, "value", "")
+
+
+def load_recognition_model(model_path: Path, device=None, precision: str = "fp32", backend: str = "eager"):
     """
-    crops_dir: folder with subfolders per document (each contains char_*.jpg and metadata.json)
-    model_path: recognition model weights
-    language: 'English' | 'French' | 'Arabic' | 'Russian'
-    grade: 1 or 2
-    space_factor: adjust gap threshold multiplier (1.0..2.0)
+    Get BrailleNet with its weights from the process-wide model registry
+    (loaded once, then shared between calls and threads).
+    backend: 'eager' (.pth state dict), 'torchscript', 'onnx' (ONNX Runtime, cpu only) or
+             'int8' (static int8 TorchScript, cpu only); exported artifacts come from
+             models/export.py and models/quantize.py
+    returns: (model, device)
     """
     # Import PyTorch modules only when needed to avoid Streamlit compatibility issues
     import torch
+    from models.registry import registry
+
+    if backend in ("onnx", "int8"):
+        device = torch.device("cpu")
+    elif device is None:
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    recognition_model = registry.get_braillenet(model_path, device, precision, backend=backend)
+    return recognition_model, device
+
+
+def _build_transform():
     import torchvision.transforms as T
-    from models.model_definition import BrailleNet
-    
-    # class names: my model outputs labels that are string representations of active dots
-    # keep the same list (length 63)
-    class_names = ['1', '12', '123', '1234', '12345', '123456', '12346', '1235', '12356', '1236', '124', '1245', '12456',
-                   '1246', '125', '1256', '126', '13', '134', '1345', '13456', '1346', '135', '1356', '136', '14', '145',
-                   '1456', '146', '15', '156', '16', '2', '23', '234', '2345', '23456', '2346', '235', '2356', '236', '24',
-                   '245', '2456', '246', '25', '256', '26', '3', '34', '345', '3456', '346', '35', '356', '36', '4', '45',
-                   '456', '46', '5', '56', '6']
-
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    recognition_model = BrailleNet(num_classes=len(class_names)).to(device)
-    recognition_model.load_state_dict(torch.load(model_path, map_location=device))
-    recognition_model.eval()
-
-    transform = T.Compose([
+
+    return T.Compose([
         T.Grayscale(num_output_channels=1),
         T.Resize((40, 25)),
         T.ToTensor(),
         T.Normalize([0.5], [0.5])
     ])
 
+
+def _to_pil(crop):
+    if isinstance(crop, Path):
+        return Image.open(crop)
+    if isinstance(crop, np.ndarray):
+        return Image.fromarray(np.ascontiguousarray(crop))
+    return crop
+
+
+def prepare_crops(crops):
+    """
+    Turn crops into one normalized [N,1,40,25] tensor.
+    crops: iterable of image paths, PIL images or numpy arrays (grayscale or RGB)
+    returns: (tensor of the crops that loaded, list of their positions, failed messages)
+    """
+    import torch
+
+    transform = _build_transform()
+    tensors, positions, failed = [], [], []
+    for idx, crop in enumerate(crops):
+        try:
+            tensors.append(transform(_to_pil(crop).convert("L")))
+            positions.append(idx)
+        except Exception as e:
+            name = crop.name if isinstance(crop, Path) else f"char_{idx + 1}"
+            failed.append(f"{name}: {str(e)}")
+    batch = torch.stack(tensors) if tensors else torch.empty(0, 1, 40, 25)
+    return batch, positions, failed
+
+
+def predict_classes(recognition_model, device, batch, batch_size: int = DEFAULT_BATCH_SIZE, cache=None,
+                    cascade=None):
+    """
+    Run BrailleNet over a [N,1,40,25] tensor in chunks of batch_size.
+    cache: optional glyph_cache.GlyphCache; cached glyphs skip the CNN and repeats inside
+           the batch are run once
+    cascade: optional dot_sampler.DotCascade; cells the analytic dot sampler reads with
+             confidence keep its label, only the rest reach the cache / CNN
+    returns: numpy array of N class indices (into CLASS_NAMES)
+    """
+    import torch
+
+    if cascade is not None and len(batch):
+        class_idx, needs_cnn = cascade.split(batch)
+        hard = np.flatnonzero(needs_cnn)
+        if len(hard):
+            class_idx[hard] = predict_classes(recognition_model, device, batch[torch.from_numpy(hard)],
+                                              batch_size, cache)
+        return class_idx
+
+    if cache is not None and len(batch):
+        keys = cache.fingerprints(batch, recognition_model)
+        class_idx = cache.lookup(keys)
+        missing = np.flatnonzero(class_idx < 0)
+        if len(missing):
+            # one forward pass per distinct missing glyph
+            first = {}
+            for i in missing:
+                first.setdefault(keys[i], i)
+            unique = np.fromiter(first.values(), dtype=np.int64, count=len(first))
+            computed = predict_classes(recognition_model, device, batch[torch.from_numpy(unique)], batch_size)
+            by_key = dict(zip(first, computed))
+            class_idx[missing] = [by_key[keys[i]] for i in missing]
+            cache.store(first, computed)
+        return class_idx
+
+    # frozen TorchScript and ONNX sessions expose no parameters: fp32 input
+    params = getattr(recognition_model, "parameters", None)
+    dtype = next(iter(params()), torch.zeros(0)).dtype if params else torch.float32
+    preds = torch.empty(len(batch), dtype=torch.long, device=device)
+    with torch.no_grad():
+        for start in range(0, len(batch), batch_size):
+            chunk = batch[start:start + batch_size].to(device, dtype)
+            preds[start:start + len(chunk)] = recognition_model(chunk).argmax(dim=1)
+    # single device -> host copy for the whole batch
+    return preds.cpu().numpy()
+
+
+def _page_predictions(page_idx, failed):
+    per_char_predictions = [CLASS_NAMES[c] if c >= 0 else "?" for c in page_idx]
+    per_char_unicode = [CLASS_UNICODE[c] if c >= 0 else "?" for c in page_idx]
+    return CellPredictions(page_idx, per_char_predictions, per_char_unicode, failed)
+
+
+def _classify_group(recognition_model, device, tensors, pages, batch_size, cache, cascade):
+    """
+    CellPredictions of a few buffered pages, run as one batch.
+    tensors: the pages' crop tensors, emptied once pooled so only one copy stays alive
+    pages: (number of crops, positions, failed) per page
+    """
+    import torch
+
+    pooled = tensors[0] if len(tensors) == 1 else torch.cat(tensors)
+    tensors.clear()
+    class_idx = predict_classes(recognition_model, device, pooled, batch_size, cache, cascade)
+
+    results = []
+    offset = 0
+    for n, positions, failed in pages:
+        # failed crops keep their place as unknown markers
+        page_idx = np.full(len(positions) + len(failed), -1, dtype=np.int64)
+        page_idx[positions] = class_idx[offset:offset + n]
+        offset += n
+        results.append(_page_predictions(page_idx, failed))
+    return results
+
+
+def classify_batches(recognition_model, device, prepared, batch_size: int = DEFAULT_BATCH_SIZE, cache=None,
+                     cascade=None):
+    """
+    Pool already-normalized page tensors into shared batches.
+    Pages are consumed in order and buffered until they hold batch_size crops, then run and
+    released, so at most about one batch plus one page of crops is held at a time.
+    prepared: iterable of (tensor [n,1,40,25], positions, failed) per page, as from prepare_crops
+              or crop_engine.crops_to_tensor; a generator keeps pages from being decoded ahead
+    cache: optional GlyphCache shared across pages / calls
+    cascade: optional DotCascade (analytic fast path for clean cells)
+    returns: list of CellPredictions, one per page, same order
+    """
+    results = []
+    tensors, pages, buffered = [], [], 0
+    for batch, positions, failed in prepared:
+        tensors.append(batch)
+        pages.append((len(batch), positions, failed))
+        buffered += len(batch)
+        del batch
+        if buffered >= batch_size:
+            results += _classify_group(recognition_model, device, tensors, pages, batch_size, cache, cascade)
+            pages, buffered = [], 0
+    if pages:
+        results += _classify_group(recognition_model, device, tensors, pages, batch_size, cache, cascade)
+    return results
+
+
+def classify_pages(recognition_model, device, pages, batch_size: int = DEFAULT_BATCH_SIZE, cache=None,
+                   cascade=None):
+    """
+    Pool the crops of several pages into shared batches.
+    pages: iterable of crop iterables (one per page, each in reading order); a page's crops
+           are only loaded when it reaches the batch buffer
+    returns: list of CellPredictions, one per page, same order
+    """
+    return classify_batches(recognition_model, device, (prepare_crops(crops) for crops in pages), batch_size,
+                            cache, cascade)
+
+
+def classify_crops(recognition_model, device, crops, batch_size: int = DEFAULT_BATCH_SIZE, cache=None,
+                   cascade=None):
+    """
+    Predict the dot pattern of every crop of one page.
+    crops: iterable of image paths, PIL images or numpy arrays (grayscale or RGB)
+    returns: CellPredictions
+    """
+    return classify_pages(recognition_model, device, [crops], batch_size, cache, cascade)[0]
+
+
+def _space_symbol(strategy):
+    # insert a braille space — prefer grade1/char space if available
+    try:
+        if hasattr(strategy, 'dictionary') and hasattr(strategy.dictionary, 'grade1_map'):
+            return strategy.dictionary.grade1_map['char'][" "]
+    except Exception:
+        pass
+    return " "
+
+
+def assemble_braille(layout, per_char_unicode, strategy, space_factor: float = 1.2):
+    """
+    Join per-char unicode cells into rows, inserting spaces when gaps are large.
+    layout: DocumentLayout, or metadata items (with 'order', 'row', 'x1', 'x2', ...), may be empty
+    per_char_unicode: unicode cells in reading order
+    """
+    if not isinstance(layout, DocumentLayout):
+        layout = DocumentLayout.from_items(layout) if layout else None
+    if layout is None or len(layout) != len(per_char_unicode):
+        # no (usable) metadata: just join
+        return "".join(per_char_unicode).strip()
+
+    space_symbol = _space_symbol(strategy)
+    breaks = layout.word_breaks(space_factor)
+    rows = []
+    for _, cells in layout.row_slices():
+        rows.append("".join(space_symbol + uni if brk else uni
+                            for uni, brk in zip(per_char_unicode[cells], breaks[cells])))
+    # separate rows by space
+    return " ".join(rows).strip()
+
+
+def translate_braille(strategy, assembled_braille: str, grade: int = 1, page: str = "",
+                      fuzzy_correction: bool = False):
+    """
+    Translate assembled braille to readable text using grade.
+    page: page name for the 'from_braille' metrics record
+    fuzzy_correction: also fix unlisted misreads by lexicon search, for grades that correct
+                      against a lexicon (Russian); False keeps the grade's default
+    """
+    with metrics.stage("from_braille", page, _language_label(strategy)) as rec:
+        try:
+            engine = strategy.grade1 if grade == 1 else strategy.grade2
+            if fuzzy_correction and hasattr(engine, "fuzzy_correction"):
+                text = engine.from_braille(assembled_braille, fuzzy_correction=True)
+            else:
+                text = engine.from_braille(assembled_braille)
+        except Exception as e:
+            text = f"[translation error] {str(e)}"
+        if metrics.enabled:
+            rec.cells = count_untranslated(assembled_braille)
+            rec.unknown = count_untranslated(text)
+    return text
+
+
+def recognize_characters(crops_dir: Path, model_path: Path, language: str = "English", grade: int = 1, space_factor: float = 1.2,
+                         batch_size: int = DEFAULT_BATCH_SIZE, write_files: bool = True, backend: str = "eager",
+                         cache=None, cascade=None, fuzzy_correction: bool = False):
+    """
+    crops_dir: folder with subfolders per document (each contains char_*.jpg and metadata.json)
+    model_path: recognition model weights
+    language: 'English' | 'French' | 'Arabic' | 'Russian'
+    grade: 1 or 2
+    space_factor: adjust gap threshold multiplier (1.0..2.0)
+    batch_size: crops per forward pass (cells of consecutive documents share batches)
+    write_files: also write predictions.txt / assembled_braille.txt / translated.txt per document
+    backend: 'eager', 'torchscript', 'onnx' or 'int8' (model_path must point at the matching artifact)
+    cache: optional glyph_cache.GlyphCache; repeat glyphs reuse the cached class
+    cascade: optional dot_sampler.DotCascade; confident clean cells skip BrailleNet
+    fuzzy_correction: Russian only, also fix unlisted misreads by lexicon search (may rewrite real
+                      words the lexicon lacks)
+    returns: list of PageResult, one per document folder (sorted by name)
+    """
+    recognition_model, device = load_recognition_model(model_path, backend=backend)
     strategy = _get_strategy(language)
 
+    docs = []
     for doc_folder in sorted(crops_dir.iterdir()):
         if not doc_folder.is_dir(): 
             continue
@@ -71,101 +309,44 @@ def recognize_characters(crops_dir: Path, model_path: Path, language: str = "Eng
                 metadata = json.load(f)
         items_meta = metadata.get("items", [])
 
-        per_char_predictions = []
-        per_char_unicode = []  # unicode braille per char
-        failed = []
-
         # process files in the order saved (char_1..)
         char_files = sorted([p for p in doc_folder.glob("char_*.jpg")], key=lambda x: int(x.stem.split("_")[1]))
-        for idx, char_file in enumerate(char_files, start=1):
-            try:
-                img = Image.open(char_file).convert("L")
-                img_tensor = transform(img).unsqueeze(0).to(device)
-                with torch.no_grad():
-                    output = recognition_model(img_tensor)
-                    pred_class = output.argmax(dim=1).item()
-                    pred_label = class_names[pred_class]  # e.g. '123'
-                per_char_predictions.append(pred_label)
-                per_char_unicode.append(dotpattern_to_unicode(pred_label))
-            except Exception as e:
-                failed.append(f"{char_file.name}: {str(e)}")
-                per_char_predictions.append("?")
-                per_char_unicode.append("?")
-
-        # save per-char predictions (one per line) for compatibility
-        with open(doc_folder / "predictions.txt", "w", encoding="utf-8") as f:
-            for p in per_char_predictions:
-                f.write(p + "\n")
-
-        # assemble by rows inserting spaces when gaps are large
-        # reconstruct items list in the same order as char files (order field)
-        order_map = {item["order"]: item for item in items_meta} if items_meta else {}
-        # group by row
-        rows = {}
-        widths_all = []
-        for i, uni in enumerate(per_char_unicode, start=1):
-            meta = order_map.get(i)
-            row = meta["row"] if meta else 0
-            rows.setdefault(row, []).append((meta, uni) if meta else (None, uni))
-            if meta:
-                widths_all.append(meta.get("width", 0))
-
-        threshold = estimate_space_threshold(widths_all, factor=space_factor)
-
-        assembled_braille = ""
-        for r_idx in sorted(rows.keys()):
-            row_items = rows[r_idx]
-            # if meta exists we have bounding boxes to compute gaps; else just join
-            if any(m for m, _ in row_items):
-                # build list of (x1,x2,uni)
-                seq = []
-                for m, uni in row_items:
-                    if m:
-                        seq.append((m["x1"], m["x2"], uni))
-                    else:
-                        seq.append((0,0,uni))
-                # sort by x1 to be robust
-                seq.sort(key=lambda x: x[0])
-                for j, (x1, x2, uni) in enumerate(seq):
-                    if j == 0:
-                        assembled_braille += uni
-                        prev_x2 = x2
-                    else:
-                        gap = x1 - prev_x2
-                        if gap > threshold:
-                            # insert a braille space — prefer grade1/char space if available
-                            try:
-                                if hasattr(strategy, 'dictionary') and hasattr(strategy.dictionary, 'grade1_map'):
-                                    space_symbol = strategy.dictionary.grade1_map['char'][" "]
-                                else:
-                                    space_symbol = " "
-                            except Exception:
-                                space_symbol = " "
-                            assembled_braille += space_symbol
-                        assembled_braille += uni
-                        prev_x2 = x2
-            else:
-                # no metadata: just join
-                for _, uni in row_items:
-                    assembled_braille += uni
-            # row break -> add regular space
-            assembled_braille += " "  # separate rows by space
-        assembled_braille = assembled_braille.strip()
-
-        # save assembled braille
-        with open(doc_folder / "assembled_braille.txt", "w", encoding="utf-8") as f:
-            f.write(assembled_braille)
-
-        # now translate braille  readable text using grade
-        try:
-            if grade == 1:
-                translated = strategy.grade1.from_braille(assembled_braille)
-            else:
-                translated = strategy.grade2.from_braille(assembled_braille)
-        except Exception as e:
-            translated = f"[translation error] {str(e)}"
+        docs.append((doc_folder, items_meta, char_files))
+
+    # documents are loaded a batch at a time and share batches
+    t0 = time.perf_counter()
+    page_predictions = classify_pages(recognition_model, device, [files for _, _, files in docs], batch_size,
+                                      cache, cascade)
+    # the time is shared out to documents by cell count
+    recognize_time = time.perf_counter() - t0
+    n_cells_total = sum(len(files) for _, _, files in docs) or 1
+    if metrics.enabled:
+        for (doc_folder, _, char_files), cells in zip(docs, page_predictions):
+            metrics.observe("recognize", recognize_time * len(char_files) / n_cells_total, doc_folder.name,
+                            cells=len(cells.predictions), unknown=cells.predictions.count("?"),
+                            language=_language_label(strategy))
+
+    results = []
+    for (doc_folder, items_meta, char_files), cells in zip(docs, page_predictions):
+        timings = {"recognize": recognize_time * len(char_files) / n_cells_total}
+        t0 = time.perf_counter()
+        layout = DocumentLayout.from_items(items_meta)
+        assembled_braille = assemble_braille(layout, cells.unicode, strategy, space_factor)
+        t1 = time.perf_counter()
+        timings["assemble"] = t1 - t0
+        metrics.observe("assemble", t1 - t0, doc_folder.name, cells=len(layout),
+                        language=_language_label(strategy))
+        translated = translate_braille(strategy, assembled_braille, grade, page=doc_folder.name,
+                                       fuzzy_correction=fuzzy_correction)
+        timings["translate"] = time.perf_counter() - t1
 
-        with open(doc_folder / "translated.txt", "w", encoding="utf-8") as f:
-            f.write(translated)
+        result = PageResult(name=doc_folder.name, layout=layout, class_idx=cells.class_idx,
+                            predictions=cells.predictions, unicode=cells.unicode,
+                            assembled_braille=assembled_braille, translated=translated,
+                            failed=cells.failed, timings=timings)
+        if write_files:
+            with metrics.stage("write", doc_folder.name, _language_label(strategy)):
+                write_page_result(result, doc_folder)
+        results.append(result)
 
-    return crops_dir
\ No newline at end of file
+    return results
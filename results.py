@@ -0,0 +1,82 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+import json
+import numpy as np
+
+from layout import DocumentLayout
+
+
+class CellPredictions(NamedTuple):
+    """Recognizer output for the cells of one page, in reading order."""
+    class_idx: np.ndarray  # index into CLASS_NAMES, -1 where the crop failed
+    predictions: List[str]  # dot patterns, e.g. '123' ('?' when failed)
+    unicode: List[str]  # braille unicode per cell ('?' when failed)
+    failed: List[str]  # error messages of the failed crops
+
+
+@dataclass
+class PageResult:
+    """Everything the pipeline knows about one page, kept in memory."""
+    name: str = ""  # document / page identifier (file stem)
+    layout: DocumentLayout = field(default_factory=lambda: DocumentLayout.from_boxes([]))
+    class_idx: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    predictions: List[str] = field(default_factory=list)  # dot patterns, e.g. '123'
+    unicode: List[str] = field(default_factory=list)  # braille unicode per cell
+    assembled_braille: str = ""
+    translated: str = ""
+    failed: List[str] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)  # stage -> seconds
+    overlay: Optional[Any] = None  # labeled PIL image, when rendering was requested
+
+    @property
+    def items(self):
+        """Cells in the metadata.json item format, reading order."""
+        return self.layout.to_items()
+
+    @property
+    def boxes(self):
+        """(N,4) int array of x1,y1,x2,y2 in reading order."""
+        return self.layout.boxes
+
+    @property
+    def rows(self):
+        """Unicode cells grouped per text row, top to bottom."""
+        return [self.unicode[cells] for _, cells in self.layout.row_slices()]
+
+    def to_dict(self, include_cells: bool = True):
+        """JSON-serializable view of the result."""
+        data = {
+            "name": self.name,
+            "n_cells": len(self.unicode),
+            "assembled_braille": self.assembled_braille,
+            "translated": self.translated,
+            "failed": list(self.failed),
+            "timings": dict(self.timings),
+        }
+        if include_cells:
+            data["cells"] = [dict(item, class_idx=int(c), prediction=p, unicode=u)
+                             for item, c, p, u in zip(self.items, self.class_idx, self.predictions, self.unicode)]
+        return data
+
+
+def write_page_result(result: PageResult, doc_folder: Path, as_json: bool = False):
+    """
+    Optional serializer: the legacy per-document text files
+    (predictions.txt, assembled_braille.txt, translated.txt), plus result.json if as_json.
+    """
+    doc_folder.mkdir(parents=True, exist_ok=True)
+    # save per-char predictions (one per line) for compatibility
+    with open(doc_folder / "predictions.txt", "w", encoding="utf-8") as f:
+        for p in result.predictions:
+            f.write(p + "\n")
+
+    with open(doc_folder / "assembled_braille.txt", "w", encoding="utf-8") as f:
+        f.write(result.assembled_braille)
+
+    with open(doc_folder / "translated.txt", "w", encoding="utf-8") as f:
+        f.write(result.translated)
+
+    if as_json:
+        with open(doc_folder / "result.json", "w", encoding="utf-8") as f:
+            json.dump(result.to_dict(), f, indent=2, ensure_ascii=False)